@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Box, Typography, Button, Card, CardContent, TextField, Grid, IconButton, Tooltip } from '@mui/material';
 import RestoreIcon from '@mui/icons-material/Restore';
-import { getQuestions, saveAnswer, getAnswerStatus, getSpecificAnswer, convertSpeechToText } from '../services/api';
+import { getQuestions, saveAnswers, getAnswerStatus, getAllAnswers, streamSpeechToText } from '../services/api';
 import VoiceRecorder from './VoiceRecorder';
 
 export interface QuestionData {
@@ -40,24 +40,21 @@ const Question: React.FC<QuestionProps> = ({ testId, subjectId }) => {
     const fetchData = async () => {
       try {
         console.log('Fetching data for:', testId, subjectId);
-        const [questionsData, answersData] = await Promise.all([
+        const [questionsData, answersData, allAnswers] = await Promise.all([
           getQuestions(testId, subjectId),
-          getAnswerStatus(testId, subjectId)
+          getAnswerStatus(testId, subjectId),
+          getAllAnswers(testId, subjectId)
         ]);
         console.log('Received data:', questionsData);
         setQuestions(questionsData[0]);
         setBaseAnswers(questionsData[1]);
         setAnswerStatus(answersData);
         
-        // 저장된 답변 데이터 가져오기
+        // 저장된 답변 데이터 (한 번의 요청으로 전체 레벨 답변을 받음)
         const savedAnswers: {[key: string]: {low: string, medium: string, high: string}} = {};
         for (const question of questionsData[0]) {
           const questionNum = question.question_number.toString();
-          savedAnswers[questionNum] = {
-            low: await fetchAnswer(testId, subjectId, questionNum, 'low'),
-            medium: await fetchAnswer(testId, subjectId, questionNum, 'medium'),
-            high: await fetchAnswer(testId, subjectId, questionNum, 'high')
-          };
+          savedAnswers[questionNum] = allAnswers[questionNum] || { low: '', medium: '', high: '' };
         }
         setAnswers(savedAnswers);
         setOriginalAnswers(JSON.parse(JSON.stringify(savedAnswers))); // 깊은 복사로 원본 데이터 저장
@@ -70,10 +67,6 @@ const Question: React.FC<QuestionProps> = ({ testId, subjectId }) => {
     fetchData();
   }, [testId, subjectId]);
 
-  const fetchAnswer = async (testId: string, subjectId: string, questionNum: string, answerType: string) => {
-    return await getSpecificAnswer(testId, subjectId, questionNum, answerType);
-  };
-
   const handleNextQuestion = () => {
     if (currentQuestionIndex < questions.length - 1) {
       setCurrentQuestionIndex(currentQuestionIndex + 1);
@@ -88,11 +81,16 @@ const Question: React.FC<QuestionProps> = ({ testId, subjectId }) => {
     try {
       const currentQuestion = questions[currentQuestionIndex];
       const questionNum = currentQuestion.question_number.toString();
-      await Promise.all([
-        saveAnswer(testId, subjectId, questionNum, 'low', answers[questionNum].low, currentQuestion.test_month, currentQuestion.subject_name),
-        saveAnswer(testId, subjectId, questionNum, 'medium', answers[questionNum].medium, currentQuestion.test_month, currentQuestion.subject_name),
-        saveAnswer(testId, subjectId, questionNum, 'high', answers[questionNum].high, currentQuestion.test_month, currentQuestion.subject_name)
-      ]);
+      const result = await saveAnswers(testId, subjectId, (['low', 'medium', 'high'] as const).map(answerType => ({
+        question_num: questionNum,
+        answer_type: answerType,
+        answer: answers[questionNum][answerType],
+        test_month: currentQuestion.test_month,
+        subject_name: currentQuestion.subject_name
+      })));
+      if (result.failed > 0) {
+        throw new Error(`${result.failed}개의 답변 저장 실패`);
+      }
       const newStatus = await getAnswerStatus(testId, subjectId);
       setAnswerStatus(newStatus);
       alert('답변이 저장되었습니다.');
@@ -116,7 +114,8 @@ const Question: React.FC<QuestionProps> = ({ testId, subjectId }) => {
 
   const handleVoiceRecordingComplete = async (answerType: 'low' | 'medium' | 'high', audioBlob: Blob) => {
     try {
-      const text = await convertSpeechToText(answerType, currentQuestion, audioBlob);
+      // 정제된 풀이가 생성되는 대로 입력란에 표시
+      const text = await streamSpeechToText(answerType, currentQuestion, audioBlob, (partialText) => handleAnswerChange(answerType, partialText));
       handleAnswerChange(answerType, text);
     } catch (error) {
       console.error('음성을 텍스트로 변환하는 중 오류 발생:', error);
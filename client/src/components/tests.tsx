@@ -1,7 +1,7 @@
-import React, { useEffect, useState, useCallback, useRef } from 'react';
+import React, { useEffect, useState, useCallback } from 'react';
 import { TableContainer, Table, TableHead, TableRow, TableCell, TableBody, Paper, Typography, Button, CircularProgress } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
-import { getDatalists, createFinetuningModel, getFinetuningStatus, createFinetunedAnswers } from '../services/api';
+import { getDatalists, createFinetuningModel, streamFinetunedAnswers, subscribeProgressEvents, JobInfo } from '../services/api';
 
 interface ModelInfo {
   fine_tuned_model: string | null;
@@ -29,6 +29,11 @@ interface ModelStatus {
     status: 'idle' | 'creating' | 'pending' | 'running' | 'succeeded' | 'failed' | 'validating_files';
     progress?: number;
     answers_status: 'idle' | 'creating' | 'completed' | 'failed';
+    answers_progress?: string;
+    // 파인튜닝 작업(jobs) 상태는 모델 상태와 따로 관리 (작업이 실패해도 기존 모델은 유지됨)
+    job_id?: string;
+    job_status?: JobInfo['status'];
+    job_error?: string | null;
   };
 }
 
@@ -37,23 +42,12 @@ const Tests: React.FC = () => {
   const [modelStatus, setModelStatus] = useState<ModelStatus>({});
   const [error, setError] = useState<string | null>(null);
   const navigate = useNavigate();
-  const activeJobsRef = useRef<Set<string>>(new Set());
 
   const fetchTestsInfo = useCallback(async () => {
     try {
       const data: TestsInfo[] = await getDatalists();
       setTestsInfo(data);
       initializeModelStatus(data);
-      
-      // 진행 중인 모델에 대해 상태 확인 시작
-      data.forEach((testInfo: TestsInfo) => {
-        Object.entries(testInfo.levels).forEach(([level, modelInfo]) => {
-          if (modelInfo && modelInfo.job_id && (modelInfo.status === 'running' || modelInfo.status === 'pending' || modelInfo.status === 'validating_files')) {
-            activeJobsRef.current.add(modelInfo.job_id);
-            checkModelStatus(modelInfo.job_id, testInfo.testId, testInfo.subjectId, level);
-          }
-        });
-      });
     } catch (err) {
       console.error('Error fetching tests info:', err);
       setError('데이터를 불러오는 중 오류가 발생했습니다.');
@@ -64,13 +58,54 @@ const Tests: React.FC = () => {
     fetchTestsInfo();
   }, [fetchTestsInfo]);
 
+  // 파인튜닝 상태와 답변 생성 진행 상황은 서버가 푸시하는 이벤트로 갱신
   useEffect(() => {
-    const intervalId = setInterval(() => {
-      if (activeJobsRef.current.size > 0) {
-        fetchTestsInfo();
+    return subscribeProgressEvents(
+      (event) => {
+        const statusKey = `${event.testId}-${event.subjectId}-${event.level}`;
+        setModelStatus(prev => ({
+          ...prev,
+          [statusKey]: {
+            ...prev[statusKey],
+            status: event.status as ModelStatus[string]['status'],
+            progress: event.status === 'succeeded' ? 100 : (event.status === 'running' ? 50 : 0),
+            answers_status: prev[statusKey]?.answers_status || 'idle'
+          }
+        }));
+        if (event.status === 'succeeded' || event.status === 'failed' || event.status === 'cancelled') {
+          // 완성된 모델 이름을 반영하기 위해 목록을 한 번만 다시 불러옴
+          fetchTestsInfo();
+        }
+      },
+      (event) => {
+        const statusKey = `${event.testId}-${event.subjectId}-${event.level}`;
+        setModelStatus(prev => {
+          const current: ModelStatus[string] = prev[statusKey] || { status: 'idle', answers_status: 'idle' };
+          return {
+            ...prev,
+            [statusKey]: {
+              ...current,
+              // 이 화면에서 실행 중인 생성은 스트림 결과로 완료 처리
+              answers_status: current.answers_status === 'creating' ? 'creating' : event.answers_status,
+              answers_progress: `${event.count}/${event.total}`
+            }
+          };
+        });
+      },
+      (event) => {
+        if (event.kind !== 'finetuning') {
+          return;
+        }
+        const statusKey = `${event.testId}-${event.subjectId}-${event.level}`;
+        setModelStatus(prev => {
+          const current: ModelStatus[string] = prev[statusKey] || { status: 'idle', answers_status: 'idle' };
+          return {
+            ...prev,
+            [statusKey]: { ...current, job_id: event.job_id, job_status: event.status, job_error: event.error }
+          };
+        });
       }
-    }, 30000);
-    return () => clearInterval(intervalId);
+    );
   }, [fetchTestsInfo]);
 
   const initializeModelStatus = (data: TestsInfo[]) => {
@@ -97,64 +132,24 @@ const Tests: React.FC = () => {
     try {
       setModelStatus(prev => ({
         ...prev,
-        [statusKey]: { status: 'creating', progress: 0, answers_status: 'idle' }
+        [statusKey]: { ...prev[statusKey], job_status: 'queued', job_error: null }
       }));
-      const result = await createFinetuningModel(testId, subjectId, level);
-      if (result.error) {
-        throw new Error(result.error);
-      }
+      // 등록된 작업의 상태만 기록하고, 모델 상태는 model_status 이벤트로 갱신
+      const result: JobInfo = await createFinetuningModel(testId, subjectId, level);
       setModelStatus(prev => ({
         ...prev,
-        [statusKey]: { status: 'pending', progress: 0, answers_status: 'idle' }
+        [statusKey]: { ...prev[statusKey], job_id: result.job_id, job_status: result.status, job_error: result.error }
       }));
-      activeJobsRef.current.add(result.job_id);
-      await checkModelStatus(result.job_id, testId, subjectId, level);
     } catch (err) {
       console.error('Error creating finetuning model:', err);
       setError(`파인튜닝 모델 생성 중 오류가 발생했습니다: ${(err as Error).message}`);
       setModelStatus(prev => ({
         ...prev,
-        [statusKey]: { status: 'failed', progress: 0, answers_status: 'idle' }
+        [statusKey]: { ...prev[statusKey], job_status: 'failed', job_error: (err as Error).message }
       }));
     }
   };
 
-  const checkModelStatus = useCallback(async (jobId: string | null, testId: string, subjectId: string, level: string) => {
-    if (!jobId) {
-      console.error('Job ID is null or undefined');
-      return;
-    }
-
-    const statusKey = `${testId}-${subjectId}-${level}`;
-    try {
-      const status = await getFinetuningStatus(jobId);
-      if (status.error) {
-        throw new Error(status.error);
-      }
-      setModelStatus(prev => ({
-        ...prev,
-        [statusKey]: { 
-          status: status.status as ModelStatus[string]['status'],
-          progress: status.status === 'succeeded' ? 100 : (status.status === 'running' ? 50 : 0),
-          answers_status: prev[statusKey]?.answers_status || 'idle'
-        }
-      }));
-      if (status.status !== 'succeeded' && status.status !== 'failed' && status.status !== 'cancelled') {
-        setTimeout(() => checkModelStatus(jobId, testId, subjectId, level), 10000);
-      } else {
-        activeJobsRef.current.delete(jobId);
-        await fetchTestsInfo();
-      }
-    } catch (err) {
-      console.error('Error checking model status:', err);
-      setModelStatus(prev => ({
-        ...prev,
-        [statusKey]: { status: 'failed', progress: 0, answers_status: 'idle' }
-      }));
-      activeJobsRef.current.delete(jobId);
-    }
-  }, [fetchTestsInfo]);
-
   const handleCreateAnswers = async (testId: string, subjectId: string, level: string, modelId: string) => {
     const statusKey = `${testId}-${subjectId}-${level}`;
     try {
@@ -162,7 +157,13 @@ const Tests: React.FC = () => {
         ...prev,
         [statusKey]: { ...prev[statusKey], answers_status: 'creating' }
       }));
-      const result = await createFinetunedAnswers(modelId, level, testId, subjectId);
+      // 문항별 생성 결과를 받을 때마다 진행 상황을 갱신
+      const result = await streamFinetunedAnswers(modelId, level, testId, subjectId, (progress) => {
+        setModelStatus(prev => ({
+          ...prev,
+          [statusKey]: { ...prev[statusKey], answers_progress: `${progress.skipped + progress.generated + progress.failed}/${progress.total}` }
+        }));
+      });
       if (result.error) {
         throw new Error(result.error);
       }
@@ -181,6 +182,21 @@ const Tests: React.FC = () => {
     }
   };
 
+  const renderJobStatus = (status: ModelStatus[string]) => {
+    switch (status.job_status) {
+      case 'queued':
+        return '작업 대기 중...';
+      case 'running':
+        return '작업 실행 중...';
+      case 'failed':
+        return `작업 실패${status.job_error ? `: ${status.job_error}` : ''}`;
+      case 'cancelled':
+        return '작업 취소됨';
+      default:
+        return null;
+    }
+  };
+
   const renderStatus = (status: ModelStatus[string]) => {
     switch (status.status) {
       case 'idle':
@@ -238,6 +254,7 @@ const Tests: React.FC = () => {
                 const statusKey = `${testInfo.testId}-${testInfo.subjectId}-${level}`;
                 const status = modelStatus[statusKey] || { status: 'idle', answers_status: 'idle' };
                 const isModelComplete = status.status === 'succeeded' || status.status === 'failed';
+                const isJobActive = status.job_status === 'queued' || status.job_status === 'running';
                 const buttonText = model ? '모델 업데이트' : '모델 생성';
                 const answerButtonText = status.answers_status === 'completed' ? '답변 업데이트' : '답변 생성';
                 return (
@@ -249,13 +266,16 @@ const Tests: React.FC = () => {
                     <TableCell>
                       <Button
                         variant="contained"
-                        disabled={!testInfo.is_ready || (!isModelComplete && status.status !== 'idle')}
+                        disabled={!testInfo.is_ready || isJobActive || (!isModelComplete && status.status !== 'idle')}
                         onClick={() => handleCreateModel(testInfo.testId, testInfo.subjectId, level)}
                       >
                         {buttonText}
                       </Button>
                     </TableCell>
-                    <TableCell>{renderStatus(status)}</TableCell>
+                    <TableCell>
+                      {renderStatus(status)}
+                      {renderJobStatus(status) && <div>{renderJobStatus(status)}</div>}
+                    </TableCell>
                     <TableCell>
                       <Button
                         variant="contained"
@@ -265,7 +285,10 @@ const Tests: React.FC = () => {
                         {answerButtonText}
                       </Button>
                     </TableCell>
-                    <TableCell>{status.answers_status === 'completed' ? '완료' : status.answers_status}</TableCell>
+                    <TableCell>
+                      {status.answers_status === 'completed' ? '완료' : status.answers_status}
+                      {status.answers_status === 'creating' && status.answers_progress ? ` (${status.answers_progress})` : ''}
+                    </TableCell>
                     <TableCell>
                       <Button
                         variant="contained"
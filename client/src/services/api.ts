@@ -39,6 +39,24 @@ export const saveAnswer = async (testId: string, subjectId: string, questionNum:
   }
 };
 
+export interface AnswerInput {
+  question_num: string;
+  answer_type: string;
+  answer: string;
+  test_month: string;
+  subject_name: string;
+}
+
+export const saveAnswers = async (testId: string, subjectId: string, answers: AnswerInput[]) => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/answers/${testId}/${subjectId}`, { answers });
+    return response.data;
+  } catch (error) {
+    console.error('답변 일괄 저장 중 오류 발생:', error);
+    throw error;
+  }
+};
+
 export const getAnswerStatus = async (testId: string, subjectId: string) => {
   try {
     const response = await axios.get(`${API_BASE_URL}/answer_status/${testId}/${subjectId}`);
@@ -59,9 +77,20 @@ export const getSpecificAnswer = async (testId: string, subjectId: string, quest
   }
 };
 
-export const createFinetuningModel = async (testId: string, subjectId: string, level: string) => {
+export const getAllAnswers = async (testId: string, subjectId: string) => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/answers/${testId}/${subjectId}`);
+    return response.data;
+  } catch (error) {
+    console.error('전체 답변 가져오기 중 오류 발생:', error);
+    throw error;
+  }
+};
+
+// force가 false면 데이터셋이 바뀌지 않은 경우 기존 업로드 파일/작업을 재사용
+export const createFinetuningModel = async (testId: string, subjectId: string, level: string, force: boolean = false) => {
   try {
-    const response = await axios.post(`${API_BASE_URL}/finetuning/${testId}/${subjectId}/${level}`);
+    const response = await axios.post(`${API_BASE_URL}/finetuning/${testId}/${subjectId}/${level}`, null, { params: { force } });
     return response.data;
   } catch (error) {
     console.error('Finetuning 모델 생성 중 오류 발생:', error);
@@ -121,12 +150,167 @@ export const convertSpeechToText = async (level: string, question: QuestionData,
   }
 };
 
-export const createFinetunedAnswers = async (modelId: string, level: string, testId: string, subjectId: string) => {
+// SSE(text/event-stream) 응답을 읽어 이벤트 단위로 콜백을 호출합니다.
+const readEventStream = async (response: Response, onEvent: (event: string, data: any) => void) => {
+  if (!response.ok || !response.body) {
+    throw new Error(`스트리밍 요청 실패: ${response.status}`);
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let eventName = 'message';
+      const dataLines: string[] = [];
+      rawEvent.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) {
+          eventName = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          dataLines.push(line.slice(5).trimStart());
+        }
+      });
+      if (dataLines.length > 0) {
+        onEvent(eventName, JSON.parse(dataLines.join('\n')));
+      }
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+};
+
+export const streamSpeechToText = async (level: string, question: QuestionData, audioBlob: Blob, onToken: (text: string) => void): Promise<string> => {
+  const formData = new FormData();
+  formData.append('level', level);
+  formData.append('question', JSON.stringify(question));
+  formData.append('audio', audioBlob, 'audio.webm');
+
+  const response = await fetch(`${API_BASE_URL}/speech-to-text/stream`, {
+    method: 'POST',
+    body: formData,
+  });
+
+  let refinedText = '';
+  await readEventStream(response, (event, data) => {
+    if (event === 'token') {
+      refinedText += data.text;
+      onToken(refinedText);
+    } else if (event === 'done') {
+      refinedText = data.text;
+    } else if (event === 'error') {
+      throw new Error(data.error);
+    }
+  });
+  return refinedText;
+};
+
+export interface GenerationProgress {
+  question_num: number;
+  status: 'generated' | 'failed';
+  total: number;
+  skipped: number;
+  generated: number;
+  failed: number;
+  error?: string;
+}
+
+export const streamFinetunedAnswers = async (modelId: string, level: string, testId: string, subjectId: string, onProgress: (progress: GenerationProgress) => void) => {
+  const response = await fetch(`${API_BASE_URL}/finetuned_answers/${modelId}/${level}/${testId}/${subjectId}/stream`, {
+    method: 'POST',
+  });
+
+  let result: any = null;
+  await readEventStream(response, (event, data) => {
+    if (event === 'progress') {
+      onProgress(data);
+    } else if (event === 'done') {
+      result = data;
+    } else if (event === 'error') {
+      result = { error: data.error };
+    }
+  });
+  return result;
+};
+
+export interface ModelStatusEvent {
+  testId: number;
+  subjectId: number;
+  level: string;
+  status: string;
+  fine_tuned_model: string | null;
+  job_id: string | null;
+}
+
+export interface AnswersProgressEvent {
+  testId: number;
+  subjectId: number;
+  level: string;
+  count: number;
+  total: number;
+  answers_status: 'idle' | 'creating' | 'completed';
+}
+
+export interface JobStatusEvent {
+  job_id: string;
+  kind: 'generation' | 'evaluation' | 'finetuning';
+  testId: number;
+  subjectId: number;
+  level: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+  attempts: number;
+  progress: any;
+  error: string | null;
+}
+
+// 서버가 상태 변경을 푸시하므로 폴링 없이 구독만 유지 (연결이 끊기면 EventSource가 자동 재연결)
+export const subscribeProgressEvents = (
+  onModelStatus: (event: ModelStatusEvent) => void,
+  onAnswersProgress: (event: AnswersProgressEvent) => void,
+  onJob?: (event: JobStatusEvent) => void
+) => {
+  const source = new EventSource(`${API_BASE_URL}/events`);
+  source.addEventListener('model_status', (event) => onModelStatus(JSON.parse((event as MessageEvent).data)));
+  source.addEventListener('answers_progress', (event) => onAnswersProgress(JSON.parse((event as MessageEvent).data)));
+  if (onJob) {
+    source.addEventListener('job', (event) => onJob(JSON.parse((event as MessageEvent).data)));
+  }
+  return () => source.close();
+};
+
+export interface JobInfo {
+  job_id: string;
+  kind: 'generation' | 'evaluation' | 'finetuning';
+  testId: number;
+  subjectId: number;
+  level: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+  attempts: number;
+  progress: any;
+  result: any;
+  error: string | null;
+  deduplicated?: boolean;
+}
+
+export const getJob = async (jobId: string): Promise<JobInfo> => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/jobs/${jobId}`);
+    return response.data;
+  } catch (error) {
+    console.error('작업 상태 확인 중 오류 발생:', error);
+    throw error;
+  }
+};
+
+export const cancelJob = async (jobId: string): Promise<JobInfo> => {
   try {
-    const response = await axios.post(`${API_BASE_URL}/finetuned_answers/${modelId}/${level}/${testId}/${subjectId}`);
+    const response = await axios.post(`${API_BASE_URL}/jobs/${jobId}/cancel`);
     return response.data;
   } catch (error) {
-    console.error('Finetuned 답변 생성 중 오류 발생:', error);
+    console.error('작업 취소 중 오류 발생:', error);
     throw error;
   }
 };
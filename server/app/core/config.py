@@ -4,8 +4,70 @@ import os
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "mongodb://localhost:27017")
     MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "tutor-db")
+    READ_CACHE_TTL: float = float(os.getenv("READ_CACHE_TTL", "300"))
+    READ_CACHE_MUTABLE_TTL: float = float(os.getenv("READ_CACHE_MUTABLE_TTL", "5"))
+    READ_CACHE_MAX_ENTRIES: int = int(os.getenv("READ_CACHE_MAX_ENTRIES", "1024"))
+    DB_CHECK_QUERY_PLANS: bool = os.getenv("DB_CHECK_QUERY_PLANS", "false").lower() == "true"
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "120.0"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10.0"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60.0"))
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    OPENAI_MAX_REQUESTS_PER_MINUTE: int = int(os.getenv("OPENAI_MAX_REQUESTS_PER_MINUTE", "500"))
+    OPENAI_MAX_TOKENS_PER_MINUTE: int = int(os.getenv("OPENAI_MAX_TOKENS_PER_MINUTE", "200000"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    OPENAI_RETRY_BASE_DELAY: float = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "1.0"))
+    OPENAI_RETRY_MAX_DELAY: float = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "60.0"))
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_DOCUMENTS: int = int(os.getenv("LLM_CACHE_MAX_DOCUMENTS", "50000"))
+    GENERATION_CONCURRENCY: int = int(os.getenv("GENERATION_CONCURRENCY", "8"))
+    GENERATION_WRITE_BATCH_SIZE: int = int(os.getenv("GENERATION_WRITE_BATCH_SIZE", "20"))
+    GENERATION_OUTPUT_TOKEN_ESTIMATE: int = int(os.getenv("GENERATION_OUTPUT_TOKEN_ESTIMATE", "800"))
+    FINETUNING_POLLER_ENABLED: bool = os.getenv("FINETUNING_POLLER_ENABLED", "true").lower() == "true"
+    FINETUNING_POLL_MIN_INTERVAL: float = float(os.getenv("FINETUNING_POLL_MIN_INTERVAL", "15.0"))
+    FINETUNING_POLL_MAX_INTERVAL: float = float(os.getenv("FINETUNING_POLL_MAX_INTERVAL", "300.0"))
+    FINETUNING_POLL_LIST_PAGES: int = int(os.getenv("FINETUNING_POLL_LIST_PAGES", "3"))
+    FINETUNING_LEASE_TTL: float = float(os.getenv("FINETUNING_LEASE_TTL", "90.0"))
+    EVENT_SOURCE: str = os.getenv("EVENT_SOURCE", "local")
+    EVENT_QUEUE_SIZE: int = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+    FINETUNING_BASE_MODEL: str = os.getenv("FINETUNING_BASE_MODEL", "gpt-4o-mini-2024-07-18")
+    TRAINING_SPOOL_MAX_BYTES: int = int(os.getenv("TRAINING_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+    TRAINING_MIN_EXAMPLES: int = int(os.getenv("TRAINING_MIN_EXAMPLES", "10"))
+    TRAINING_MAX_EXAMPLE_TOKENS: int = int(os.getenv("TRAINING_MAX_EXAMPLE_TOKENS", "65536"))
+    SLOW_REQUEST_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_THRESHOLD", "1.0"))
+    JOB_WORKER_ENABLED: bool = os.getenv("JOB_WORKER_ENABLED", "true").lower() == "true"
+    JOB_WORKER_KINDS: str = os.getenv("JOB_WORKER_KINDS", "")
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    JOB_LEASE_TTL: float = float(os.getenv("JOB_LEASE_TTL", "60.0"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "2.0"))
+    JOB_PROGRESS_INTERVAL: float = float(os.getenv("JOB_PROGRESS_INTERVAL", "1.0"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_DELAY: float = float(os.getenv("JOB_RETRY_BASE_DELAY", "10.0"))
+    JOB_RETENTION: int = int(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+    APP_ROLE: str = os.getenv("APP_ROLE", "all")
+    APP_WARMUP: str = os.getenv("APP_WARMUP", "")
     GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+    SPEECH_BACKEND: str = os.getenv("SPEECH_BACKEND", "google")
+    SPEECH_LANGUAGE_CODE: str = os.getenv("SPEECH_LANGUAGE_CODE", "ko-KR")
+    SPEECH_SEGMENT_SECONDS: int = int(os.getenv("SPEECH_SEGMENT_SECONDS", "50"))
+    SPEECH_MAX_PARALLEL_SEGMENTS: int = int(os.getenv("SPEECH_MAX_PARALLEL_SEGMENTS", "8"))
+    SPEECH_FFMPEG_PATH: str = os.getenv("SPEECH_FFMPEG_PATH", "ffmpeg")
+    SPEECH_LOCAL_LATENCY: float = float(os.getenv("SPEECH_LOCAL_LATENCY", "0.0"))
+    SPEECH_LOCAL_TEXT: str = os.getenv("SPEECH_LOCAL_TEXT", "")
+    EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "distiluse-base-multilingual-cased-v1")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", "1"))
+    EMBEDDING_QUEUE_SIZE: int = int(os.getenv("EMBEDDING_QUEUE_SIZE", "64"))
+    EMBEDDING_QUEUE_TIMEOUT: float = float(os.getenv("EMBEDDING_QUEUE_TIMEOUT", "30.0"))
+    EMBEDDING_COALESCE_WINDOW: float = float(os.getenv("EMBEDDING_COALESCE_WINDOW", "0.01"))
+    EMBEDDING_MAX_BATCH_TEXTS: int = int(os.getenv("EMBEDDING_MAX_BATCH_TEXTS", "512"))
+    EMBEDDING_CACHE_MEMORY_SIZE: int = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "5000"))
+    EMBEDDING_CACHE_MAX_DOCUMENTS: int = int(os.getenv("EMBEDDING_CACHE_MAX_DOCUMENTS", "200000"))
+    LEXICAL_SIMILARITY_MODE: str = os.getenv("LEXICAL_SIMILARITY_MODE", "count")
 
     class Config:
         env_file = ".env"
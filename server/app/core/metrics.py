@@ -0,0 +1,249 @@
+from app.core.config import settings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pymongo import monitoring
+import json
+import logging
+import threading
+import time
+
+# Prometheus 텍스트 형식으로 내보내는 최소한의 카운터/히스토그램/게이지 (프로세스 단위)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, entry in sorted(self._values.items()):
+            for bound, count in zip(self.buckets, entry["buckets"]):
+                labels = _format_labels(self.labels, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {entry['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {entry['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {entry['count']}")
+        return lines
+
+class Gauge:
+    # 렌더링할 때 callback을 호출해 현재 값을 읽음 (callback은 {라벨 값 튜플: 값} 또는 숫자를 반환)
+    def __init__(self, name: str, help_text: str, callback, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.labels = labels
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()):
+        return self.register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name: str, help_text: str, callback, labels: tuple = ()):
+        return self.register(Gauge(name, help_text, callback, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} 수집 실패: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.counter("http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+http_request_duration = registry.histogram("http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "route"))
+http_request_db_commands = registry.histogram("http_request_db_commands", "요청 하나가 실행한 MongoDB 명령 수", ("route",), buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 1000))
+db_commands = registry.counter("mongodb_commands_total", "MongoDB 명령 수", ("collection", "command", "status"))
+db_command_duration = registry.histogram("mongodb_command_duration_seconds", "MongoDB 명령 실행 시간", ("collection", "command"))
+llm_requests = registry.counter("llm_requests_total", "OpenAI 호출 수", ("operation", "status"))
+llm_request_duration = registry.histogram("llm_request_duration_seconds", "OpenAI 호출 시간 (재시도 포함)", ("operation",))
+llm_retries = registry.counter("llm_retries_total", "OpenAI 호출 재시도 수", ("operation",))
+llm_tokens = registry.counter("llm_tokens_total", "OpenAI 사용 토큰 수", ("operation", "type"))
+speech_requests = registry.counter("speech_requests_total", "음성 인식 요청 수", ("backend", "status"))
+speech_request_duration = registry.histogram("speech_request_duration_seconds", "음성 인식 시간 (구간 병렬 인식 포함)", ("backend",))
+generation_questions = registry.counter("generation_questions_total", "파인튜닝 모델 답변 생성 결과 (문항 단위)", ("level", "status"))
+evaluation_stage_duration = registry.histogram("evaluation_stage_duration_seconds", "답변 평가 단계별 시간", ("stage",))
+
+# 요청 단위 통계: 미들웨어가 dict를 설정하고, Motor가 작업 스레드로 context를 복사하므로 리스너에서도 같은 dict를 갱신
+request_stats = ContextVar("request_stats", default=None)
+_request_stats_lock = threading.Lock()
+
+def new_request_stats():
+    return {"db_commands": 0, "db_seconds": 0.0, "collections": {}, "llm_calls": 0, "llm_seconds": 0.0}
+
+def record_llm_call(seconds: float):
+    stats = request_stats.get()
+    if stats is not None:
+        with _request_stats_lock:
+            stats["llm_calls"] += 1
+            stats["llm_seconds"] += seconds
+
+class CommandMetricsListener(monitoring.CommandListener):
+    # 컬렉션/명령별 횟수와 시간을 기록 (N+1 조회를 요청 단위로 확인할 수 있음)
+    IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if event.command_name in self.IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._pending[self._key(event)] = (collection, request_stats.get())
+
+    def _finish(self, event, status: str):
+        with self._lock:
+            pending = self._pending.pop(self._key(event), None)
+        if pending is None:
+            return
+        collection, stats = pending
+        seconds = event.duration_micros / 1_000_000
+        db_commands.inc(collection=collection, command=event.command_name, status=status)
+        db_command_duration.observe(seconds, collection=collection, command=event.command_name)
+        if stats is not None:
+            with _request_stats_lock:
+                stats["db_commands"] += 1
+                stats["db_seconds"] += seconds
+                key = f"{collection}.{event.command_name}"
+                stats["collections"][key] = stats["collections"].get(key, 0) + 1
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+command_listener = CommandMetricsListener()
+
+slow_request_logger = logging.getLogger("ai_tutor.slow_requests")
+
+class MetricsMiddleware:
+    # 라우트 템플릿 단위로 시간/상태 코드/DB 명령 수를 기록하고, 느린 요청은 요청별 통계와 함께 로그로 남김
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = new_request_stats()
+        token = request_stats.set(stats)
+        response = {"status": 500, "streaming": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = dict(message.get("headers") or [])
+                response["streaming"] = headers.get(b"content-type", b"").startswith(b"text/event-stream")
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method=method, route=route_path, status=str(response["status"]))
+            http_request_duration.observe(seconds, method=method, route=route_path)
+            http_request_db_commands.observe(stats["db_commands"], route=route_path)
+            threshold = settings.SLOW_REQUEST_THRESHOLD
+            if threshold > 0 and seconds >= threshold and not response["streaming"]:
+                slow_request_logger.warning(json.dumps({
+                    "method": method,
+                    "route": route_path,
+                    "path": scope["path"],
+                    "status": response["status"],
+                    "duration_ms": round(seconds * 1000, 1),
+                    "db_commands": stats["db_commands"],
+                    "db_ms": round(stats["db_seconds"] * 1000, 1),
+                    "db_by_collection": stats["collections"],
+                    "llm_calls": stats["llm_calls"],
+                    "llm_ms": round(stats["llm_seconds"] * 1000, 1),
+                }, ensure_ascii=False))
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+import resource
+import sys
+import time
+
+# main.py가 가장 먼저 불러오므로 이 모듈의 로드 시점을 import 시작 시점으로 사용
+IMPORT_STARTED = time.perf_counter()
+
+# 시작 시간/메모리의 대부분을 차지하는 모듈 (sys.modules에 있으면 이미 로드된 것)
+HEAVY_MODULES = ("torch", "sentence_transformers", "sklearn", "google.cloud.speech", "openai")
+
+def loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+def max_rss_mb() -> float:
+    # Linux는 KB, macOS는 byte 단위
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class StartupReport:
+    # import 시간과 lifespan 준비 단계별 시간/결과, 로드된 무거운 모듈을 기록
+    def __init__(self):
+        self.import_seconds = None
+        self.imported_modules = []
+        self.phases = []
+        self.ready_seconds = None
+
+    def mark_imported(self):
+        self.import_seconds = time.perf_counter() - IMPORT_STARTED
+        self.imported_modules = loaded_heavy_modules()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        entry = {"name": name, "status": "ok"}
+        try:
+            yield
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = str(e)
+            print(f"{name} 준비 실패: {str(e)}")
+        finally:
+            entry["seconds"] = round(time.perf_counter() - started, 3)
+            self.phases.append(entry)
+
+    def mark_ready(self):
+        self.ready_seconds = time.perf_counter() - IMPORT_STARTED
+
+    def to_dict(self):
+        return {
+            "import_seconds": round(self.import_seconds, 3) if self.import_seconds is not None else None,
+            "imported_heavy_modules": self.imported_modules,
+            "phases": self.phases,
+            "ready_seconds": round(self.ready_seconds, 3) if self.ready_seconds is not None else None,
+            "loaded_heavy_modules": loaded_heavy_modules(),
+            "max_rss_mb": max_rss_mb(),
+        }
+
+    def summary(self) -> str:
+        report = self.to_dict()
+        phases = ", ".join(f"{p['name']}={p['seconds']}s({p['status']})" for p in self.phases) or "없음"
+        return (
+            f"import {report['import_seconds']}s, 준비 단계 [{phases}], 준비 완료 {report['ready_seconds']}s, "
+            f"무거운 모듈 {report['loaded_heavy_modules']}, 최대 RSS {report['max_rss_mb']}MB"
+        )
+
+startup_report = StartupReport()
@@ -1,20 +1,232 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
-from datetime import datetime
-from bson import ObjectId
-import json
-
-class JSONEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, ObjectId):
-            return str(o)
-        if isinstance(o, datetime):
-            return o.isoformat()
-        return json.JSONEncoder.default(self, o)
-
-client = AsyncIOMotorClient(settings.DATABASE_URL)
+from datetime import datetime, timedelta
+from bson import Binary, ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne, ReturnDocument, ASCENDING
+from pymongo.errors import OperationFailure, BulkWriteError, DuplicateKeyError
+from cachetools import TTLCache
+from app.utils.responses import json_default
+from app.services.event_bus import event_bus
+from app.core.metrics import command_listener
+import asyncio
+import hashlib
+import orjson
+import time
+
+client = AsyncIOMotorClient(settings.DATABASE_URL, event_listeners=[command_listener])
 db = client[settings.MONGODB_DB_NAME]
 
+class ReadThroughCache:
+    # 거의 바뀌지 않는 조회 결과용 프로세스 내 캐시 (TTL + LRU, 쓰기 경로에서 키 단위 무효화)
+    # 반환값은 여러 요청이 공유하므로 호출하는 쪽에서 수정하면 안 됨
+    # 무효화는 이 프로세스에만 적용되므로, 다른 워커의 쓰기로 바뀌는 키는 ttl을 짧게 지정해 받음
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _entry(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is not None and entry["expires_at"] is not None and time.monotonic() >= entry["expires_at"]:
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    async def get_or_load(self, key: tuple, loader, ttl: float = None):
+        entry = self._entry(key)
+        if entry is not None:
+            self.hits += 1
+            return entry["value"]
+        self.misses += 1
+        value = await loader()
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = {"value": value, "etag": None, "expires_at": expires_at}
+        return value
+
+    def etag(self, *keys):
+        # 캐시된 값의 직렬화 결과로 ETag를 계산 (키 중 하나라도 없으면 None)
+        digest = hashlib.sha1()
+        for key in keys:
+            entry = self._entry(key)
+            if entry is None:
+                return None
+            if entry["etag"] is None:
+                entry["etag"] = hashlib.sha1(orjson.dumps(entry["value"], default=json_default, option=orjson.OPT_NON_STR_KEYS)).hexdigest()
+            digest.update(entry["etag"].encode())
+        return f'"{digest.hexdigest()}"'
+
+    def invalidate(self, key: tuple):
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "maxsize": self._entries.maxsize,
+            "ttl": self._entries.ttl,
+        }
+
+read_cache = ReadThroughCache(settings.READ_CACHE_MAX_ENTRIES, settings.READ_CACHE_TTL)
+
+def test_info_cache_key():
+    return ("test_info",)
+
+def questions_cache_key(test_id, subject_id):
+    return ("questions", int(test_id), int(subject_id))
+
+def answers_cache_key(collection_name: str, test_id, subject_id):
+    return ("answers", collection_name, int(test_id), int(subject_id))
+
+def prompt_cache_key(level: str):
+    return ("prompts", level)
+
+# 기준 답안만 캐시 (레벨별 답안은 자주 수정되므로 항상 DB에서 읽음)
+CACHED_ANSWER_COLLECTIONS = ("base_answer",)
+
+# (컬렉션, 인덱스 키, unique 여부) - 주요 조회 패턴별 복합 인덱스
+ANSWER_KEYS = [("testId", ASCENDING), ("subjectId", ASCENDING), ("question_num", ASCENDING)]
+INDEX_SPECS = [
+    ("test_info", [("testId", ASCENDING), ("subjectId", ASCENDING)], True),
+    ("questions", [("testId", ASCENDING), ("subjectId", ASCENDING), ("question_number", ASCENDING)], False),
+    ("base_answer", ANSWER_KEYS, True),
+    ("low_answer", ANSWER_KEYS, True),
+    ("medium_answer", ANSWER_KEYS, True),
+    ("high_answer", ANSWER_KEYS, True),
+    ("level_answers", [("level", ASCENDING), ("testId", ASCENDING), ("subjectId", ASCENDING), ("question_num", ASCENDING)], True),
+    ("llm_models", [("level", ASCENDING), ("testId", ASCENDING), ("subjectId", ASCENDING)], True),
+    ("llm_models", [("job_id", ASCENDING)], False),
+    ("llm_models", [("status", ASCENDING)], False),
+    ("llm_models", [("dataset_fingerprint", ASCENDING)], False),
+    ("prompts", [("level", ASCENDING)], False),
+    ("answer_completion", ANSWER_KEYS, True),
+    ("evaluation_results", [("testId", ASCENDING), ("subjectId", ASCENDING), ("question_num", ASCENDING), ("level", ASCENDING)], True),
+    ("embedding_cache", [("last_used_at", ASCENDING)], False),
+    ("llm_cache", [("last_used_at", ASCENDING)], False),
+    ("jobs", [("status", ASCENDING), ("run_after", ASCENDING)], False),
+    ("jobs", [("status", ASCENDING), ("lease_expires_at", ASCENDING)], False),
+    ("jobs", [("testId", ASCENDING), ("subjectId", ASCENDING), ("created_at", ASCENDING)], False),
+    ("jobs", [("created_at", ASCENDING)], False),
+]
+# (컬렉션, 필드): 필드의 시각이 지나면 MongoDB가 문서를 자동 삭제
+TTL_INDEX_SPECS = [
+    ("llm_cache", "expires_at"),
+    ("jobs", "expires_at"),
+]
+# (컬렉션, 필드): 필드가 있는 문서끼리만 유일 (완료된 작업은 필드를 지워 같은 키로 다시 등록 가능)
+PARTIAL_UNIQUE_INDEX_SPECS = [
+    ("jobs", "active_key"),
+]
+
+async def ensure_indexes():
+    # create_index는 이미 같은 인덱스가 있으면 아무 일도 하지 않으므로 매 시작 시 실행해도 안전
+    for collection_name, keys, unique in INDEX_SPECS:
+        collection = await get_collection(collection_name)
+        try:
+            await collection.create_index(keys, unique=unique)
+        except OperationFailure as e:
+            # 중복 데이터가 있거나 옵션이 다른 같은 키의 인덱스가 있으면 경고만 출력
+            print(f"인덱스 생성 실패 ({collection_name} {keys}): {str(e)}")
+    for collection_name, field in TTL_INDEX_SPECS:
+        collection = await get_collection(collection_name)
+        try:
+            await collection.create_index([(field, ASCENDING)], expireAfterSeconds=0)
+        except OperationFailure as e:
+            print(f"TTL 인덱스 생성 실패 ({collection_name} {field}): {str(e)}")
+    for collection_name, field in PARTIAL_UNIQUE_INDEX_SPECS:
+        collection = await get_collection(collection_name)
+        try:
+            await collection.create_index([(field, ASCENDING)], unique=True, partialFilterExpression={field: {"$exists": True}})
+        except OperationFailure as e:
+            print(f"부분 유일 인덱스 생성 실패 ({collection_name} {field}): {str(e)}")
+
+def query_plan_shapes():
+    # database.py / utils.py에서 사용하는 조회 형태 (값은 형태 확인용 샘플)
+    test = {"testId": 1, "subjectId": 1}
+    shapes = [
+        ("test_info", "find", {**test}),
+        ("questions", "find", {**test}),
+        ("questions", "aggregate", [{"$sort": {"testId": 1, "subjectId": 1}}, {"$group": {"_id": {"testId": "$testId", "subjectId": "$subjectId"}, "count": {"$sum": 1}}}]),
+        ("level_answers", "find", {**test, "level": "low"}),
+        ("level_answers", "find", {**test, "level": "low", "question_num": "1"}),
+        ("level_answers", "find", {**test, "level": "low", "question_num": {"$in": ["1", 1]}}),
+        ("level_answers", "aggregate", [{"$match": {"level": {"$in": ANSWER_LEVELS}}}, {"$group": {"_id": {"testId": "$testId", "subjectId": "$subjectId", "level": "$level"}, "count": {"$sum": 1}}}]),
+        ("llm_models", "find", {**test, "level": "low"}),
+        ("llm_models", "find", {"level": {"$in": ANSWER_LEVELS}}),
+        ("llm_models", "find", {"job_id": "ftjob-1"}),
+        ("llm_models", "find", {"dataset_fingerprint": "fingerprint", "training_file_id": {"$ne": None}, "status": {"$ne": "failed"}}),
+        ("llm_models", "find", {"status": {"$nin": FINETUNING_TERMINAL_STATUSES}, "job_id": {"$ne": None}}),
+        ("prompts", "find", {"level": "low"}),
+        ("answer_completion", "find", {**test}),
+        ("answer_completion", "find", {**test, "question_num": "1"}),
+        ("evaluation_results", "find", {**test, "level": "low"}),
+        ("evaluation_results", "find", {**test, "question_num": {"$in": ["1"]}}),
+        ("embedding_cache", "find", {"_id": {"$in": ["key"]}}),
+        ("llm_cache", "find", {"_id": "key", "expires_at": {"$gt": datetime(2024, 1, 1)}}),
+        ("jobs", "find", {"active_key": "generation:1:1:low"}),
+        ("jobs", "find", {"$or": [{"status": "queued", "run_after": {"$lte": datetime(2024, 1, 1)}}, {"status": "running", "lease_expires_at": {"$lt": datetime(2024, 1, 1)}}], "kind": {"$in": ["generation"]}}),
+        ("jobs", "find", {**test, "status": "queued"}),
+        ("jobs", "find", {"status": "queued"}),
+    ]
+    for collection_name in ["base_answer", "low_answer", "medium_answer", "high_answer"]:
+        shapes.append((collection_name, "find", {**test}))
+        shapes.append((collection_name, "find", {**test, "question_num": "1"}))
+    return shapes
+
+def find_collscans(explain: dict):
+    # winningPlan 안에서만 COLLSCAN을 찾음 (rejectedPlans는 무시)
+    found = []
+
+    def walk_plan(plan):
+        if isinstance(plan, dict):
+            if plan.get("stage") == "COLLSCAN":
+                found.append(plan)
+            for value in plan.values():
+                walk_plan(value)
+        elif isinstance(plan, list):
+            for value in plan:
+                walk_plan(value)
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "winningPlan":
+                    walk_plan(value)
+                elif key != "rejectedPlans":
+                    walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(explain)
+    return found
+
+async def check_query_plans():
+    failures = []
+    for collection_name, kind, query in query_plan_shapes():
+        if kind == "find":
+            command = {"find": collection_name, "filter": query}
+        else:
+            command = {"aggregate": collection_name, "pipeline": query, "cursor": {}}
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        if find_collscans(explain):
+            failures.append(f"{collection_name} {kind} {query}")
+    return failures
+
+class QueryPlanCheckFailed(RuntimeError):
+    # DB_CHECK_QUERY_PLANS=true일 때 서버 시작을 중단시키는 오류 (연결 실패와 달리 삼키지 않음)
+    pass
+
 async def init_db():
     try:
         await client.admin.command('ping')
@@ -25,41 +237,82 @@ async def init_db():
         print(f"시도한 연결 URL: {settings.DATABASE_URL}")
         raise
 
+    await ensure_indexes()
+    if settings.DB_CHECK_QUERY_PLANS:
+        failures = await check_query_plans()
+        if failures:
+            raise QueryPlanCheckFailed("COLLSCAN을 사용하는 조회가 있습니다: " + "; ".join(failures))
+
+def set_database(database):
+    # 테스트/벤치마크에서 로컬 또는 메모리 DB를 주입
+    global db
+    db = database
+    read_cache.clear()
+
 async def get_collection(collection_name: str):
     return db[collection_name]
 
 async def get_test_infos():
-    collection = await get_collection("test_info")
-    cursor = collection.find({}, {"_id": 0, "testId": 1, "subjectId": 1, "test_month": 1, "subject_name": 1, "is_ready": 1})
-    test_infos = await cursor.to_list(length=None)
-    return json.loads(json.dumps(test_infos, cls=JSONEncoder))
+    async def load():
+        collection = await get_collection("test_info")
+        cursor = collection.find({}, {"_id": 0, "testId": 1, "subjectId": 1, "test_month": 1, "subject_name": 1, "is_ready": 1})
+        return await cursor.to_list(length=None)
+    # is_ready는 다른 워커의 답안 저장으로도 바뀜
+    return await read_cache.get_or_load(test_info_cache_key(), load, settings.READ_CACHE_MUTABLE_TTL)
 
 async def get_questions():
     collection = await get_collection("questions")
     cursor = collection.find({}, {"_id": 0, "testId": 1, "subjectId": 1, "test_month": 1, "subject_name": 1})
-    questions = await cursor.to_list(length=None)
-    return json.loads(json.dumps(questions, cls=JSONEncoder))
+    return await cursor.to_list(length=None)
 
 async def get_questions_by_info(testId: str, subjectId: str):
+    async def load():
+        collection = await get_collection("questions")
+        cursor = collection.find(
+            {"testId": int(testId), "subjectId": int(subjectId)},
+            {"_id": 0, "testId": 1, "subjectId": 1, "question_number": 1, "question": 1, "content": 1, "choices": 1, "test_month": 1, "subject_name": 1}
+        )
+        return await cursor.to_list(length=None)
+    return await read_cache.get_or_load(questions_cache_key(testId, subjectId), load)
+
+async def iter_questions_by_info(test_id: str, subject_id: str):
+    # 캐시를 거치지 않고 문항 번호 순서대로 커서에서 하나씩 읽음 (시험 크기와 무관하게 메모리 일정)
     collection = await get_collection("questions")
     cursor = collection.find(
-        {"testId": int(testId), "subjectId": int(subjectId)},
-        {"_id": 0, "testId": 1, "subjectId": 1, "question_number": 1, "question": 1, "content": 1, "choices": 1, "test_month": 1, "subject_name": 1}
-    )
-    questions = await cursor.to_list(length=None)
-    print(questions)
-    return json.loads(json.dumps(questions, cls=JSONEncoder))
+        {"testId": int(test_id), "subjectId": int(subject_id)},
+        {"_id": 0, "question_number": 1, "question": 1, "content": 1, "choices": 1}
+    ).sort("question_number", ASCENDING)
+    async for question in cursor:
+        yield question
 
 async def get_answers(testId: str, subjectId: str, collection_name: str):
+    async def load():
+        collection = await get_collection(collection_name)
+        cursor = collection.find({"testId": int(testId), "subjectId": int(subjectId)}, {"_id": 0})
+        return await cursor.to_list(length=None)
+    if collection_name in CACHED_ANSWER_COLLECTIONS:
+        return await read_cache.get_or_load(answers_cache_key(collection_name, testId, subjectId), load, settings.READ_CACHE_MUTABLE_TTL)
+    return await load()
+
+async def get_answer_texts(test_id: str, subject_id: str, collection_name: str):
     collection = await get_collection(collection_name)
-    cursor = collection.find({"testId": int(testId), "subjectId": int(subjectId)})
-    answers = await cursor.to_list(length=None)
-    return json.loads(json.dumps(answers, cls=JSONEncoder))
+    cursor = collection.find(
+        {"testId": int(test_id), "subjectId": int(subject_id)},
+        {"_id": 0, "question_num": 1, "answer": 1}
+    )
+    return await cursor.to_list(length=None)
 
-async def save_answer(test_id: str, subject_id: str, answer_data: dict, collection_name: str, update=False):
+async def iter_answer_texts(test_id: str, subject_id: str, collection_name: str):
     collection = await get_collection(collection_name)
-    
-    document = {
+    cursor = collection.find(
+        {"testId": int(test_id), "subjectId": int(subject_id)},
+        {"_id": 0, "question_num": 1, "answer": 1}
+    )
+    async for answer in cursor:
+        yield answer
+
+def answer_document(test_id: str, subject_id: str, answer_data: dict):
+    return {
         "test_month": answer_data['test_month'],
         "subject_name": answer_data['subject_name'],
         "question_num": answer_data['question_num'],
@@ -67,16 +320,60 @@ async def save_answer(test_id: str, subject_id: str, answer_data: dict, collecti
         "testId": int(test_id),
         "subjectId": int(subject_id)
     }
+
+async def invalidate_after_answer_save(test_id: str, subject_id: str, collection_name: str, question_nums):
+    read_cache.invalidate(answers_cache_key(collection_name, test_id, subject_id))
+    # 평가는 level_answers와 기준 답안만 비교하므로, 사람이 작성하는 레벨별 답안 저장은 평가 결과에 영향이 없음
+    if collection_name == "base_answer":
+        await invalidate_evaluation_results(test_id, subject_id, question_nums)
+
+async def save_answer(test_id: str, subject_id: str, answer_data: dict, collection_name: str):
+    # 존재 여부 확인 없이 upsert 한 번으로 저장
+    collection = await get_collection(collection_name)
+    result = await collection.update_one(
+        {"testId": int(test_id), "subjectId": int(subject_id), "question_num": answer_data['question_num']},
+        {"$set": answer_document(test_id, subject_id, answer_data)},
+        upsert=True
+    )
+    await invalidate_after_answer_save(test_id, subject_id, collection_name, answer_data['question_num'])
     
-    if update:
-        result = await collection.update_one(
+    return str(result.upserted_id) if result.upserted_id is not None else "Updated successfully"
+
+async def bulk_save_answers(test_id: str, subject_id: str, collection_name: str, answers: list):
+    # 한 컬렉션에 대한 여러 답변을 bulk_write 한 번으로 upsert하고 항목별 결과를 반환
+    collection = await get_collection(collection_name)
+    operations = [
+        UpdateOne(
             {"testId": int(test_id), "subjectId": int(subject_id), "question_num": answer_data['question_num']},
-            {"$set": document}
+            {"$set": answer_document(test_id, subject_id, answer_data)},
+            upsert=True
         )
-    else:
-        result = await collection.insert_one(document)
-    
-    return str(result.inserted_id) if not update else "Updated successfully"
+        for answer_data in answers
+    ]
+    errors = {}
+    upserted_ids = {}
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        upserted_ids = result.upserted_ids
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            errors[error["index"]] = error.get("errmsg", "저장 실패")
+        for upserted in e.details.get("upserted", []):
+            upserted_ids[upserted["index"]] = upserted["_id"]
+
+    saved_question_nums = [a['question_num'] for i, a in enumerate(answers) if i not in errors]
+    if saved_question_nums:
+        await invalidate_after_answer_save(test_id, subject_id, collection_name, saved_question_nums)
+
+    results = []
+    for i in range(len(answers)):
+        if i in errors:
+            results.append({"status": "error", "error": errors[i]})
+        elif i in upserted_ids:
+            results.append({"status": "inserted", "id": str(upserted_ids[i])})
+        else:
+            results.append({"status": "updated"})
+    return results
 
 async def get_answer_collection(collection_name: str):
     return await get_collection(collection_name)
@@ -96,35 +393,235 @@ async def update_test_info_ready_status(test_id: str, subject_id: str, is_ready:
         {"testId": int(test_id), "subjectId": int(subject_id)},
         {"$set": {"is_ready": is_ready}}
     )
+    read_cache.invalidate(test_info_cache_key())
+
+ANSWER_LEVELS = ['low', 'medium', 'high']
+
+def answer_complete_expression():
+    return {"$and": [{"$eq": [f"$levels.{level}", True]} for level in ANSWER_LEVELS]}
+
+async def update_answer_completion(test_id: str, subject_id: str, question_num, level: str, has_answer: bool):
+    # 문항 단위 완료 문서를 원자적으로 갱신하고, 변화량만큼 test_info 카운터를 조정
+    completion_collection = await get_collection("answer_completion")
+    completion = await completion_collection.find_one_and_update(
+        {"testId": int(test_id), "subjectId": int(subject_id), "question_num": str(question_num)},
+        [
+            {"$set": {"previous_complete": {"$ifNull": ["$complete", None]}, f"levels.{level}": has_answer}},
+            {"$set": {"complete": answer_complete_expression()}},
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    previous_complete = completion.get("previous_complete")
+    tracked_delta = 1 if previous_complete is None else 0
+    complete_delta = int(completion["complete"]) - int(bool(previous_complete))
+
+    test_info_collection = await get_collection("test_info")
+    before = await test_info_collection.find_one_and_update(
+        {"testId": int(test_id), "subjectId": int(subject_id)},
+        [
+            {"$set": {
+                "answer_tracked_count": {"$add": [{"$ifNull": ["$answer_tracked_count", 0]}, tracked_delta]},
+                "answer_complete_count": {"$add": [{"$ifNull": ["$answer_complete_count", 0]}, complete_delta]},
+            }},
+            {"$set": {"is_ready": {"$eq": ["$answer_tracked_count", "$answer_complete_count"]}}},
+        ],
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is not None and "answer_tracked_count" not in before:
+        # 카운터가 도입되기 전의 데이터는 한 번 전체 재계산
+        await rebuild_answer_completion(test_id, subject_id)
+    # is_ready가 바뀌었을 수 있으므로 시험 목록 캐시 무효화
+    read_cache.invalidate(test_info_cache_key())
+
+async def refresh_answer_completion(test_id: str, subject_id: str, question_nums: list):
+    # 배치 저장 후 영향받은 문항의 완료 상태를 답변 컬렉션에서 다시 계산하고 카운터를 한 번에 갱신
+    question_nums = list(dict.fromkeys(str(num) for num in question_nums))
+    if not question_nums:
+        return
+    test_query = {"testId": int(test_id), "subjectId": int(subject_id)}
+    completions = {}
+    for level in ANSWER_LEVELS:
+        collection = await get_collection(f"{level}_answer")
+        cursor = collection.find(
+            {**test_query, "question_num": {"$in": question_num_variants(question_nums)}},
+            {"_id": 0, "question_num": 1, "answer": 1}
+        )
+        async for answer in cursor:
+            levels = completions.setdefault(str(answer["question_num"]), {l: False for l in ANSWER_LEVELS})
+            if (answer.get("answer") or "").strip() != "":
+                levels[level] = True
+
+    completion_collection = await get_collection("answer_completion")
+    operations = []
+    for question_num, levels in completions.items():
+        complete = all(levels.values())
+        operations.append(UpdateOne(
+            {**test_query, "question_num": question_num},
+            {"$set": {"levels": levels, "complete": complete, "previous_complete": complete}},
+            upsert=True
+        ))
+    if operations:
+        await completion_collection.bulk_write(operations, ordered=False)
+
+    tracked = await completion_collection.count_documents(test_query)
+    completed = await completion_collection.count_documents({**test_query, "complete": True})
+    test_info_collection = await get_collection("test_info")
+    await test_info_collection.update_one(
+        test_query,
+        {"$set": {"answer_tracked_count": tracked, "answer_complete_count": completed, "is_ready": tracked == completed}}
+    )
+    read_cache.invalidate(test_info_cache_key())
+
+async def get_answer_completion(test_id: str, subject_id: str):
+    test_info_collection = await get_collection("test_info")
+    test_info = await test_info_collection.find_one(
+        {"testId": int(test_id), "subjectId": int(subject_id)},
+        {"_id": 0, "answer_tracked_count": 1}
+    )
+    if test_info is not None and "answer_tracked_count" not in test_info:
+        await rebuild_answer_completion(test_id, subject_id)
+
+    completion_collection = await get_collection("answer_completion")
+    cursor = completion_collection.find(
+        {"testId": int(test_id), "subjectId": int(subject_id)},
+        {"_id": 0, "question_num": 1, "complete": 1}
+    )
+    return {d["question_num"]: d["complete"] for d in await cursor.to_list(length=None)}
+
+async def rebuild_answer_completion(test_id: str = None, subject_id: str = None):
+    # 레벨별 답변 컬렉션을 다시 읽어 완료 문서와 카운터를 재구성 (드리프트 복구용)
+    # 문항별 upsert로 덮어쓰므로 재구성 중에도 문서가 사라지는 순간이 없음
+    query = {}
+    if test_id is not None:
+        query["testId"] = int(test_id)
+    if subject_id is not None:
+        query["subjectId"] = int(subject_id)
+
+    # 답변보다 먼저 읽어 두어, 재구성 중에 새로 저장된 문항의 문서는 지우지 않음
+    completion_collection = await get_collection("answer_completion")
+    cursor = completion_collection.find(query, {"_id": 1, "testId": 1, "subjectId": 1, "question_num": 1})
+    existing = {(d["testId"], d["subjectId"], str(d["question_num"])): d["_id"] for d in await cursor.to_list(length=None)}
+
+    completions = {}
+    for level in ANSWER_LEVELS:
+        collection = await get_collection(f"{level}_answer")
+        cursor = collection.find(query, {"_id": 0, "testId": 1, "subjectId": 1, "question_num": 1, "answer": 1})
+        async for answer in cursor:
+            key = (answer["testId"], answer["subjectId"], str(answer["question_num"]))
+            if key not in completions:
+                completions[key] = {l: False for l in ANSWER_LEVELS}
+            if (answer.get("answer") or "").strip() != "":
+                completions[key][level] = True
+
+    operations = []
+    for (t_id, s_id, question_num), levels in completions.items():
+        complete = all(levels.values())
+        operations.append(UpdateOne(
+            {"testId": t_id, "subjectId": s_id, "question_num": question_num},
+            {"$set": {"levels": levels, "complete": complete, "previous_complete": complete}},
+            upsert=True
+        ))
+    if operations:
+        await completion_collection.bulk_write(operations, ordered=False)
+    # 답변이 모두 사라진 문항의 문서만 삭제
+    orphan_ids = [document_id for key, document_id in existing.items() if key not in completions]
+    if orphan_ids:
+        await completion_collection.delete_many({"_id": {"$in": orphan_ids}})
+
+    # 카운터는 저장된 완료 문서에서 다시 세어 그 사이의 개별 갱신도 반영
+    counters = {}
+    cursor = completion_collection.aggregate([
+        {"$match": query},
+        {"$group": {
+            "_id": {"testId": "$testId", "subjectId": "$subjectId"},
+            "tracked": {"$sum": 1},
+            "completed": {"$sum": {"$cond": ["$complete", 1, 0]}},
+        }},
+    ])
+    async for group in cursor:
+        counters[(group["_id"]["testId"], group["_id"]["subjectId"])] = (group["tracked"], group["completed"])
+
+    test_info_collection = await get_collection("test_info")
+    cursor = test_info_collection.find(query, {"_id": 0, "testId": 1, "subjectId": 1})
+    test_info_operations = []
+    async for test_info in cursor:
+        tracked, completed = counters.get((test_info["testId"], test_info["subjectId"]), (0, 0))
+        test_info_operations.append(UpdateOne(
+            {"testId": test_info["testId"], "subjectId": test_info["subjectId"]},
+            {"$set": {"answer_tracked_count": tracked, "answer_complete_count": completed, "is_ready": tracked == completed}}
+        ))
+    if test_info_operations:
+        await test_info_collection.bulk_write(test_info_operations, ordered=False)
+    read_cache.invalidate(test_info_cache_key())
+    return len(test_info_operations)
+
+def level_answers_status(count: int, total_questions: int):
+    if count == 0:
+        return 'idle'
+    elif count < total_questions:
+        return 'creating'
+    else:
+        return 'completed'
 
 async def db_get_datalists():
+    # 시험 수와 무관하게 네 번의 조회(시험 정보, 모델, 레벨별 답변 수, 문항 수)로 구성
     test_info_collection = await get_collection("test_info")
     llm_models_collection = await get_collection("llm_models")
+    level_answers_collection = await get_collection("level_answers")
+    questions_collection = await get_collection("questions")
     
     cursor = test_info_collection.find({}, {"_id": 0, "testId": 1, "subjectId": 1, "test_month": 1, "subject_name": 1, "is_ready": 1})
     test_infos = await cursor.to_list(length=None)
+
+    models = {}
+    cursor = llm_models_collection.find(
+        {"level": {"$in": ANSWER_LEVELS}},
+        {"_id": 0, "testId": 1, "subjectId": 1, "level": 1, "fine_tuned_model": 1, "status": 1, "job_id": 1}
+    )
+    async for model in cursor:
+        # find_one과 같이 (시험, 과목, 레벨)별 첫 문서를 사용
+        models.setdefault((model["testId"], model["subjectId"], model["level"]), model)
+
+    answer_counts = {}
+    cursor = level_answers_collection.aggregate([
+        {"$match": {"level": {"$in": ANSWER_LEVELS}}},
+        {"$group": {"_id": {"testId": "$testId", "subjectId": "$subjectId", "level": "$level"}, "count": {"$sum": 1}}},
+    ])
+    async for group in cursor:
+        answer_counts[(group["_id"]["testId"], group["_id"]["subjectId"], group["_id"]["level"])] = group["count"]
+
+    question_counts = {}
+    cursor = questions_collection.aggregate([
+        # 정렬을 인덱스로 처리하여 컬렉션 전체 스캔 대신 인덱스만 읽음
+        {"$sort": {"testId": 1, "subjectId": 1}},
+        {"$group": {"_id": {"testId": "$testId", "subjectId": "$subjectId"}, "count": {"$sum": 1}}},
+    ])
+    async for group in cursor:
+        question_counts[(group["_id"]["testId"], group["_id"]["subjectId"])] = group["count"]
     
     result = []
     for test_info in test_infos:
         test_info['levels'] = {}
-        for level in ['low', 'medium', 'high']:
-            model = await llm_models_collection.find_one(
-                {"testId": test_info['testId'], "subjectId": test_info['subjectId'], "level": level},
-                {"_id": 0, "fine_tuned_model": 1, "status": 1, "job_id": 1}
-            )
-            answers_status = await check_level_answers_status(test_info['testId'], test_info['subjectId'], level)
+        test_id, subject_id = int(test_info['testId']), int(test_info['subjectId'])
+        for level in ANSWER_LEVELS:
+            model = models.get((test_info['testId'], test_info['subjectId'], level))
             if model:
+                answers_status = level_answers_status(
+                    answer_counts.get((test_id, subject_id, level), 0),
+                    question_counts.get((test_id, subject_id), 0)
+                )
                 test_info['levels'][level] = {
-                    "fine_tuned_model": model['fine_tuned_model'],
-                    "status": model['status'],
-                    "job_id": model['job_id'],
+                    "fine_tuned_model": model.get('fine_tuned_model'),
+                    "status": model.get('status'),
+                    "job_id": model.get('job_id'),
                     "answers_status": answers_status
                 }
             else:
                 test_info['levels'][level] = None
         result.append(test_info)
     
-    return json.loads(json.dumps(result, cls=JSONEncoder))
+    return result
 
 async def check_level_answers_status(test_id: str, subject_id: str, level: str):
     level_answers_collection = await get_collection("level_answers")
@@ -133,13 +630,7 @@ async def check_level_answers_status(test_id: str, subject_id: str, level: str):
         "subjectId": int(subject_id),
         "level": level
     })
-    
-    if count == 0:
-        return 'idle'
-    elif count < await get_total_questions_count(test_id, subject_id):
-        return 'creating'
-    else:
-        return 'completed'
+    return level_answers_status(count, await get_total_questions_count(test_id, subject_id))
 
 async def get_total_questions_count(test_id: str, subject_id: str):
     questions_collection = await get_collection("questions")
@@ -150,7 +641,7 @@ async def get_total_questions_count(test_id: str, subject_id: str):
 
 # 기존 코드에 다음 함수를 추가합니다.
 
-async def save_llm_model(test_id: str, subject_id: str, level: str, status: str, fine_tuned_model: str, job_id: str):
+async def save_llm_model(test_id: str, subject_id: str, level: str, status: str, fine_tuned_model: str, job_id: str, dataset: dict = None):
     collection = await get_collection("llm_models")
     document = {
         "testId": int(test_id),
@@ -160,26 +651,366 @@ async def save_llm_model(test_id: str, subject_id: str, level: str, status: str,
         "fine_tuned_model": fine_tuned_model,
         "job_id": job_id
     }
+    if dataset:
+        # dataset_fingerprint, training_file_id, base_model (주어지지 않으면 기존 값을 유지)
+        document.update(dataset)
     await collection.update_one(
         {"testId": int(test_id), "subjectId": int(subject_id), "level": level},
-        {"$set": document},
+        # 새 작업이 만들어졌으므로 이전 시도의 오류 기록은 지움
+        {"$set": document, "$unset": {"last_error": "", "last_error_at": ""}},
         upsert=True
     )
+    publish_model_status(document)
+
+async def record_llm_model_failure(test_id: str, subject_id: str, level: str, error: str):
+    # 작업 생성 실패는 시도 기록으로만 남김 (완료된 모델이나 진행 중인 작업은 그대로 유지)
+    # 아직 모델 문서가 없을 때만 실패 상태로 생성
+    collection = await get_collection("llm_models")
+    model = await collection.find_one_and_update(
+        {"testId": int(test_id), "subjectId": int(subject_id), "level": level},
+        {
+            "$set": {"last_error": error, "last_error_at": datetime.utcnow()},
+            "$setOnInsert": {"status": "failed", "fine_tuned_model": None, "job_id": None},
+        },
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    publish_model_status(model)
+
+async def get_llm_model(test_id: str, subject_id: str, level: str):
+    collection = await get_collection("llm_models")
+    return await collection.find_one({"testId": int(test_id), "subjectId": int(subject_id), "level": level}, {"_id": 0})
+
+async def find_training_file_by_fingerprint(fingerprint: str):
+    # 같은 데이터셋을 이미 업로드한 적이 있으면 그 파일 id를 재사용 (그 파일로 만든 작업이 실패했으면 다시 업로드)
+    collection = await get_collection("llm_models")
+    model = await collection.find_one(
+        {"dataset_fingerprint": fingerprint, "training_file_id": {"$ne": None}, "status": {"$ne": "failed"}},
+        {"_id": 0, "training_file_id": 1}
+    )
+    return model["training_file_id"] if model else None
+
+async def forget_training_file(training_file_id: str):
+    # OpenAI에서 사용할 수 없게 된 업로드 파일은 같은 데이터셋이라도 다시 재사용하지 않음
+    collection = await get_collection("llm_models")
+    await collection.update_many({"training_file_id": training_file_id}, {"$set": {"training_file_id": None}})
 
 async def update_llm_model_status(job_id: str, status: str, fine_tuned_model: str = None):
     collection = await get_collection("llm_models")
     update_data = {"status": status}
     if fine_tuned_model:
         update_data["fine_tuned_model"] = fine_tuned_model
-    await collection.update_one(
+    model = await collection.find_one_and_update(
         {"job_id": job_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
+    )
+    if model:
+        publish_model_status(model)
+
+FINETUNING_TERMINAL_STATUSES = ["succeeded", "failed", "cancelled"]
+
+async def get_pending_finetuning_jobs():
+    # 재시작 후에도 이어서 확인할 수 있도록 끝나지 않은 작업을 DB에서 읽음
+    collection = await get_collection("llm_models")
+    cursor = collection.find(
+        {"status": {"$nin": FINETUNING_TERMINAL_STATUSES}, "job_id": {"$ne": None}},
+        {"_id": 0, "job_id": 1, "status": 1, "fine_tuned_model": 1}
+    )
+    return await cursor.to_list(length=None)
+
+async def bulk_update_llm_model_status(updates: list):
+    # updates: [{"job_id", "status", "fine_tuned_model"}] 변경분만 bulk_write 한 번으로 저장
+    if not updates:
+        return
+    collection = await get_collection("llm_models")
+    operations = []
+    for update in updates:
+        update_data = {"status": update["status"]}
+        if update.get("fine_tuned_model"):
+            update_data["fine_tuned_model"] = update["fine_tuned_model"]
+        operations.append(UpdateOne({"job_id": update["job_id"]}, {"$set": update_data}))
+    await collection.bulk_write(operations, ordered=False)
+    if local_events_enabled():
+        cursor = collection.find({"job_id": {"$in": [update["job_id"] for update in updates]}})
+        async for model in cursor:
+            publish_model_status(model)
+
+async def acquire_lease(name: str, owner: str, ttl_seconds: float):
+    # 만료되었거나 자신이 가진 lease만 가져올 수 있음 (여러 워커 중 하나만 성공)
+    collection = await get_collection("leases")
+    now = datetime.utcnow()
+    try:
+        lease = await collection.find_one_and_update(
+            {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # 다른 워커가 유효한 lease를 가지고 있어 upsert가 충돌함
+        return False
+    return lease is not None and lease["owner"] == owner
+
+async def release_lease(name: str, owner: str):
+    collection = await get_collection("leases")
+    await collection.delete_one({"_id": name, "owner": owner})
+
+JOB_ACTIVE_STATUSES = ["queued", "running"]
+JOB_TERMINAL_STATUSES = ["succeeded", "failed", "cancelled"]
+
+def parse_object_id(value: str):
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+async def enqueue_job(kind: str, test_id: str, subject_id: str, level: str, params: dict, idempotency_key: str, max_attempts: int):
+    # 같은 키로 대기/실행 중인 작업이 있으면 새로 만들지 않고 그 작업을 반환 (두 번 클릭해도 한 번만 실행)
+    collection = await get_collection("jobs")
+    now = datetime.utcnow()
+    job = {
+        "kind": kind,
+        "testId": int(test_id),
+        "subjectId": int(subject_id),
+        "level": level,
+        "params": params,
+        "status": "queued",
+        "active_key": idempotency_key,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_after": now,
+        "cancel_requested": False,
+        "progress": None,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now
+    }
+    try:
+        await collection.insert_one(job)
+    except DuplicateKeyError:
+        existing = await collection.find_one({"active_key": idempotency_key})
+        if existing is not None:
+            return existing, False
+        # 조회 사이에 기존 작업이 끝났으면 다시 등록
+        return await enqueue_job(kind, test_id, subject_id, level, params, idempotency_key, max_attempts)
+    publish_job_status(job)
+    return job, True
+
+async def claim_job(owner: str, kinds: list, lease_ttl: float):
+    # 실행할 시각이 된 대기 작업 또는 lease가 만료된(워커가 죽은) 실행 중 작업을 원자적으로 하나 가져옴
+    collection = await get_collection("jobs")
+    now = datetime.utcnow()
+    query = {"$or": [
+        {"status": "queued", "run_after": {"$lte": now}},
+        {"status": "running", "lease_expires_at": {"$lt": now}}
+    ]}
+    if kinds:
+        query["kind"] = {"$in": list(kinds)}
+    job = await collection.find_one_and_update(
+        query,
+        {
+            "$set": {"status": "running", "lease_owner": owner, "lease_expires_at": now + timedelta(seconds=lease_ttl), "started_at": now, "heartbeat_at": now, "updated_at": now},
+            "$inc": {"attempts": 1}
+        },
+        sort=[("run_after", ASCENDING)],
+        return_document=ReturnDocument.AFTER
     )
+    if job is not None:
+        publish_job_status(job)
+    return job
+
+async def heartbeat_job(job_id, owner: str, lease_ttl: float, progress: dict = None):
+    # lease를 연장하고 진행 상황을 기록, lease를 잃었으면 None을 반환
+    collection = await get_collection("jobs")
+    now = datetime.utcnow()
+    update = {"lease_expires_at": now + timedelta(seconds=lease_ttl), "heartbeat_at": now, "updated_at": now}
+    if progress is not None:
+        update["progress"] = progress
+    job = await collection.find_one_and_update(
+        {"_id": job_id, "lease_owner": owner, "status": "running"},
+        {"$set": update},
+        return_document=ReturnDocument.AFTER
+    )
+    if job is not None and progress is not None:
+        publish_job_status(job)
+    return job
+
+async def finish_job(job_id, owner: str, status: str, result=None, error: str = None):
+    collection = await get_collection("jobs")
+    now = datetime.utcnow()
+    job = await collection.find_one_and_update(
+        {"_id": job_id, "lease_owner": owner},
+        {
+            "$set": {"status": status, "result": result, "error": error, "finished_at": now, "updated_at": now, "expires_at": now + timedelta(seconds=settings.JOB_RETENTION)},
+            "$unset": {"active_key": "", "lease_owner": "", "lease_expires_at": ""}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if job is not None:
+        publish_job_status(job)
+    return job
+
+async def retry_job(job_id, owner: str, error: str, run_after: datetime):
+    collection = await get_collection("jobs")
+    job = await collection.find_one_and_update(
+        {"_id": job_id, "lease_owner": owner},
+        {
+            "$set": {"status": "queued", "error": error, "run_after": run_after, "updated_at": datetime.utcnow()},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if job is not None:
+        publish_job_status(job)
+    return job
+
+async def requeue_job(job_id, owner: str):
+    # 워커 종료로 중단된 작업은 실패로 세지 않고 바로 다른 워커가 가져가도록 되돌림
+    collection = await get_collection("jobs")
+    now = datetime.utcnow()
+    await collection.update_one(
+        {"_id": job_id, "lease_owner": owner},
+        {
+            "$set": {"status": "queued", "run_after": now, "updated_at": now},
+            "$inc": {"attempts": -1},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        }
+    )
+
+async def get_job(job_id: str):
+    object_id = parse_object_id(job_id)
+    if object_id is None:
+        return None
+    collection = await get_collection("jobs")
+    return await collection.find_one({"_id": object_id})
+
+async def list_jobs(test_id: int = None, subject_id: int = None, status: str = None, kind: str = None, limit: int = 50):
+    collection = await get_collection("jobs")
+    query = {}
+    if test_id is not None:
+        query["testId"] = int(test_id)
+    if subject_id is not None:
+        query["subjectId"] = int(subject_id)
+    if status:
+        query["status"] = status
+    if kind:
+        query["kind"] = kind
+    cursor = collection.find(query).sort("created_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+async def cancel_job(job_id: str):
+    # 대기 중인 작업은 바로 취소하고, 실행 중인 작업은 표시만 해 두면 워커가 다음 heartbeat에서 중단
+    object_id = parse_object_id(job_id)
+    if object_id is None:
+        return None
+    collection = await get_collection("jobs")
+    now = datetime.utcnow()
+    job = await collection.find_one_and_update(
+        {"_id": object_id, "status": "queued"},
+        {
+            "$set": {"status": "cancelled", "cancel_requested": True, "finished_at": now, "updated_at": now, "expires_at": now + timedelta(seconds=settings.JOB_RETENTION)},
+            "$unset": {"active_key": ""}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if job is None:
+        job = await collection.find_one_and_update(
+            {"_id": object_id, "status": "running"},
+            {"$set": {"cancel_requested": True, "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+    if job is None:
+        return await collection.find_one({"_id": object_id})
+    publish_job_status(job)
+    return job
+
+def local_events_enabled():
+    # change stream 모드에서는 watch_progress_changes가 발행하므로 쓰기 경로에서는 발행하지 않음
+    return settings.EVENT_SOURCE == "local" and event_bus.has_subscribers()
+
+def model_status_event(model: dict):
+    return {
+        "testId": model["testId"],
+        "subjectId": model["subjectId"],
+        "level": model["level"],
+        "status": model.get("status"),
+        "fine_tuned_model": model.get("fine_tuned_model"),
+        "job_id": model.get("job_id"),
+    }
+
+def publish_model_status(model: dict, force: bool = False):
+    if force or local_events_enabled():
+        event_bus.publish("model_status", model_status_event(model))
+
+def job_status_event(job: dict):
+    return {
+        "job_id": str(job["_id"]),
+        "kind": job["kind"],
+        "testId": job["testId"],
+        "subjectId": job["subjectId"],
+        "level": job["level"],
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "progress": job.get("progress"),
+        "error": job.get("error"),
+    }
+
+def publish_job_status(job: dict, force: bool = False):
+    if force or local_events_enabled():
+        event_bus.publish("job", job_status_event(job))
+
+async def publish_answers_progress(test_id: str, subject_id: str, level: str, force: bool = False):
+    # 구독자가 없으면 개수 조회도 하지 않음
+    if level not in ANSWER_LEVELS or not (force or local_events_enabled()):
+        return
+    level_answers_collection = await get_collection("level_answers")
+    count = await level_answers_collection.count_documents({"testId": int(test_id), "subjectId": int(subject_id), "level": level})
+    total = await get_total_questions_count(test_id, subject_id)
+    event_bus.publish("answers_progress", {
+        "testId": int(test_id),
+        "subjectId": int(subject_id),
+        "level": level,
+        "count": count,
+        "total": total,
+        "answers_status": level_answers_status(count, total),
+    })
+
+async def watch_progress_changes():
+    # EVENT_SOURCE=change_stream: 레플리카셋의 change stream으로 모든 워커의 변경을 받아 발행
+    llm_models_collection = await get_collection("llm_models")
+    level_answers_collection = await get_collection("level_answers")
+    jobs_collection = await get_collection("jobs")
+
+    async def watch_models():
+        async with llm_models_collection.watch(full_document="updateLookup") as stream:
+            async for change in stream:
+                if change.get("fullDocument"):
+                    publish_model_status(change["fullDocument"], force=True)
+
+    async def watch_level_answers():
+        async with level_answers_collection.watch(full_document="updateLookup") as stream:
+            async for change in stream:
+                answer = change.get("fullDocument")
+                if answer:
+                    await publish_answers_progress(answer["testId"], answer["subjectId"], answer["level"], force=True)
+
+    async def watch_jobs():
+        async with jobs_collection.watch(full_document="updateLookup") as stream:
+            async for change in stream:
+                if change.get("fullDocument"):
+                    publish_job_status(change["fullDocument"], force=True)
+
+    await asyncio.gather(watch_models(), watch_level_answers(), watch_jobs())
 
 async def get_system_prompt(level: str):
-    collection = await get_collection("prompts")
-    prompt = await collection.find_one({"level": level})
-    return prompt["system_prompt"]
+    async def load():
+        collection = await get_collection("prompts")
+        prompt = await collection.find_one({"level": level})
+        return prompt["system_prompt"]
+    return await read_cache.get_or_load(prompt_cache_key(level), load)
 
 async def save_level_answer(test_id: str, subject_id: str, level: str, answer_data: dict):
     collection = await get_collection("level_answers")
@@ -197,13 +1028,185 @@ async def save_level_answer(test_id: str, subject_id: str, level: str, answer_da
         {"$set": document},
         upsert=True
     )
+    # standard_/normal_ 답변도 해당 레벨의 평가 결과에 영향을 줌
+    await invalidate_evaluation_results(test_id, subject_id, answer_data["question_num"], level.split("_")[-1])
+    await publish_answers_progress(test_id, subject_id, level)
 
-async def get_level_answers(test_id: str, subject_id: str, level: str):
+async def bulk_save_level_answers(test_id: str, subject_id: str, level: str, answers: list):
+    # save_level_answer와 같은 upsert를 bulk_write 한 번으로 처리
+    if not answers:
+        return
     collection = await get_collection("level_answers")
-    cursor = collection.find({
+    operations = []
+    for answer_data in answers:
+        document = {
+            "testId": int(test_id),
+            "subjectId": int(subject_id),
+            "level": level,
+            "question_num": answer_data["question_num"],
+            "answer": answer_data["answer"],
+            "test_month": answer_data["test_month"],
+            "subject_name": answer_data["subject_name"]
+        }
+        operations.append(UpdateOne(
+            {"testId": int(test_id), "subjectId": int(subject_id), "level": level, "question_num": answer_data["question_num"]},
+            {"$set": document},
+            upsert=True
+        ))
+    await collection.bulk_write(operations, ordered=False)
+    await invalidate_evaluation_results(test_id, subject_id, [a["question_num"] for a in answers], level.split("_")[-1])
+    await publish_answers_progress(test_id, subject_id, level)
+
+async def get_level_answer_question_nums(test_id: str, subject_id: str, level: str):
+    # 답변이 이미 저장된 문항 번호 (재개 시 건너뛰기 위함)
+    collection = await get_collection("level_answers")
+    cursor = collection.find(
+        {"testId": int(test_id), "subjectId": int(subject_id), "level": level, "answer": {"$nin": [None, ""]}},
+        {"_id": 0, "question_num": 1}
+    )
+    return {str(d["question_num"]) for d in await cursor.to_list(length=None)}
+
+def question_num_variants(question_nums: list):
+    # question_num은 저장 경로에 따라 문자열 또는 정수로 저장되어 있음
+    variants = []
+    for question_num in question_nums:
+        variants.append(str(question_num))
+        if str(question_num).isdigit():
+            variants.append(int(question_num))
+    return variants
+
+async def get_level_answers(test_id: str, subject_id: str, level: str, question_nums: list = None):
+    collection = await get_collection("level_answers")
+    query = {
         "testId": int(test_id),
         "subjectId": int(subject_id),
         "level": level
-    })
-    answers = await cursor.to_list(length=None)
-    return json.loads(json.dumps(answers, cls=JSONEncoder))
+    }
+    if question_nums is not None:
+        query["question_num"] = {"$in": question_num_variants(question_nums)}
+    cursor = collection.find(query, {"_id": 0})
+    return await cursor.to_list(length=None)
+
+
+async def get_cached_embeddings(keys: list):
+    collection = await get_collection("embedding_cache")
+    cursor = collection.find({"_id": {"$in": keys}}, {"_id": 1, "dim": 1, "vector": 1})
+    documents = await cursor.to_list(length=None)
+    if documents:
+        await collection.update_many(
+            {"_id": {"$in": [d["_id"] for d in documents]}},
+            {"$set": {"last_used_at": datetime.utcnow()}}
+        )
+    return {d["_id"]: (bytes(d["vector"]), d["dim"]) for d in documents}
+
+async def save_cached_embeddings(model_name: str, entries: dict):
+    # entries: {key: float32 bytes}
+    if not entries:
+        return
+    collection = await get_collection("embedding_cache")
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"_id": key},
+            {
+                "$setOnInsert": {"model": model_name, "dim": len(vector) // 4, "vector": Binary(vector), "created_at": now},
+                "$set": {"last_used_at": now}
+            },
+            upsert=True
+        )
+        for key, vector in entries.items()
+    ]
+    await collection.bulk_write(operations, ordered=False)
+
+async def evict_cached_embeddings(max_documents: int):
+    # 가장 오래 사용되지 않은 임베딩부터 삭제하여 저장소 크기를 제한
+    collection = await get_collection("embedding_cache")
+    total = await collection.estimated_document_count()
+    overflow = total - max_documents
+    if overflow <= 0:
+        return 0
+    cursor = collection.find({}, {"_id": 1}).sort("last_used_at", 1).limit(overflow)
+    stale_ids = [d["_id"] for d in await cursor.to_list(length=None)]
+    result = await collection.delete_many({"_id": {"$in": stale_ids}})
+    return result.deleted_count
+
+async def get_cached_llm_response(key: str):
+    # TTL 모니터는 주기적으로 돌기 때문에 만료 시각도 직접 확인
+    collection = await get_collection("llm_cache")
+    now = datetime.utcnow()
+    document = await collection.find_one_and_update(
+        {"_id": key, "expires_at": {"$gt": now}},
+        {"$set": {"last_used_at": now}},
+        projection={"_id": 0, "content": 1}
+    )
+    return document["content"] if document else None
+
+async def save_cached_llm_response(key: str, model: str, content: str, ttl_seconds: float):
+    collection = await get_collection("llm_cache")
+    now = datetime.utcnow()
+    await collection.update_one(
+        {"_id": key},
+        {"$set": {"model": model, "content": content, "created_at": now, "last_used_at": now, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+        upsert=True
+    )
+
+async def evict_cached_llm_responses(max_documents: int):
+    # 가장 오래 사용되지 않은 응답부터 삭제하여 저장소 크기를 제한
+    collection = await get_collection("llm_cache")
+    total = await collection.estimated_document_count()
+    overflow = total - max_documents
+    if overflow <= 0:
+        return 0
+    cursor = collection.find({}, {"_id": 1}).sort("last_used_at", 1).limit(overflow)
+    stale_ids = [d["_id"] for d in await cursor.to_list(length=None)]
+    result = await collection.delete_many({"_id": {"$in": stale_ids}})
+    return result.deleted_count
+
+async def get_evaluation_results(test_id: str, subject_id: str, level: str):
+    collection = await get_collection("evaluation_results")
+    cursor = collection.find(
+        {"testId": int(test_id), "subjectId": int(subject_id), "level": level},
+        {"_id": 0, "testId": 0, "subjectId": 0, "level": 0}
+    )
+    return await cursor.to_list(length=None)
+
+async def save_evaluation_results(test_id: str, subject_id: str, level: str, config_key: str, rows: list, versions: dict):
+    # versions: 답변을 읽기 전에 조회한 문항별 version (행이 없었으면 None)
+    # 계산하는 동안 답변이 저장되어 version이 올라간 행은 덮어쓰지 않고 stale로 남겨 다음 조회에서 다시 계산
+    if not rows:
+        return 0
+    collection = await get_collection("evaluation_results")
+    now = datetime.utcnow()
+    operations = []
+    for row in rows:
+        version = versions.get(row["question_num"])
+        operations.append(UpdateOne(
+            {
+                "testId": int(test_id), "subjectId": int(subject_id), "level": level, "question_num": row["question_num"],
+                "version": version if version is not None else {"$exists": False}
+            },
+            {"$set": {**{k: v for k, v in row.items() if k != "version"}, "config_key": config_key, "stale": False, "updated_at": now}},
+            upsert=True
+        ))
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # version이 바뀐 행은 조건에 맞지 않아 upsert가 unique 인덱스와 충돌함
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        return len(errors)
+    return 0
+
+async def invalidate_evaluation_results(test_id: str, subject_id: str, question_num, level: str = None):
+    # 답변이 저장되면 해당 문항의 평가 결과만 stale로 표시하고 version을 올림 (question_num은 단일 값 또는 목록)
+    collection = await get_collection("evaluation_results")
+    query = {"testId": int(test_id), "subjectId": int(subject_id)}
+    question_nums = [str(num) for num in question_num] if isinstance(question_num, list) else [str(question_num)]
+    update = {"$set": {"stale": True}, "$inc": {"version": 1}}
+    if level:
+        # 아직 평가 결과가 없는 문항도 stale 행을 만들어 두어 진행 중인 계산이 이전 답변의 점수를 저장하지 못하게 함
+        operations = [UpdateOne({**query, "level": level, "question_num": num}, update, upsert=True) for num in question_nums]
+        await collection.bulk_write(operations, ordered=False)
+    else:
+        await collection.update_many({**query, "question_num": {"$in": question_nums}}, update)
@@ -0,0 +1,213 @@
+from app.core.config import settings
+from app.services import compute_worker
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import multiprocessing
+import os
+import numpy as np
+
+class ComputeQueueFull(Exception):
+    pass
+
+class ComputePool:
+    # 임베딩 인코딩/어휘 유사도 계산을 이벤트 루프 밖의 워커 프로세스에서 실행
+    # 동시에 들어온 인코딩 요청은 하나의 배치로 합치고, 대기 작업이 queue_size를 넘으면 호출한 쪽을 기다리게 함
+    def __init__(self, workers: int, queue_size: int, queue_timeout: float, coalesce_window: float, max_batch_texts: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.coalesce_window = coalesce_window
+        self.max_batch_texts = max_batch_texts
+        self._executor = None
+        self._queue = None
+        self._capacity = None
+        self._slots = None
+        self._dispatcher = None
+        self._batches = set()
+        self.pending = 0
+        self.jobs = 0
+        self.texts = 0
+        self.batches = 0
+        self.batch_texts = 0
+        self.coalesced_jobs = 0
+        self.deduplicated_texts = 0
+        self.tasks = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def _create_executor(self):
+        if self.workers > 0:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=compute_worker.init_worker,
+                initargs=(settings.EMBEDDING_MODEL_NAME, settings.EMBEDDING_BATCH_SIZE, threads),
+            )
+        # 0이면 메인 프로세스의 스레드에서 실행 (테스트/벤치마크에서 set_embedding_model로 주입한 모델 사용)
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+
+    def _encode_function(self):
+        if self.workers > 0:
+            return compute_worker.encode_texts
+        from app.services.embedding_service import encode_texts
+        return encode_texts
+
+    def start(self):
+        if self._dispatcher is None:
+            self._executor = self._create_executor()
+            self._queue = asyncio.Queue()
+            self._capacity = asyncio.Semaphore(self.queue_size)
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        for task in list(self._batches):
+            task.cancel()
+        await asyncio.gather(self._dispatcher, *self._batches, return_exceptions=True)
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._dispatcher = None
+
+    async def warmup(self):
+        # 워커 프로세스를 모두 띄워 모델 로드를 첫 요청 전에 끝냄
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.workers > 0:
+            await asyncio.gather(*[loop.run_in_executor(self._executor, compute_worker.ping) for _ in range(self.workers)])
+        else:
+            from app.services.embedding_service import warmup_embedding_model
+            await loop.run_in_executor(self._executor, warmup_embedding_model)
+
+    async def _acquire_capacity(self):
+        try:
+            await asyncio.wait_for(self._capacity.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ComputeQueueFull(f"임베딩 작업 대기열이 가득 찼습니다. ({self.queue_size}개 대기 중)")
+        self.pending += 1
+
+    def _release_capacity(self):
+        self.pending -= 1
+        self._capacity.release()
+
+    async def encode(self, texts: list) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        self.start()
+        await self._acquire_capacity()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait((list(texts), future))
+            self.jobs += 1
+            self.texts += len(texts)
+            return await future
+        finally:
+            self._release_capacity()
+
+    async def run(self, function, *args):
+        # 배치로 합칠 수 없는 계산(시험/레벨 단위 어휘 유사도 등)을 워커에서 그대로 실행
+        self.start()
+        await self._acquire_capacity()
+        try:
+            async with self._slots:
+                self.tasks += 1
+                return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self._release_capacity()
+
+    async def lexical_similarities(self, reference_texts: list, *candidate_texts_lists: list, mode: str = None) -> list:
+        mode = mode or settings.LEXICAL_SIMILARITY_MODE
+        return await self.run(compute_worker.lexical_similarities, list(reference_texts), [list(c) for c in candidate_texts_lists], mode)
+
+    async def _dispatch(self):
+        # 워커가 비면 그동안 쌓인 요청을 max_batch_texts까지 모으고, coalesce_window 동안 더 들어오는 요청도 합침
+        # (슬롯은 첫 요청을 받은 뒤에 잡아야 run()으로 들어온 작업이 빈 대기열 때문에 막히지 않음)
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            await self._slots.acquire()
+            try:
+                count = len(jobs[0][0])
+                deadline = loop.time() + self.coalesce_window
+                while count < self.max_batch_texts:
+                    if not self._queue.empty():
+                        job = self._queue.get_nowait()
+                    else:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            job = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    jobs.append(job)
+                    count += len(job[0])
+            except BaseException:
+                self._slots.release()
+                for _, future in jobs:
+                    future.cancel()
+                raise
+            task = asyncio.create_task(self._run_batch(jobs))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, jobs: list):
+        try:
+            # 여러 요청에 같은 텍스트가 있으면 한 번만 인코딩
+            texts = list(dict.fromkeys(text for job_texts, _ in jobs for text in job_texts))
+            self.batches += 1
+            self.batch_texts += len(texts)
+            self.deduplicated_texts += sum(len(job_texts) for job_texts, _ in jobs) - len(texts)
+            if len(jobs) > 1:
+                self.coalesced_jobs += len(jobs)
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_function(), texts)
+            index = {text: i for i, text in enumerate(texts)}
+            for job_texts, future in jobs:
+                if not future.done():
+                    future.set_result(vectors[[index[text] for text in job_texts]])
+        except asyncio.CancelledError:
+            for _, future in jobs:
+                future.cancel()
+            raise
+        except Exception as e:
+            self.errors += 1
+            for _, future in jobs:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "mode": "process" if self.workers > 0 else "thread",
+            "workers": self.workers,
+            "running": self._dispatcher is not None,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running_batches": len(self._batches),
+            "jobs": self.jobs,
+            "texts": self.texts,
+            "batches": self.batches,
+            "avg_batch_texts": self.batch_texts / self.batches if self.batches else 0.0,
+            "coalesced_jobs": self.coalesced_jobs,
+            "deduplicated_texts": self.deduplicated_texts,
+            "tasks": self.tasks,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+compute_pool = ComputePool(
+    settings.EMBEDDING_WORKERS,
+    settings.EMBEDDING_QUEUE_SIZE,
+    settings.EMBEDDING_QUEUE_TIMEOUT,
+    settings.EMBEDDING_COALESCE_WINDOW,
+    settings.EMBEDDING_MAX_BATCH_TEXTS,
+)
@@ -0,0 +1,26 @@
+import os
+import numpy as np
+
+# 계산 풀의 워커 프로세스에서 실행되는 함수 (spawn으로 시작하므로 이 모듈은 가볍게 유지)
+_model = None
+_batch_size = 64
+
+def init_worker(model_name: str, batch_size: int, threads: int):
+    # 프로세스마다 한 번 모델을 로드하고, 코어를 워커 수만큼 나눠 쓰도록 torch 스레드 수를 제한
+    global _model, _batch_size
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(threads)
+    _batch_size = batch_size
+    _model = SentenceTransformer(model_name)
+    _model.encode(["warmup"], batch_size=1)
+
+def ping():
+    return os.getpid()
+
+def encode_texts(texts: list) -> np.ndarray:
+    return np.asarray(_model.encode(texts, batch_size=_batch_size, convert_to_numpy=True), dtype=np.float32)
+
+def lexical_similarities(reference_texts: list, candidate_texts_lists: list, mode: str) -> list:
+    from app.services.similarity_service import lexical_similarities
+    return lexical_similarities(reference_texts, *candidate_texts_lists, mode=mode)
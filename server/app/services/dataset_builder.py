@@ -0,0 +1,89 @@
+from app.core.config import settings
+from app.db.database import iter_questions_by_info, iter_answer_texts
+from app.services.llm_client import estimate_tokens
+import hashlib
+import json
+import tempfile
+
+TRAINING_SYSTEM_PROMPT = "당신은 영어 문제에 대한 해설을 제공하는 AI 튜터입니다."
+MAX_REPORTED_ERRORS = 20
+
+def build_training_record(question: dict, answer: str):
+    return {
+        "messages": [
+            {"role": "system", "content": TRAINING_SYSTEM_PROMPT},
+            {"role": "user", "content": f"문제: {question['question']}\n내용: {question['content']}\n선택지: {json.dumps(question['choices'], ensure_ascii=False)}"},
+            {"role": "assistant", "content": f"해설: {answer}"}
+        ]
+    }
+
+def validate_training_record(record: dict, tokens: int):
+    # OpenAI 업로드 단계에서야 발견되는 형식 오류를 미리 걸러냄
+    messages = record.get("messages") or []
+    if not messages or messages[-1]["role"] != "assistant":
+        return "마지막 메시지가 assistant가 아닙니다."
+    for message in messages:
+        if message["role"] not in ("system", "user", "assistant"):
+            return f"지원하지 않는 role입니다: {message['role']}"
+        if not isinstance(message["content"], str) or not message["content"].strip():
+            return f"{message['role']} 메시지 내용이 비어 있습니다."
+    if tokens > settings.TRAINING_MAX_EXAMPLE_TOKENS:
+        return f"예제 토큰 수({tokens})가 최대값({settings.TRAINING_MAX_EXAMPLE_TOKENS})을 넘습니다."
+    return None
+
+async def write_training_dataset(test_id: str, subject_id: str, level: str, output):
+    # 답변은 question_num으로 색인하고 문항은 커서에서 하나씩 읽어 바로 JSONL로 기록
+    answers = {}
+    async for answer in iter_answer_texts(test_id, subject_id, f"{level}_answer"):
+        # 같은 문항 번호가 여러 개면 처음 것을 사용 (기존 next() 조회와 동일)
+        answers.setdefault(str(answer["question_num"]), answer.get("answer") or "")
+
+    # 같은 데이터와 기반 모델이면 같은 지문이 나오므로 중복 업로드/학습을 건너뛸 수 있음
+    fingerprint = hashlib.sha256(f"{settings.FINETUNING_BASE_MODEL}\0".encode("utf-8"))
+    stats = {
+        "questions": 0,
+        "examples": 0,
+        "skipped": 0,
+        "invalid": 0,
+        "errors": [],
+        "total_tokens": 0,
+        "max_example_tokens": 0,
+        "bytes": 0,
+    }
+    async for question in iter_questions_by_info(test_id, subject_id):
+        stats["questions"] += 1
+        question_num = str(question["question_number"])
+        answer = answers.get(question_num, "")
+        if not answer.strip():
+            stats["skipped"] += 1
+            continue
+
+        record = build_training_record(question, answer)
+        tokens = estimate_tokens(record["messages"])
+        error = validate_training_record(record, tokens)
+        if error:
+            stats["invalid"] += 1
+            if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                stats["errors"].append({"question_num": question_num, "error": error})
+            continue
+
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        output.write(line)
+        fingerprint.update(line)
+        stats["examples"] += 1
+        stats["bytes"] += len(line)
+        stats["total_tokens"] += tokens
+        stats["max_example_tokens"] = max(stats["max_example_tokens"], tokens)
+    stats["fingerprint"] = fingerprint.hexdigest()
+    return stats
+
+async def build_training_file(test_id: str, subject_id: str, level: str):
+    # 작은 데이터셋은 메모리에, 설정값을 넘으면 디스크로 넘어가는 임시 파일 (호출한 쪽에서 닫아야 함)
+    training_file = tempfile.SpooledTemporaryFile(max_size=settings.TRAINING_SPOOL_MAX_BYTES, mode="w+b")
+    try:
+        stats = await write_training_dataset(test_id, subject_id, level, training_file)
+    except Exception:
+        training_file.close()
+        raise
+    training_file.seek(0)
+    return training_file, stats
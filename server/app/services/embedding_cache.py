@@ -0,0 +1,82 @@
+from app.core.config import settings
+from app.db.database import get_cached_embeddings, save_cached_embeddings, evict_cached_embeddings
+from collections import OrderedDict
+import hashlib
+import numpy as np
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    # 메모리 LRU -> MongoDB(embedding_cache) 순으로 조회하고, 둘 다 없는 텍스트만 인코딩
+    def __init__(self, memory_size: int, max_documents: int):
+        self.memory_size = memory_size
+        self.max_documents = max_documents
+        self._memory = OrderedDict()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.store_evictions = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    async def get_embeddings(self, texts: list, model_name: str, encode) -> np.ndarray:
+        keys = [embedding_cache_key(model_name, text) for text in texts]
+        found = {}
+
+        for key in set(keys):
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+        self.memory_hits += sum(1 for key in keys if key in found)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            stored = await get_cached_embeddings(missing)
+            for key, (vector, dim) in stored.items():
+                found[key] = np.frombuffer(vector, dtype="<f4", count=dim)
+                self._remember(key, found[key])
+            self.store_hits += sum(1 for key in keys if key in stored)
+
+        # 새로 추가되거나 수정된 답변만 배치로 인코딩
+        to_encode = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in to_encode:
+                to_encode[key] = text
+        if to_encode:
+            self.misses += sum(1 for key in keys if key in to_encode)
+            encoded = await encode(list(to_encode.values()))
+            new_entries = {}
+            for key, vector in zip(to_encode.keys(), encoded):
+                vector = np.asarray(vector, dtype="<f4")
+                found[key] = vector
+                self._remember(key, vector)
+                new_entries[key] = vector.tobytes()
+            await save_cached_embeddings(model_name, new_entries)
+            self.store_evictions += await evict_cached_embeddings(self.max_documents)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([found[key] for key in keys])
+
+    def stats(self):
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.store_hits) / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "memory_capacity": self.memory_size,
+            "memory_evictions": self.memory_evictions,
+            "store_capacity": self.max_documents,
+            "store_evictions": self.store_evictions,
+        }
+
+embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_MEMORY_SIZE, settings.EMBEDDING_CACHE_MAX_DOCUMENTS)
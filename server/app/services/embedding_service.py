@@ -0,0 +1,67 @@
+from app.core.config import settings
+from app.services.embedding_cache import embedding_cache
+from app.services.compute_pool import compute_pool
+import numpy as np
+import threading
+
+# 프로세스당 한 번만 로드되는 임베딩 모델
+_model = None
+_model_lock = threading.Lock()
+
+def get_embedding_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                # torch를 함께 불러오므로 실제로 모델이 필요한 시점까지 import를 미룸
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+    return _model
+
+def set_embedding_model(model):
+    # 테스트/벤치마크에서 encode()를 가진 대체 모델을 주입
+    global _model
+    _model = model
+
+def warmup_embedding_model():
+    # 첫 요청에서 모델 로드/초기화 비용이 발생하지 않도록 미리 한 번 인코딩
+    model = get_embedding_model()
+    model.encode(["warmup"], batch_size=1)
+
+def encode_texts(texts: list) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    model = get_embedding_model()
+    return np.asarray(
+        model.encode(list(texts), batch_size=settings.EMBEDDING_BATCH_SIZE, convert_to_numpy=True),
+        dtype=np.float32
+    )
+
+def rowwise_cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # a[i]와 b[i] 사이의 코사인 유사도를 한 번의 행렬 연산으로 계산 (영벡터는 0으로 처리)
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    dots = np.einsum("ij,ij->i", a, b)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+async def encode_texts_cached(texts: list) -> np.ndarray:
+    # 캐시에 없는 텍스트만 계산 풀에서 인코딩 (키: hash(모델 이름, 텍스트))
+    return await embedding_cache.get_embeddings(texts, settings.EMBEDDING_MODEL_NAME, compute_pool.encode)
+
+async def semantic_similarities(reference_texts: list, *candidate_texts_lists: list) -> list:
+    # 기준 답변과 여러 후보 답변 목록을 한 번의 배치 인코딩으로 처리
+    n = len(reference_texts)
+    all_texts = list(reference_texts)
+    for candidates in candidate_texts_lists:
+        all_texts.extend(candidates)
+    if n == 0:
+        return [[] for _ in candidate_texts_lists]
+
+    embeddings = await encode_texts_cached(all_texts)
+    reference = embeddings[:n]
+    results = []
+    for i in range(len(candidate_texts_lists)):
+        candidates = embeddings[n * (i + 1):n * (i + 2)]
+        results.append(rowwise_cosine_similarity(reference, candidates).tolist())
+    return results
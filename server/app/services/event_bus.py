@@ -0,0 +1,39 @@
+from app.core.config import settings
+import asyncio
+
+class EventBus:
+    # 프로세스 내 구독자에게 (event, data)를 전달, 느린 구독자는 가장 오래된 이벤트부터 버림
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, event: str, data: dict):
+        self.published += 1
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait((event, data))
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "source": settings.EVENT_SOURCE,
+        }
+
+event_bus = EventBus(settings.EVENT_QUEUE_SIZE)
@@ -0,0 +1,157 @@
+from app.core.config import settings
+from app.db.database import get_pending_finetuning_jobs, bulk_update_llm_model_status, acquire_lease, release_lease
+from app.services.llm_client import get_llm_client, call_llm
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+def normalize_job_status(status: str):
+    if status == "queued":
+        return "pending"
+    if status in ["validating_files", "running", "succeeded", "failed", "cancelled"]:
+        return status
+    return "unknown"
+
+class OpenAIFinetuningJobs:
+    # 작업마다 retrieve하지 않고 최근 작업 목록을 페이지 단위로 읽어 한 번에 상태를 확인
+    def __init__(self, client=None, max_pages: int = None):
+        self.client = client
+        self.max_pages = max_pages or settings.FINETUNING_POLL_LIST_PAGES
+
+    async def fetch(self, job_ids: list):
+        client = self.client or get_llm_client()
+        wanted = set(job_ids)
+        jobs = {}
+        page = await call_llm("fine_tuning.jobs.list", lambda: client.fine_tuning.jobs.list(limit=100))
+        for page_num in range(self.max_pages):
+            for job in page.data:
+                if job.id in wanted:
+                    jobs[job.id] = {"status": job.status, "fine_tuned_model": job.fine_tuned_model}
+            if len(jobs) == len(wanted) or page_num == self.max_pages - 1 or not page.has_next_page():
+                break
+            page = await call_llm("fine_tuning.jobs.list", page.get_next_page)
+
+        # 목록 범위 밖의 오래된 작업만 개별 조회
+        for job_id in wanted - jobs.keys():
+            job = await call_llm("fine_tuning.jobs.retrieve", lambda: client.fine_tuning.jobs.retrieve(job_id))
+            jobs[job.id] = {"status": job.status, "fine_tuned_model": job.fine_tuned_model}
+        return jobs
+
+class FinetuningPoller:
+    # lifespan이 소유하는 단일 폴러, 여러 워커 중 Mongo lease를 가진 하나만 실제로 폴링
+    LEASE_NAME = "finetuning_poller"
+
+    def __init__(self, job_api=None, min_interval: float = None, max_interval: float = None, lease_ttl: float = None):
+        self.job_api = job_api or OpenAIFinetuningJobs()
+        self.min_interval = min_interval or settings.FINETUNING_POLL_MIN_INTERVAL
+        self.max_interval = max_interval or settings.FINETUNING_POLL_MAX_INTERVAL
+        self.lease_ttl = lease_ttl or settings.FINETUNING_LEASE_TTL
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.interval = self.min_interval
+        self.is_leader = False
+        self.known_job_ids = set()
+        self.polls = 0
+        self.updates = 0
+        self.errors = 0
+        self.last_poll_at = None
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def notify(self):
+        # 새 작업이 생기면 백오프를 초기화하고 바로 폴링
+        self.interval = self.min_interval
+        self._wake.set()
+
+    async def has_new_jobs(self):
+        # 다른 프로세스(manage.py worker 등)에서 만든 작업은 notify로 깨울 수 없으므로 DB에서 확인
+        jobs = await get_pending_finetuning_jobs()
+        return bool({job["job_id"] for job in jobs} - self.known_job_ids)
+
+    async def poll_once(self):
+        jobs = await get_pending_finetuning_jobs()
+        job_ids = {job["job_id"] for job in jobs}
+        if job_ids - self.known_job_ids:
+            self.interval = self.min_interval
+        self.known_job_ids = job_ids
+        if not jobs:
+            return 0
+
+        remote_jobs = await self.job_api.fetch(list(job_ids))
+        updates = []
+        for job in jobs:
+            remote = remote_jobs.get(job["job_id"])
+            if remote is None:
+                continue
+            status = normalize_job_status(remote["status"])
+            if status != job.get("status") or (remote["fine_tuned_model"] and remote["fine_tuned_model"] != job.get("fine_tuned_model")):
+                updates.append({"job_id": job["job_id"], "status": status, "fine_tuned_model": remote["fine_tuned_model"]})
+
+        await bulk_update_llm_model_status(updates)
+        self.polls += 1
+        self.updates += len(updates)
+        self.last_poll_at = time.time()
+        return len(updates)
+
+    async def run(self):
+        next_poll_at = 0.0
+        while True:
+            try:
+                self.is_leader = await acquire_lease(self.LEASE_NAME, self.owner, self.lease_ttl)
+                if self.is_leader and time.monotonic() < next_poll_at and await self.has_new_jobs():
+                    # 백오프 중이라도 새 미완료 작업이 생기면 바로 폴링 (poll_once가 간격도 최소로 되돌림)
+                    next_poll_at = 0.0
+                if self.is_leader and time.monotonic() >= next_poll_at:
+                    changed = await self.poll_once()
+                    # 변화가 없으면 간격을 두 배로 늘리고, 변화가 있으면 최소 간격으로 복귀
+                    self.interval = self.min_interval if changed else min(self.interval * 2, self.max_interval)
+                    next_poll_at = time.monotonic() + self.interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"Error polling finetuning jobs: {str(e)}")
+                self.interval = min(self.interval * 2, self.max_interval)
+                next_poll_at = time.monotonic() + self.interval
+
+            # lease가 만료되기 전에 갱신할 수 있도록 lease_ttl의 1/3보다 길게 자지 않음
+            wait = self.lease_ttl / 3
+            if self.is_leader:
+                wait = min(wait, max(0.0, next_poll_at - time.monotonic()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                self._wake.clear()
+                next_poll_at = 0.0
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await release_lease(self.LEASE_NAME, self.owner)
+            self.is_leader = False
+
+    def stats(self):
+        return {
+            "owner": self.owner,
+            "is_leader": self.is_leader,
+            "interval": self.interval,
+            "tracked_jobs": len(self.known_job_ids),
+            "polls": self.polls,
+            "updates": self.updates,
+            "errors": self.errors,
+            "last_poll_at": self.last_poll_at,
+        }
+
+finetuning_poller = FinetuningPoller()
@@ -0,0 +1,259 @@
+from app.core.config import settings
+from app.db.database import enqueue_job, claim_job, heartbeat_job, finish_job, retry_job, requeue_job
+from app.services.llm_service import create_finetuning_model, create_finetuned_answers
+from app.utils.utils import test_finetuned_answers
+from datetime import datetime, timedelta
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+JOB_KINDS = ("generation", "evaluation", "finetuning")
+# 배포 역할별로 이 프로세스의 워커가 가져갈 작업 종류 (api 역할은 등록만 하고 실행하지 않음)
+ROLE_JOB_KINDS = {
+    "all": JOB_KINDS,
+    "api": (),
+    "evaluation": ("evaluation",),
+    "llm": ("generation", "finetuning"),
+}
+
+class JobFailed(Exception):
+    # 다시 실행해도 결과가 같은 실패 (재시도하지 않음)
+    pass
+
+# 입력/설정 오류는 llm_service에서 ValueError로 발생
+NON_RETRYABLE_ERRORS = (JobFailed, ValueError)
+
+def worker_job_kinds():
+    if settings.JOB_WORKER_KINDS:
+        return [kind.strip() for kind in settings.JOB_WORKER_KINDS.split(",") if kind.strip()]
+    return list(ROLE_JOB_KINDS.get(settings.APP_ROLE, ()))
+
+def job_idempotency_key(kind: str, test_id, subject_id, level: str) -> str:
+    return f"{kind}:{test_id}:{subject_id}:{level}"
+
+def serialize_job(job: dict):
+    return {
+        "job_id": str(job["_id"]),
+        "kind": job["kind"],
+        "testId": job["testId"],
+        "subjectId": job["subjectId"],
+        "level": job["level"],
+        "params": job.get("params"),
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "max_attempts": job.get("max_attempts"),
+        "cancel_requested": job.get("cancel_requested", False),
+        "progress": job.get("progress"),
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+async def submit_job(kind: str, test_id, subject_id, level: str, params: dict = None):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"지원하지 않는 작업 종류입니다: {kind}")
+    key = job_idempotency_key(kind, test_id, subject_id, level)
+    job, created = await enqueue_job(kind, test_id, subject_id, level, params or {}, key, settings.JOB_MAX_ATTEMPTS)
+    if created:
+        job_worker.notify()
+    return {**serialize_job(job), "deduplicated": not created}
+
+async def run_generation(job: dict, report_progress):
+    params = job["params"]
+    result = await create_finetuned_answers(
+        params["model_id"], job["level"], str(job["testId"]), str(job["subjectId"]),
+        force=params.get("force", False), on_progress=report_progress, use_cache=params.get("use_cache", True)
+    )
+    if result["generated"]:
+        # 평가 결과를 미리 계산해 두어 평가 화면이 바로 열리도록 함
+        await submit_job("evaluation", job["testId"], job["subjectId"], job["level"])
+    if result["failed"]:
+        # 다시 실행하면 실패한 문항만 생성하므로 재시도로 처리
+        raise RuntimeError(result["error"])
+    return result
+
+async def run_evaluation(job: dict, report_progress):
+    result = await test_finetuned_answers(str(job["testId"]), str(job["subjectId"]), job["level"])
+    # 문항별 결과는 evaluation_results에 저장되므로 작업에는 요약만 남김
+    summary = {key: value for key, value in result.items() if key.startswith("avg_")}
+    summary["questions"] = len(result["combined_answers"])
+    return summary
+
+async def run_finetuning(job: dict, report_progress):
+    # 일시적인 OpenAI 오류는 create_finetuning_model이 예외로 올리므로 재시도되고, 검증 실패 등은 error로 반환됨
+    result = await create_finetuning_model(str(job["testId"]), str(job["subjectId"]), job["level"], force=job["params"].get("force", False))
+    if "error" in result:
+        raise JobFailed(result["error"])
+    return result
+
+JOB_HANDLERS = {
+    "generation": run_generation,
+    "evaluation": run_evaluation,
+    "finetuning": run_finetuning,
+}
+
+class JobWorker:
+    # 여러 프로세스/노드의 워커가 jobs 컬렉션에서 lease로 작업을 하나씩 가져와 concurrency개까지 동시에 실행
+    def __init__(self, kinds: list = None, concurrency: int = None, lease_ttl: float = None, poll_interval: float = None):
+        self.kinds = list(kinds) if kinds is not None else worker_job_kinds()
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.lease_ttl = lease_ttl or settings.JOB_LEASE_TTL
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.running = {}
+        self.claimed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.cancelled = 0
+        self.lost = 0
+        self.errors = 0
+        self._wake = asyncio.Event()
+        self._tasks = []
+
+    def notify(self):
+        # 같은 프로세스에서 등록된 작업은 폴링 간격을 기다리지 않고 바로 가져감
+        self._wake.set()
+
+    async def _wait_for_work(self):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            self._wake.clear()
+        except asyncio.TimeoutError:
+            pass
+
+    async def _heartbeat(self, job_id, state: dict, task: asyncio.Task):
+        # 진행 상황이 바뀌었거나 lease_ttl의 1/3이 지나면 lease를 연장
+        last_beat = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.JOB_PROGRESS_INTERVAL)
+            if not state["dirty"] and time.monotonic() - last_beat < self.lease_ttl / 3:
+                continue
+            progress = state["progress"] if state["dirty"] else None
+            state["dirty"] = False
+            try:
+                job = await heartbeat_job(job_id, self.owner, self.lease_ttl, progress)
+            except Exception as e:
+                print(f"Error sending job heartbeat: {str(e)}")
+                continue
+            last_beat = time.monotonic()
+            if job is None:
+                # lease가 만료되어 다른 워커가 가져갔으면 중복 실행하지 않도록 중단
+                state["stop_reason"] = "lost"
+                task.cancel()
+                return
+            if job.get("cancel_requested"):
+                state["stop_reason"] = "cancelled"
+                task.cancel()
+                return
+
+    async def run_job(self, job: dict):
+        job_id = job["_id"]
+        state = {"kind": job["kind"], "progress": None, "dirty": False, "stop_reason": None}
+        self.running[job_id] = state
+        self.claimed += 1
+
+        async def report_progress(event: dict):
+            state["progress"] = event
+            state["dirty"] = True
+
+        if job["attempts"] > job["max_attempts"]:
+            # 실행 중에 워커가 반복해서 죽은 작업
+            self.running.pop(job_id, None)
+            self.failed += 1
+            await finish_job(job_id, self.owner, "failed", error="작업을 실행하던 워커의 lease가 반복해서 만료되었습니다.")
+            return
+
+        task = asyncio.create_task(JOB_HANDLERS[job["kind"]](job, report_progress))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, state, task))
+        try:
+            # 작업을 직접 await하면 워커 종료 취소가 핸들러로 넘어가고, 핸들러가 취소를 삼키면 워커가 멈추지 않음
+            await asyncio.wait({task})
+            result = task.result()
+            await finish_job(job_id, self.owner, "succeeded", result=result)
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling() or state["stop_reason"] is None:
+                # 워커 종료: 다른 워커가 바로 이어받도록 되돌림
+                task.cancel()
+                await requeue_job(job_id, self.owner)
+                raise
+            if state["stop_reason"] == "cancelled":
+                self.cancelled += 1
+                await finish_job(job_id, self.owner, "cancelled", error="사용자가 작업을 취소했습니다.")
+            else:
+                self.lost += 1
+        except NON_RETRYABLE_ERRORS as e:
+            self.failed += 1
+            await finish_job(job_id, self.owner, "failed", error=str(e))
+        except Exception as e:
+            print(f"Error running {job['kind']} job {job_id}: {str(e)}")
+            if job["attempts"] < job["max_attempts"]:
+                self.retried += 1
+                delay = settings.JOB_RETRY_BASE_DELAY * 2 ** (job["attempts"] - 1)
+                await retry_job(job_id, self.owner, str(e), datetime.utcnow() + timedelta(seconds=delay))
+            else:
+                self.failed += 1
+                await finish_job(job_id, self.owner, "failed", error=str(e))
+        finally:
+            heartbeat.cancel()
+            self.running.pop(job_id, None)
+
+    async def _slot(self):
+        while True:
+            try:
+                job = await claim_job(self.owner, self.kinds, self.lease_ttl)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"Error claiming job: {str(e)}")
+                job = None
+            if job is None:
+                await self._wait_for_work()
+                continue
+            try:
+                await self.run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 상태 기록 실패 등: lease가 만료되면 다른 워커가 다시 가져감
+                self.errors += 1
+                print(f"Error finishing job {job['_id']}: {str(e)}")
+
+    def start(self):
+        if not self._tasks and self.kinds:
+            self._tasks = [asyncio.create_task(self._slot()) for _ in range(self.concurrency)]
+
+    async def serve(self):
+        # manage.py worker: 취소될 때까지 실행
+        self.start()
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        return {
+            "owner": self.owner,
+            "kinds": self.kinds,
+            "concurrency": self.concurrency,
+            "active": bool(self._tasks),
+            "running": [{"job_id": str(job_id), "kind": state["kind"], "progress": state["progress"]} for job_id, state in self.running.items()],
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "cancelled": self.cancelled,
+            "lost": self.lost,
+            "errors": self.errors,
+        }
+
+job_worker = JobWorker()
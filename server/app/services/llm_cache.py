@@ -0,0 +1,51 @@
+from app.core.config import settings
+from app.db.database import get_cached_llm_response, save_cached_llm_response, evict_cached_llm_responses
+import hashlib
+import json
+
+def llm_cache_key(model: str, temperature: float, messages: list) -> str:
+    # 키 순서/공백 차이로 다른 키가 나오지 않도록 정규화한 JSON을 해시
+    payload = json.dumps({"model": model, "temperature": temperature, "messages": messages}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    # 같은 (모델, temperature, 메시지) 요청의 응답을 MongoDB(llm_cache)에 저장해 재호출을 건너뜀
+    def __init__(self, ttl: float, max_documents: int):
+        self.ttl = ttl
+        self.max_documents = max_documents
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    async def get(self, key: str, use_cache: bool = True):
+        if not (use_cache and settings.LLM_CACHE_ENABLED):
+            return None
+        content = await get_cached_llm_response(key)
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+
+    async def set(self, key: str, model: str, content: str, use_cache: bool = True):
+        if not (use_cache and settings.LLM_CACHE_ENABLED) or not content:
+            return
+        await save_cached_llm_response(key, model, content, self.ttl)
+        self.writes += 1
+        self.evictions += await evict_cached_llm_responses(self.max_documents)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "ttl": self.ttl,
+            "capacity": self.max_documents,
+        }
+
+llm_response_cache = LLMResponseCache(settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_DOCUMENTS)
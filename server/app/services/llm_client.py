@@ -0,0 +1,269 @@
+from app.core.config import settings
+from app.core.metrics import llm_requests, llm_request_duration, llm_retries, llm_tokens, record_llm_call
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+import asyncio
+import httpx
+import random
+import time
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+class RateLimiter:
+    # 분당 요청 수/토큰 수를 제한하는 토큰 버킷 (0이면 제한 없음)
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    async def acquire(self, tokens: int = 0):
+        async with self._lock:
+            if self.tokens_per_minute:
+                tokens = min(tokens, self.tokens_per_minute)
+            while True:
+                self._refill()
+                request_ready = not self.requests_per_minute or self._requests >= 1
+                tokens_ready = not self.tokens_per_minute or self._tokens >= tokens
+                if request_ready and tokens_ready:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return
+                wait = 0.0
+                if not request_ready:
+                    wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+                if not tokens_ready:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+                await asyncio.sleep(wait)
+
+    def adjust(self, token_delta: int):
+        # 실제 사용량이 추정치와 다를 때 버킷을 보정
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens - token_delta)
+
+def estimate_tokens(messages: list, output_tokens: int = 0) -> int:
+    # 한국어 기준 대략 2자당 1토큰으로 추정
+    return sum(len(m.get("content") or "") for m in messages) // 2 + output_tokens
+
+def is_retryable_error(error: Exception) -> bool:
+    # 오류가 발생했다면 openai는 이미 로드된 상태
+    from openai import APIConnectionError, APITimeoutError, APIStatusError, RateLimitError
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    # Retry-After 헤더가 있으면 따르고, 없으면 full jitter 지수 백오프
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.OPENAI_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * (2 ** attempt)))
+
+class LLMMetrics:
+    # 작업별 호출 수/오류/재시도/지연 시간과 커넥션 풀 사용량
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.operations = {}
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _operation(self, operation: str):
+        if operation not in self.operations:
+            self.operations[operation] = {"calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0, "latencies": deque(maxlen=self.window)}
+        return self.operations[operation]
+
+    def record(self, operation: str, latency: float, error: bool = False):
+        stats = self._operation(operation)
+        stats["calls"] += 1
+        stats["latencies"].append(latency)
+        if error:
+            stats["errors"] += 1
+        llm_requests.inc(operation=operation, status="error" if error else "ok")
+        llm_request_duration.observe(latency, operation=operation)
+        record_llm_call(latency)
+
+    def record_usage(self, operation: str, usage):
+        stats = self._operation(operation)
+        stats["prompt_tokens"] += usage.prompt_tokens or 0
+        stats["completion_tokens"] += usage.completion_tokens or 0
+        llm_tokens.inc(usage.prompt_tokens or 0, operation=operation, type="prompt")
+        llm_tokens.inc(usage.completion_tokens or 0, operation=operation, type="completion")
+
+    def record_retry(self, operation: str):
+        self._operation(operation)["retries"] += 1
+        llm_retries.inc(operation=operation)
+
+    def snapshot(self):
+        operations = {}
+        for operation, stats in self.operations.items():
+            latencies = sorted(stats["latencies"])
+            operations[operation] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "retries": stats["retries"],
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_p50": latencies[int(len(latencies) * 0.5)] if latencies else 0.0,
+                "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+                "latency_max": latencies[-1] if latencies else 0.0,
+            }
+        return {
+            "operations": operations,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": settings.OPENAI_MAX_CONCURRENCY,
+            "pool": pool_snapshot(),
+        }
+
+llm_metrics = LLMMetrics()
+rate_limiter = RateLimiter(settings.OPENAI_MAX_REQUESTS_PER_MINUTE, settings.OPENAI_MAX_TOKENS_PER_MINUTE)
+
+_client = None
+_http_client = None
+_semaphore = None
+
+def create_async_openai_client(http_client: httpx.AsyncClient = None) -> "AsyncOpenAI":
+    # openai는 import 시간이 길어 처음 클라이언트를 만들 때 로드
+    from openai import AsyncOpenAI
+    # 재시도는 call_with_retry에서 처리하므로 SDK 자체 재시도는 끔
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL or None,
+        max_retries=0,
+        timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+        http_client=http_client,
+    )
+
+def _create_shared_client():
+    global _client, _http_client
+    if _client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+        )
+        _client = create_async_openai_client(_http_client)
+    return _client
+
+async def start_llm_client():
+    # lifespan 준비 단계에서 미리 만들어 두면 모든 OpenAI 호출이 keep-alive 커넥션 풀을 공유
+    return _create_shared_client()
+
+async def close_llm_client():
+    global _client, _http_client
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _http_client = None
+
+def get_llm_client() -> "AsyncOpenAI":
+    # 준비 단계에서 만들지 않은 역할(role)의 워커는 처음 필요할 때 생성
+    return _create_shared_client()
+
+def set_llm_client(client: "AsyncOpenAI"):
+    # 테스트/벤치마크에서 가짜 서버용 클라이언트를 주입
+    global _client
+    _client = client
+
+def pool_snapshot():
+    # httpx는 풀 상태를 공개 API로 제공하지 않으므로 가능한 경우에만 보고
+    pool = getattr(getattr(_http_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    snapshot = {
+        "max_connections": settings.OPENAI_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    }
+    if connections is not None:
+        snapshot["open_connections"] = len(connections)
+        snapshot["idle_connections"] = sum(1 for c in connections if c.is_idle())
+    return snapshot
+
+def _get_semaphore():
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+async def call_with_retry(call, max_retries: int = None, operation: str = "openai"):
+    max_retries = settings.OPENAI_MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = retry_delay(e, attempt)
+            llm_metrics.record_retry(operation)
+            print(f"OpenAI 호출 재시도 ({attempt + 1}/{max_retries}, {delay:.1f}초 후): {str(e)}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+@asynccontextmanager
+async def llm_slot():
+    # OPENAI_MAX_CONCURRENCY개까지만 동시에 OpenAI를 호출
+    semaphore = _get_semaphore()
+    llm_metrics.waiting += 1
+    try:
+        await semaphore.acquire()
+    finally:
+        llm_metrics.waiting -= 1
+    llm_metrics.in_flight += 1
+    try:
+        yield
+    finally:
+        llm_metrics.in_flight -= 1
+        semaphore.release()
+
+async def call_llm(operation: str, call, max_retries: int = None):
+    # 동시 호출 수를 제한하고 지연 시간/오류를 기록하는 공통 진입점
+    async with llm_slot():
+        started = time.perf_counter()
+        try:
+            result = await call_with_retry(call, max_retries, operation)
+        except Exception:
+            llm_metrics.record(operation, time.perf_counter() - started, error=True)
+            raise
+    llm_metrics.record(operation, time.perf_counter() - started)
+    usage = getattr(result, "usage", None)
+    if usage is not None:
+        llm_metrics.record_usage(operation, usage)
+    return result
+
+async def stream_llm(operation: str, call, max_retries: int = None):
+    # 스트리밍 응답은 본문을 모두 받을 때까지 슬롯을 유지 (재시도는 첫 응답을 받기 전까지만)
+    # 중간에 멈추면 슬롯과 커넥션이 바로 반환되도록 호출하는 쪽에서 aclosing으로 감싸야 함
+    async with llm_slot():
+        started = time.perf_counter()
+        try:
+            stream = await call_with_retry(call, max_retries, operation)
+            async with stream:
+                async for chunk in stream:
+                    yield chunk
+        except Exception:
+            llm_metrics.record(operation, time.perf_counter() - started, error=True)
+            raise
+    llm_metrics.record(operation, time.perf_counter() - started)
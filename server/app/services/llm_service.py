@@ -1,61 +1,95 @@
 from app.core.config import settings
-from openai import OpenAI
-from app.utils.utils import create_finetuning_training_data
+from app.core.metrics import generation_questions
+from contextlib import aclosing
+from typing import TYPE_CHECKING
 import asyncio
-import tempfile
-import os
-import json
-from app.db.database import save_llm_model, update_llm_model_status, get_system_prompt, get_questions_by_info, get_answers, save_level_answer
+from app.db.database import save_llm_model, record_llm_model_failure, get_llm_model, find_training_file_by_fingerprint, forget_training_file, update_llm_model_status, get_system_prompt, get_questions_by_info, get_answers, bulk_save_level_answers, get_level_answer_question_nums
+from app.services.llm_client import get_llm_client, call_llm, stream_llm, estimate_tokens, rate_limiter, is_retryable_error
+from app.services.finetuning_poller import finetuning_poller, normalize_job_status
+from app.services.dataset_builder import build_training_file
+from app.services.llm_cache import llm_cache_key, llm_response_cache
 
-async def create_finetuning_model(test_id: str, subject_id: str, level: str):
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+REUSABLE_JOB_STATUSES = ["validating_files", "pending", "queued", "running", "succeeded"]
+
+async def create_finetuning_model(test_id: str, subject_id: str, level: str, force: bool = False, client: "AsyncOpenAI" = None):
     if not settings.OPENAI_API_KEY:
         raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
     
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-    # 선택한 레벨의 트레이닝 데이터만 생성
-    training_data = await create_finetuning_training_data(test_id, subject_id, level)
+    client = client or get_llm_client()
 
     try:
-        # 트레이닝 데이터 로깅
-        print(f"Training data for {test_id}-{subject_id}-{level}:")
-        print(training_data[:1000])  # 처음 1000자만 출력
-        
-        # 임시 파일 생성
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.jsonl', encoding='utf-8') as temp_file:
-            for line in training_data.split('\n'):
-                temp_file.write(line + '\n')
-            temp_file_path = temp_file.name
-        
-        print(f"Temporary file created at: {temp_file_path}")
-        
-        # 파일 내용 확인
-        with open(temp_file_path, 'r', encoding='utf-8') as file:
-            print("File contents:")
-            print(file.read()[:1000])  # 처음 1000자만 출력
-        
-        # 파일 업로드
-        with open(temp_file_path, 'rb') as file:
-            file_response = client.files.create(
-                file=file,
-                purpose='fine-tune'
-            )
-        
-        # 임시 파일 삭제
-        os.unlink(temp_file_path)
+        # 선택한 레벨의 트레이닝 데이터를 임시 파일에 바로 기록
+        training_file, stats = await build_training_file(test_id, subject_id, level)
+        print(f"Training data for {test_id}-{subject_id}-{level}: {stats['examples']} examples, "
+              f"{stats['skipped']} skipped, {stats['invalid']} invalid, ~{stats['total_tokens']} tokens")
         
-        # 파인튜닝 작업 생성
-        fine_tune_response = client.fine_tuning.jobs.create(
-            training_file=file_response.id,
-            model="gpt-4o-mini-2024-07-18",
-            suffix=f"{test_id}_{subject_id}_{level}"
-        )
+        with training_file:
+            if stats["examples"] < settings.TRAINING_MIN_EXAMPLES:
+                raise ValueError(f"트레이닝 예제가 {stats['examples']}개뿐입니다. 최소 {settings.TRAINING_MIN_EXAMPLES}개가 필요합니다.")
+
+            # 데이터셋과 기반 모델이 그대로면 진행 중이거나 완료된 작업을 그대로 사용
+            existing = await get_llm_model(test_id, subject_id, level)
+            if not force and existing and existing.get("dataset_fingerprint") == stats["fingerprint"] and existing.get("job_id") and existing.get("status") in REUSABLE_JOB_STATUSES:
+                return {
+                    "status": existing["status"],
+                    "fine_tuned_model": existing.get("fine_tuned_model"),
+                    "job_id": existing["job_id"],
+                    "dataset": stats,
+                    "reused": "job"
+                }
+
+            async def upload_training_file():
+                training_file.seek(0)
+                file_response = await call_llm("files.create", lambda: client.files.create(
+                    file=(f"{test_id}_{subject_id}_{level}.jsonl", training_file),
+                    purpose='fine-tune'
+                ), max_retries=0)
+                return file_response.id
+
+            async def create_finetuning_job(file_id: str):
+                return await call_llm("fine_tuning.jobs.create", lambda: client.fine_tuning.jobs.create(
+                    training_file=file_id,
+                    model=settings.FINETUNING_BASE_MODEL,
+                    suffix=f"{test_id}_{subject_id}_{level}"
+                ), max_retries=0)
+
+            # 같은 데이터셋을 이미 업로드했다면 파일도 다시 올리지 않음
+            training_file_id = None if force else await find_training_file_by_fingerprint(stats["fingerprint"])
+            if training_file_id is None:
+                training_file_id = await upload_training_file()
+                reused = None
+            else:
+                reused = "file"
+
+            # 파인튜닝 작업 생성
+            try:
+                fine_tune_response = await create_finetuning_job(training_file_id)
+            except Exception as e:
+                if reused != "file" or is_retryable_error(e):
+                    raise
+                # 재사용한 파일이 OpenAI에서 삭제/만료되었을 수 있으므로 기록을 지우고 새로 업로드해 한 번 더 시도
+                print(f"Reused training file {training_file_id} failed, uploading again: {str(e)}")
+                await forget_training_file(training_file_id)
+                training_file_id = await upload_training_file()
+                reused = None
+                fine_tune_response = await create_finetuning_job(training_file_id)
+
+        dataset = {
+            "dataset_fingerprint": stats["fingerprint"],
+            "training_file_id": training_file_id,
+            "base_model": settings.FINETUNING_BASE_MODEL
+        }
         
         # 결과 저장
         result = {
             "status": fine_tune_response.status,
             "fine_tuned_model": fine_tune_response.fine_tuned_model,
-            "job_id": fine_tune_response.id
+            "job_id": fine_tune_response.id,
+            "dataset": stats,
+            "reused": reused
         }
 
         # 데이터베이스에 저장
@@ -65,56 +99,33 @@ async def create_finetuning_model(test_id: str, subject_id: str, level: str):
             level,
             fine_tune_response.status,
             fine_tune_response.fine_tuned_model,
-            fine_tune_response.id
+            fine_tune_response.id,
+            dataset
         )
 
-        # 상태 업데이트를 즉시 시작
-        asyncio.create_task(update_model_status_periodically(fine_tune_response.id))
+        # 공용 폴러가 DB의 미완료 작업을 읽어 상태를 갱신하므로 바로 확인하도록 깨우기만 함
+        finetuning_poller.notify()
 
         return result
 
     except Exception as e:
         print(f"Error creating finetuning model: {str(e)}")
-        print(f"Training data sample: {training_data[:500]}")  # 트레이닝 데이터 샘플 출력
-        # 에러 발생 시 데이터베스에 실패 상태 저장
-        await save_llm_model(
-            test_id,
-            subject_id,
-            level,
-            "failed",
-            None,
-            None
-        )
+        # 실패는 시도 기록으로만 남기고 기존 모델은 덮어쓰지 않음 (작업 오류는 jobs에 기록됨)
+        await record_llm_model_failure(test_id, subject_id, level, str(e))
+        if is_retryable_error(e):
+            # 일시적인 OpenAI 오류(5xx/429/연결)는 작업 대기열이 backoff로 재시도하도록 그대로 전달
+            raise
         return {"error": str(e)}
 
-async def update_model_status_periodically(job_id: str):
-    while True:
-        try:
-            status = await get_finetuning_status(job_id)
-            if status['status'] in ['succeeded', 'failed', 'cancelled']:
-                break
-            await asyncio.sleep(30)  # 1분마다 상태 확인
-        except Exception as e:
-            print(f"Error updating model status: {str(e)}")
-            break
-
-async def get_finetuning_status(job_id: str):
+async def get_finetuning_status(job_id: str, client: "AsyncOpenAI" = None):
     if not settings.OPENAI_API_KEY:
         raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
     
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    client = client or get_llm_client()
 
     try:
-        job = client.fine_tuning.jobs.retrieve(job_id)
-        status = job.status
-        if status == "validating_files":
-            status = "validating_files"
-        elif status == "queued":
-            status = "pending"
-        elif status in ["running", "succeeded", "failed", "cancelled"]:
-            status = status
-        else:
-            status = "unknown"
+        job = await call_llm("fine_tuning.jobs.retrieve", lambda: client.fine_tuning.jobs.retrieve(job_id))
+        status = normalize_job_status(job.status)
 
         result = {
             "status": status,
@@ -128,68 +139,207 @@ async def get_finetuning_status(job_id: str):
         print(f"Error getting finetuning status: {str(e)}")
         return {"error": str(e)}
 
-async def create_finetuned_answers(model_id: str, level: str, test_id: str, subject_id: str):
+def build_generation_messages(system_prompt: str, question: dict, base_answer: str):
+    prompt = "문제의 풀이를 작성해줘"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": question["question"]},
+        {"role": "system", "content": question["content"]},
+        {"role": "system", "content": "\n".join(question["choices"])},
+        {"role": "system", "content": base_answer},
+        {"role": "user", "content": prompt},
+    ]
+
+async def create_finetuned_answers(model_id: str, level: str, test_id: str, subject_id: str, force: bool = False, on_progress=None, client: "AsyncOpenAI" = None, use_cache: bool = True):
     if not settings.OPENAI_API_KEY:
         raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
     
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    client = client or get_llm_client()
     system_prompt = await get_system_prompt(level)
-    prompt = "문제의 풀이를 작성해줘"
     
     questions = await get_questions_by_info(test_id, subject_id)
-    base_answers = await get_answers(test_id, subject_id, "base_answer")
-    
+    base_answers = {str(a["question_num"]): a["answer"] for a in await get_answers(test_id, subject_id, "base_answer")}
+
+    # 이미 답변이 있는 문항은 건너뛰어 중단된 실행을 이어서 진행
+    done_question_nums = set() if force else await get_level_answer_question_nums(test_id, subject_id, level)
+    targets = [q for q in questions if str(q["question_number"]) not in done_question_nums]
+
+    progress = {
+        "total": len(questions),
+        "skipped": len(questions) - len(targets),
+        "generated": 0,
+        "failed": 0,
+        "errors": [],
+    }
+    semaphore = asyncio.Semaphore(settings.GENERATION_CONCURRENCY)
+    pending_writes = []
+    write_lock = asyncio.Lock()
+
+    async def flush_writes(force_flush: bool = False):
+        async with write_lock:
+            if not pending_writes or (not force_flush and len(pending_writes) < settings.GENERATION_WRITE_BATCH_SIZE):
+                return
+            batch = pending_writes[:]
+            pending_writes.clear()
+            try:
+                await bulk_save_level_answers(test_id, subject_id, level, batch)
+            except Exception:
+                pending_writes[:0] = batch
+                raise
+
+    async def report(question_num, status: str, error: str = None):
+        event = {"question_num": question_num, "status": status, **{k: v for k, v in progress.items() if k != "errors"}}
+        if error:
+            event["error"] = error
+        generation_questions.inc(level=level, status=status)
+        if on_progress:
+            await on_progress(event)
+
+    async def generate(question: dict):
+        question_num = question["question_number"]
+        base_answer = base_answers.get(str(question_num))
+        if base_answer is None:
+            progress["failed"] += 1
+            progress["errors"].append({"question_num": question_num, "error": "기본 답안이 없습니다."})
+            await report(question_num, "failed", "기본 답안이 없습니다.")
+            return
+
+        messages = build_generation_messages(system_prompt, question, base_answer)
+        cache_key = llm_cache_key(model_id, 0.3, messages)
+        async with semaphore:
+            try:
+                # 입력이 같은 문항은 캐시된 응답을 사용하고 네트워크/레이트 리밋을 건너뜀
+                answer = await llm_response_cache.get(cache_key, use_cache)
+                if answer is None:
+                    estimated = estimate_tokens(messages, settings.GENERATION_OUTPUT_TOKEN_ESTIMATE)
+                    await rate_limiter.acquire(estimated)
+                    response = await call_llm("chat.completions.create", lambda: client.chat.completions.create(
+                        model=model_id,
+                        temperature=0.3,
+                        messages=messages,
+                    ))
+                    if response.usage:
+                        rate_limiter.adjust(response.usage.total_tokens - estimated)
+                    answer = response.choices[0].message.content
+                    await llm_response_cache.set(cache_key, model_id, answer, use_cache)
+            except Exception as e:
+                progress["failed"] += 1
+                progress["errors"].append({"question_num": question_num, "error": str(e)})
+                await report(question_num, "failed", str(e))
+                return
+
+        pending_writes.append({
+            "question_num": question_num,
+            "answer": answer,
+            "test_month": question["test_month"],
+            "subject_name": question["subject_name"]
+        })
+        progress["generated"] += 1
+        try:
+            await flush_writes()
+        except Exception as e:
+            # 저장에 실패한 배치는 대기 목록에 남아 다음 저장 때 다시 시도되므로 다른 문항의 생성은 계속
+            print(f"Error saving generated answers: {str(e)}")
+        await report(question_num, "generated")
+
     try:
-        for question, base_answer in zip(questions, base_answers):
-            response = client.chat.completions.create(
-                model=model_id,
-                temperature=0.3,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "system", "content": question["question"]},
-                    {"role": "system", "content": question["content"]},
-                    {"role": "system", "content": "\n".join(question["choices"])},
-                    {"role": "system", "content": base_answer["answer"]},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            
-            finetuned_answer = response.choices[0].message.content
-            
-            await save_level_answer(test_id, subject_id, level, {
-                "question_num": question["question_number"],
-                "answer": finetuned_answer,
-                "test_month": question["test_month"],
-                "subject_name": question["subject_name"]
-            })
-        
-        return {"status": "completed"}
-    except Exception as e:
-        print(f"Error creating finetuned answers: {str(e)}")
-        return {"error": str(e)}
+        await asyncio.gather(*(generate(q) for q in targets))
+    finally:
+        try:
+            await flush_writes(force_flush=True)
+        except Exception as e:
+            # 마지막 저장까지 실패한 답변은 실패로 처리 (다시 실행하면 해당 문항만 생성)
+            print(f"Error saving generated answers: {str(e)}")
+            for answer_data in pending_writes:
+                progress["generated"] -= 1
+                progress["failed"] += 1
+                progress["errors"].append({"question_num": answer_data["question_num"], "error": f"답변 저장 실패: {str(e)}"})
+            pending_writes.clear()
+
+    result = {"status": "completed" if progress["failed"] == 0 else "partial", **progress}
+    if progress["failed"]:
+        print(f"Error creating finetuned answers: {progress['failed']}개 문항 실패")
+        result["error"] = f"{progress['failed']}개 문항의 답변 생성에 실패했습니다. 다시 실행하면 실패한 문항만 생성합니다."
+    return result
+
+REFINE_MODEL = "gpt-4o-mini-2024-07-18"
 
-async def refine_speech_to_text(text: str, level: str, question: dict):
+def build_refine_messages(system_prompt: str, text: str, question: dict):
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"문제: {question['question']}\n내용: {question['content']}\n보기: {', '.join(question['choices'])}"},
+        {"role": "user", "content": f"음성 인식 결과: {text}"},
+        {"role": "user", "content": "위의 음성 인식 결과는 문제의 풀이야. 시스템 프롬프트에 맞게 정제해서 풀이를 작성해줘."},
+    ]
+
+async def refine_speech_to_text(text: str, level: str, question: dict, client: "AsyncOpenAI" = None, use_cache: bool = True):
     if not settings.OPENAI_API_KEY:
         raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
     
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    client = client or get_llm_client()
 
     system_prompt = await get_system_prompt(level)
+    messages = build_refine_messages(system_prompt, text, question)
+    cache_key = llm_cache_key(REFINE_MODEL, 0.3, messages)
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini-2024-07-18",
+        refined_text = await llm_response_cache.get(cache_key, use_cache)
+        if refined_text is not None:
+            return refined_text
+
+        response = await call_llm("chat.completions.create", lambda: client.chat.completions.create(
+            model=REFINE_MODEL,
             temperature=0.3,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"문제: {question['question']}\n내용: {question['content']}\n보기: {', '.join(question['choices'])}"},
-                {"role": "user", "content": f"음성 인식 결과: {text}"},
-                {"role": "user", "content": "위의 음성 인식 결과는 문제의 풀이야. 시스템 프롬프트에 맞게 정제해서 풀이를 작성해줘."},
-            ],
-        )
+            messages=messages,
+        ))
         
         refined_text = response.choices[0].message.content
+        await llm_response_cache.set(cache_key, REFINE_MODEL, refined_text, use_cache)
         return refined_text
     except Exception as e:
         print(f"Error refining speech to text: {str(e)}")
         return text
+
+async def stream_refine_speech_to_text(text: str, level: str, question: dict, client: "AsyncOpenAI" = None, use_cache: bool = True):
+    # 모델이 생성하는 토큰을 그대로 전달 (토큰을 보내기 전에 실패하면 비스트리밍 경로처럼 원문을 반환하고, 도중에 실패하면 오류를 전달)
+    if not settings.OPENAI_API_KEY:
+        raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
+
+    client = client or get_llm_client()
+
+    system_prompt = await get_system_prompt(level)
+    messages = build_refine_messages(system_prompt, text, question)
+    cache_key = llm_cache_key(REFINE_MODEL, 0.3, messages)
+
+    emitted = False
+    try:
+        # 캐시된 응답은 한 번에 전달
+        cached = await llm_response_cache.get(cache_key, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        deltas = []
+        stream = stream_llm("chat.completions.stream", lambda: client.chat.completions.create(
+            model=REFINE_MODEL,
+            temperature=0.3,
+            messages=messages,
+            stream=True,
+        ))
+        async with aclosing(stream):
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    emitted = True
+                    deltas.append(delta)
+                    yield delta
+        # 끝까지 받은 응답만 저장
+        await llm_response_cache.set(cache_key, REFINE_MODEL, "".join(deltas), use_cache)
+    except Exception as e:
+        print(f"Error refining speech to text: {str(e)}")
+        if emitted:
+            # 일부 토큰을 이미 보냈으면 잘린 풀이가 최종 결과로 저장되지 않도록 오류를 전달
+            raise
+        yield text
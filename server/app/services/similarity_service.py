@@ -0,0 +1,50 @@
+from app.core.config import settings
+import numpy as np
+
+# count: 기존 pair 단위 CountVectorizer 경로와 동일한 결과
+# tfidf: 단어 단위 TF-IDF 가중치
+# char / char_tfidf: 어절 경계 안의 문자 n-gram (조사/어미가 붙는 한국어 해설에 적합)
+LEXICAL_MODES = ("count", "tfidf", "char", "char_tfidf")
+CHAR_NGRAM_RANGE = (2, 3)
+
+def create_vectorizer(mode: str):
+    # sklearn은 어휘 유사도를 처음 계산할 때 불러옴 (CRUD 전용 워커의 시작 시간/메모리 절약)
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    if mode == "count":
+        return CountVectorizer()
+    if mode == "tfidf":
+        return TfidfVectorizer()
+    if mode == "char":
+        return CountVectorizer(analyzer="char_wb", ngram_range=CHAR_NGRAM_RANGE)
+    if mode == "char_tfidf":
+        return TfidfVectorizer(analyzer="char_wb", ngram_range=CHAR_NGRAM_RANGE)
+    raise ValueError(f"지원하지 않는 lexical similarity 모드입니다: {mode}")
+
+def lexical_similarities(reference_texts: list, *candidate_texts_lists: list, mode: str = None) -> list:
+    # 한 번의 실행(시험/레벨)에 대해 어휘 사전을 한 번만 학습하고,
+    # 희소 행렬을 정규화한 뒤 행 단위 내적으로 모든 코사인 유사도를 계산
+    mode = mode or settings.LEXICAL_SIMILARITY_MODE
+    n = len(reference_texts)
+    if n == 0:
+        return [[] for _ in candidate_texts_lists]
+
+    all_texts = list(reference_texts)
+    for candidates in candidate_texts_lists:
+        all_texts.extend(candidates)
+
+    vectorizer = create_vectorizer(mode)
+    try:
+        matrix = vectorizer.fit_transform(all_texts)
+    except ValueError:
+        # 모든 텍스트에서 토큰이 하나도 없으면 유사도는 0
+        return [[0.0] * n for _ in candidate_texts_lists]
+
+    from sklearn.preprocessing import normalize
+    matrix = normalize(matrix, norm="l2", copy=False)
+    reference = matrix[:n]
+    results = []
+    for i in range(len(candidate_texts_lists)):
+        candidates = matrix[n * (i + 1):n * (i + 2)]
+        similarities = np.asarray(reference.multiply(candidates).sum(axis=1)).ravel()
+        results.append([float(value) for value in similarities])
+    return results
@@ -0,0 +1,166 @@
+from app.core.config import settings
+from app.core.metrics import speech_requests, speech_request_duration
+import asyncio
+import json
+import shutil
+import numpy as np
+
+# 브라우저 녹음 원본 형식
+WEBM_OPUS = "WEBM_OPUS"
+WEBM_SAMPLE_RATE = 48000
+# 구간 분할 시 ffmpeg로 변환하는 형식 (16kHz mono 16bit PCM)
+LINEAR16 = "LINEAR16"
+PCM_SAMPLE_RATE = 16000
+# 인라인 오디오는 recognize/long_running_recognize 모두 1분 이하만 처리 가능 (더 길면 GCS URI가 필요)
+SYNC_RECOGNIZE_MAX_SECONDS = 60
+# 구간 경계 직전 몇 초 안에서 가장 조용한 20ms 지점을 찾아 자름 (단어 중간에서 잘리지 않도록)
+SILENCE_SEARCH_SECONDS = 3
+SILENCE_FRAME_SECONDS = 0.02
+
+class GoogleSpeechBackend:
+    name = "google"
+
+    def __init__(self):
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from google.cloud import speech
+            from google.oauth2 import service_account
+            credentials_dict = json.loads(settings.GOOGLE_APPLICATION_CREDENTIALS)
+            credentials = service_account.Credentials.from_service_account_info(credentials_dict)
+            self._client = speech.SpeechClient(credentials=credentials)
+        return self._client
+
+    def warmup(self):
+        # 자격 증명 파싱/gRPC 채널 생성을 준비 단계에서 미리 수행
+        self._get_client()
+
+    def _recognize_sync(self, content: bytes, encoding: str, sample_rate: int):
+        from google.cloud import speech
+        client = self._get_client()
+        audio = speech.RecognitionAudio(content=content)
+        config = speech.RecognitionConfig(
+            encoding=getattr(speech.RecognitionConfig.AudioEncoding, encoding),
+            sample_rate_hertz=sample_rate,
+            language_code=settings.SPEECH_LANGUAGE_CODE,
+        )
+        response = client.recognize(config=config, audio=audio)
+        return "".join(result.alternatives[0].transcript for result in response.results if result.alternatives)
+
+    async def recognize(self, content: bytes, encoding: str, sample_rate: int) -> str:
+        # gRPC 호출은 블로킹이므로 이벤트 루프 밖의 스레드에서 실행
+        return await asyncio.to_thread(self._recognize_sync, content, encoding, sample_rate)
+
+class LocalSpeechBackend:
+    # 테스트/벤치마크용 대체 백엔드: 설정한 지연 후 고정 텍스트를 반환
+    name = "local"
+
+    def __init__(self, latency: float = 0.0, text: str = ""):
+        self.latency = latency
+        self.text = text
+
+    def warmup(self):
+        pass
+
+    async def recognize(self, content: bytes, encoding: str, sample_rate: int) -> str:
+        await asyncio.sleep(self.latency)
+        return self.text or f"[{encoding} {len(content)} bytes]"
+
+SPEECH_BACKENDS = {
+    "google": lambda: GoogleSpeechBackend(),
+    "local": lambda: LocalSpeechBackend(settings.SPEECH_LOCAL_LATENCY, settings.SPEECH_LOCAL_TEXT),
+}
+
+_backend = None
+
+def get_speech_backend():
+    global _backend
+    if _backend is None:
+        if settings.SPEECH_BACKEND not in SPEECH_BACKENDS:
+            raise ValueError(f"지원하지 않는 음성 인식 백엔드입니다: {settings.SPEECH_BACKEND}")
+        _backend = SPEECH_BACKENDS[settings.SPEECH_BACKEND]()
+    return _backend
+
+def warmup_speech_backend():
+    get_speech_backend().warmup()
+    if not shutil.which(settings.SPEECH_FFMPEG_PATH):
+        print(f"ffmpeg({settings.SPEECH_FFMPEG_PATH})를 찾을 수 없습니다. 1분이 넘는 녹음은 인식할 수 없습니다.")
+
+def set_speech_backend(backend):
+    global _backend
+    _backend = backend
+
+async def decode_to_pcm(content: bytes):
+    # ffmpeg가 없으면 None을 반환하여 원본 그대로 인식
+    ffmpeg = shutil.which(settings.SPEECH_FFMPEG_PATH)
+    if not ffmpeg:
+        return None
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE), "pipe:1",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    pcm, error = await process.communicate(content)
+    if process.returncode != 0:
+        print(f"오디오 변환 실패: {error.decode(errors='ignore')}")
+        return None
+    return pcm
+
+def find_quietest_sample(samples: np.ndarray, start: int, end: int, frame: int) -> int:
+    # [start, end) 구간을 frame 단위로 나눠 평균 에너지가 가장 작은 프레임의 가운데 위치를 반환
+    frames = (end - start) // frame
+    if frames <= 0:
+        return end
+    window = samples[start:start + frames * frame].astype(np.float32).reshape(frames, frame)
+    quietest = int(np.argmin((window ** 2).mean(axis=1)))
+    return start + quietest * frame + frame // 2
+
+def split_pcm(pcm: bytes, segment_seconds: int):
+    # 구간은 segment_seconds를 넘지 않고, 경계 직전 SILENCE_SEARCH_SECONDS 안의 가장 조용한 지점에서 자름
+    samples = np.frombuffer(pcm[:len(pcm) // 2 * 2], dtype=np.int16)
+    segment = segment_seconds * PCM_SAMPLE_RATE
+    search = min(SILENCE_SEARCH_SECONDS * PCM_SAMPLE_RATE, segment // 2)
+    frame = int(SILENCE_FRAME_SECONDS * PCM_SAMPLE_RATE)
+    segments = []
+    start = 0
+    while len(samples) - start > segment:
+        cut = find_quietest_sample(samples, start + segment - search, start + segment, frame)
+        segments.append(pcm[start * 2:cut * 2])
+        start = cut
+    segments.append(pcm[start * 2:])
+    return segments
+
+async def transcribe_audio(content: bytes, backend=None) -> str:
+    backend = backend or get_speech_backend()
+    status = "error"
+    try:
+        with speech_request_duration.time(backend=backend.name):
+            text = await _transcribe(content, backend)
+        status = "ok"
+        return text
+    finally:
+        speech_requests.inc(backend=backend.name, status=status)
+
+async def _transcribe(content: bytes, backend) -> str:
+    pcm = await decode_to_pcm(content)
+    if pcm is None:
+        # 길이를 알 수 없어 나눌 수 없으므로 원본을 한 번에 인식 (1분 이하의 녹음만 가능)
+        try:
+            return await backend.recognize(content, WEBM_OPUS, WEBM_SAMPLE_RATE)
+        except Exception as e:
+            raise RuntimeError(f"오디오를 변환하지 못해 녹음 전체를 한 번에 인식했지만 실패했습니다. 1분이 넘는 녹음은 ffmpeg가 필요합니다: {str(e)}") from e
+
+    segments = split_pcm(pcm, min(settings.SPEECH_SEGMENT_SECONDS, SYNC_RECOGNIZE_MAX_SECONDS))
+    if len(segments) <= 1:
+        return await backend.recognize(pcm, LINEAR16, PCM_SAMPLE_RATE)
+
+    # 긴 녹음은 조용한 지점에서 나눈 구간별로 병렬 인식한 뒤 순서대로 이어 붙임
+    semaphore = asyncio.Semaphore(settings.SPEECH_MAX_PARALLEL_SEGMENTS)
+
+    async def recognize_segment(segment: bytes):
+        async with semaphore:
+            return await backend.recognize(segment, LINEAR16, PCM_SAMPLE_RATE)
+
+    texts = await asyncio.gather(*(recognize_segment(segment) for segment in segments))
+    return " ".join(text.strip() for text in texts if text.strip())
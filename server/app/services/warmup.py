@@ -0,0 +1,46 @@
+from app.core.config import settings
+from app.core.startup import startup_report
+from app.services.compute_pool import compute_pool
+from app.services.llm_client import start_llm_client
+from app.services.speech_service import warmup_speech_backend
+
+# 배포 역할별로 lifespan에서 미리 준비할 구성 요소 (나머지는 처음 사용할 때 로드)
+# api: CRUD/SSE/LLM 프록시만 처리하는 가벼운 워커
+# evaluation: 임베딩 모델/sklearn으로 답변을 평가하는 워커
+# llm: 파인튜닝 작업 상태를 폴링하고 답변을 생성하는 워커
+WARMUP_COMPONENTS = ("embedding", "sklearn", "llm", "speech", "poller")
+ROLE_WARMUPS = {
+    "all": ("embedding", "sklearn", "llm", "speech", "poller"),
+    "api": ("llm",),
+    "evaluation": ("embedding", "sklearn"),
+    "llm": ("llm", "poller"),
+}
+
+def warmup_components():
+    # APP_WARMUP(쉼표 구분)이 있으면 역할 기본값 대신 사용
+    if settings.APP_WARMUP:
+        components = [name.strip() for name in settings.APP_WARMUP.split(",") if name.strip()]
+    else:
+        if settings.APP_ROLE not in ROLE_WARMUPS:
+            raise ValueError(f"지원하지 않는 APP_ROLE입니다: {settings.APP_ROLE}")
+        components = list(ROLE_WARMUPS[settings.APP_ROLE])
+    unknown = [name for name in components if name not in WARMUP_COMPONENTS]
+    if unknown:
+        raise ValueError(f"지원하지 않는 APP_WARMUP 항목입니다: {unknown}")
+    return components
+
+async def run_warmup(components: list):
+    # poller는 백그라운드 작업이므로 lifespan에서 따로 시작
+    for name in components:
+        if name == "poller":
+            continue
+        with startup_report.phase(name):
+            if name == "embedding":
+                # EMBEDDING_WORKERS > 0이면 모델은 계산 풀의 워커 프로세스에만 로드됨
+                await compute_pool.warmup()
+            elif name == "sklearn":
+                await compute_pool.lexical_similarities(["warmup"], ["warmup"])
+            elif name == "llm":
+                await start_llm_client()
+            elif name == "speech":
+                warmup_speech_backend()
@@ -0,0 +1,28 @@
+from fastapi.responses import ORJSONResponse, Response
+from bson import ObjectId
+import orjson
+
+def json_default(o):
+    # orjson이 직접 처리하지 못하는 MongoDB 타입 (datetime은 orjson이 처리)
+    if isinstance(o, ObjectId):
+        return str(o)
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
+
+class MongoJSONResponse(ORJSONResponse):
+    # DB 결과를 한 번만 직렬화: 라우트에서 이 응답을 직접 반환하면 jsonable_encoder 단계도 건너뜀
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+def etag_matches(request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or not etag:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+def etag_response(request, content, etag: str = None):
+    # 브라우저가 가진 데이터가 그대로면 본문 없이 304를 반환
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+    return MongoJSONResponse(content, headers=headers)
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx 등 프록시가 응답을 버퍼링하지 않도록 함
+    "X-Accel-Buffering": "no",
+}
+KEEPALIVE_INTERVAL = 15
+# 프록시/로드밸런서의 유휴 연결 타임아웃을 막기 위한 SSE 주석
+KEEPALIVE_COMMENT = ": keep-alive\n\n"
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def subscription_to_sse(bus, matches=None):
+    # 이벤트 버스를 구독해 연결이 끊길 때까지 전달 (EventSource 재연결 간격은 3초)
+    queue = bus.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE_COMMENT
+                continue
+            if matches is None or matches(data):
+                yield format_sse(event, data)
+    finally:
+        bus.unsubscribe(queue)
@@ -1,9 +1,11 @@
 from app.core.config import settings
-from app.db.database import get_test_infos, get_answers, save_answer, get_answer_collection, check_answer_exists, update_test_info_ready_status, get_questions_by_info, get_level_answers
+from app.core.metrics import evaluation_stage_duration
+from app.db.database import get_test_infos, save_answer, bulk_save_answers, refresh_answer_completion, get_answer_collection, get_questions_by_info, get_level_answers, get_evaluation_results, save_evaluation_results, get_answer_texts, update_answer_completion, get_answer_completion
+import asyncio
 import json
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import CountVectorizer
-from sentence_transformers import SentenceTransformer
+import hashlib
+from app.services.embedding_service import semantic_similarities
+from app.services.compute_pool import compute_pool
 import numpy as np
 
 async def process_test_infos():
@@ -15,48 +17,53 @@ async def process_test_infos():
     
     return result
 
+ANSWER_TYPES = ('base', 'low', 'medium', 'high')
+
 async def save_or_update_answer(test_id: str, subject_id: str, answer_data: dict):
     answer_type = answer_data['answer_type']
     collection_name = f"{answer_type}_answer"
     
-    existing_answer = await check_answer_exists(test_id, subject_id, answer_data['question_num'], collection_name)
-    
-    if existing_answer:
-        # 업데이트
-        result = await save_answer(test_id, subject_id, answer_data, collection_name, update=True)
-    else:
-        # 새로 저장
-        result = await save_answer(test_id, subject_id, answer_data, collection_name)
+    result = await save_answer(test_id, subject_id, answer_data, collection_name)
     
-    # 저장 후 상태 업데이트
-    await get_answer_status(test_id, subject_id)
+    # 저장한 문항의 완료 상태만 갱신
+    if answer_type in ('low', 'medium', 'high'):
+        await update_answer_completion(test_id, subject_id, answer_data['question_num'], answer_type, answer_data['answer'].strip() != "")
     
     return result
 
+async def save_answers_batch(test_id: str, subject_id: str, answers: list):
+    # 답변 종류별로 묶어 컬렉션당 bulk_write 한 번, 완료 상태 계산은 배치당 한 번
+    results = [None] * len(answers)
+    groups = {}
+    for i, answer_data in enumerate(answers):
+        missing = [key for key in ('answer_type', 'question_num', 'answer', 'test_month', 'subject_name') if key not in answer_data]
+        if missing:
+            results[i] = {"status": "error", "error": f"필수 항목이 없습니다: {', '.join(missing)}"}
+        elif answer_data['answer_type'] not in ANSWER_TYPES:
+            results[i] = {"status": "error", "error": f"지원하지 않는 답변 종류입니다: {answer_data['answer_type']}"}
+        else:
+            groups.setdefault(answer_data['answer_type'], []).append(i)
+
+    completion_question_nums = []
+    for answer_type, indexes in groups.items():
+        group_results = await bulk_save_answers(test_id, subject_id, f"{answer_type}_answer", [answers[i] for i in indexes])
+        for i, result in zip(indexes, group_results):
+            results[i] = result
+            if answer_type != 'base' and result["status"] != "error":
+                completion_question_nums.append(answers[i]['question_num'])
+
+    await refresh_answer_completion(test_id, subject_id, completion_question_nums)
+
+    for i, answer_data in enumerate(answers):
+        results[i] = {"question_num": answer_data.get('question_num'), "answer_type": answer_data.get('answer_type'), **results[i]}
+    return {
+        "saved": sum(1 for r in results if r["status"] != "error"),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+        "results": results,
+    }
+
 async def get_answer_status(test_id: str, subject_id: str):
-    collections = ['low_answer', 'medium_answer', 'high_answer']
-    status = {}
-    all_complete = True
-    
-    for collection_name in collections:
-        collection = await get_answer_collection(collection_name)
-        answers = await collection.find({'testId': int(test_id), 'subjectId': int(subject_id)}).to_list(length=None)
-        
-        for answer in answers:
-            question_num = answer['question_num']
-            if question_num not in status:
-                status[question_num] = 0
-            if answer['answer'].strip() != "":
-                status[question_num] += 1
-    
-    for count in status.values():
-        if count != 3:
-            all_complete = False
-            break
-    
-    await update_test_info_ready_status(test_id, subject_id, all_complete)
-    
-    return {k: v == 3 for k, v in status.items()}
+    return await get_answer_completion(test_id, subject_id)
 
 async def get_specific_answer_from_db(test_id: str, subject_id: str, question_num: str, answer_type: str):
     collection_name = f"{answer_type}_answer"
@@ -68,6 +75,20 @@ async def get_specific_answer_from_db(test_id: str, subject_id: str, question_nu
     })
     return answer['answer'] if answer else ''
 
+async def get_all_level_answers(test_id: str, subject_id: str):
+    # 세 레벨의 답변을 병렬 조회하여 {문항 번호: {low, medium, high}} 형태로 반환
+    levels = ['low', 'medium', 'high']
+    results = await asyncio.gather(*(get_answer_texts(test_id, subject_id, f"{level}_answer") for level in levels))
+
+    answers = {}
+    for level, level_answers in zip(levels, results):
+        for answer in level_answers:
+            question_num = str(answer['question_num'])
+            if question_num not in answers:
+                answers[question_num] = {l: '' for l in levels}
+            answers[question_num][level] = answer.get('answer') or ''
+    return answers
+
 async def create_base_data(question):
     return {
         "test_month": question["test_month"],
@@ -78,88 +99,125 @@ async def create_base_data(question):
         "choices": question["choices"]
     }
 
-async def get_answer_for_question(answers, question_num):
-    return next((a for a in answers if a["question_num"] == question_num), None)
-
 async def create_finetuning_data(questions, answers):
+    # 문항마다 답변 목록을 훑지 않도록 question_num으로 색인 (같은 번호면 처음 것을 사용)
+    answers_by_num = {}
+    for answer in answers:
+        answers_by_num.setdefault(str(answer["question_num"]), answer)
+
     data = []
     for question in questions:
         base_data = await create_base_data(question)
-        answer = await get_answer_for_question(answers, str(question["question_number"]))
+        answer = answers_by_num.get(str(question["question_number"]))
         base_data["answer"] = answer["answer"] if answer else ""
         data.append(json.dumps(base_data, ensure_ascii=False))
     return "\n".join(data)
 
-async def create_finetuning_training_data(test_id: str, subject_id: str, level: str):
-    questions = await get_questions_by_info(test_id, subject_id)
-    
-    # 'med'를 'medium'으로 변경
-    collection_name = f"{level}_answer"
-    answers = await get_answers(test_id, subject_id, collection_name)
-
-    jsonl_data = []
-    for question in questions:
-        answer = next((a for a in answers if a["question_num"] == str(question["question_number"])), None)
-        if answer and answer["answer"].strip():
-            data = {
-                "messages": [
-                    {"role": "system", "content": "당신은 영어 문제에 대한 해설을 제공하는 AI 튜터입니다."},
-                    {"role": "user", "content": f"문제: {question['question']}\n내용: {question['content']}\n선택지: {json.dumps(question['choices'], ensure_ascii=False)}"},
-                    {"role": "assistant", "content": f"해설: {answer['answer']}"}
-                ]
+def evaluation_config_key() -> str:
+    # 모델/모드가 바뀌면 저장된 모든 평가 결과를 다시 계산해야 함
+    return f"{settings.EMBEDDING_MODEL_NAME}|{settings.LEXICAL_SIMILARITY_MODE}"
+
+def evaluation_fingerprint(standard: str, normal: str, finetuned: str) -> str:
+    payload = json.dumps([evaluation_config_key(), standard, normal, finetuned], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def refresh_evaluation_results(test_id: str, subject_id: str, level: str, question_nums: list, previous: dict):
+    # 변경된(또는 아직 계산되지 않은) 문항의 답변만 읽어 다시 평가
+    standard_answers = await get_level_answers(test_id, subject_id, f"standard_{level}", question_nums)
+    normal_answers = await get_level_answers(test_id, subject_id, f"normal_{level}", question_nums)
+    finetuned_answers = await get_level_answers(test_id, subject_id, level, question_nums)
+
+    standard_by_num = {str(a["question_num"]): a["answer"] for a in standard_answers}
+    normal_by_num = {str(a["question_num"]): a["answer"] for a in normal_answers}
+    finetuned_by_num = {str(a["question_num"]): a["answer"] for a in finetuned_answers}
+
+    config_key = evaluation_config_key()
+    rows = {}
+    pending = []
+    for question_num in question_nums:
+        if question_num not in standard_by_num or question_num not in normal_by_num or question_num not in finetuned_by_num:
+            # 답변이 모두 모이지 않은 문항도 기록해 두어 매 요청마다 다시 조회하지 않도록 함
+            rows[question_num] = {"question_num": question_num, "incomplete": True, "fingerprint": None}
+            continue
+        fingerprint = evaluation_fingerprint(standard_by_num[question_num], normal_by_num[question_num], finetuned_by_num[question_num])
+        old_row = previous.get(question_num)
+        if old_row and old_row.get("fingerprint") == fingerprint and old_row.get("config_key") == config_key:
+            # 무효화되었지만 입력이 그대로인 문항은 기존 점수를 재사용
+            rows[question_num] = {k: v for k, v in old_row.items() if k not in ("stale", "config_key", "version")}
+            continue
+        pending.append(question_num)
+
+    if pending:
+        standard_texts = [standard_by_num[num] for num in pending]
+        finetuned_texts = [finetuned_by_num[num] for num in pending]
+        normal_texts = [normal_by_num[num] for num in pending]
+
+        # 어휘 유사도와 의미 유사도 모두 한 번에 계산 (CPU 작업은 계산 풀에서 실행하여 이벤트 루프를 막지 않음)
+        with evaluation_stage_duration.time(stage="lexical"):
+            cosine_finetuned, cosine_normal = await compute_pool.lexical_similarities(standard_texts, finetuned_texts, normal_texts)
+        with evaluation_stage_duration.time(stage="semantic"):
+            semantic_finetuned, semantic_normal = await semantic_similarities(standard_texts, finetuned_texts, normal_texts)
+
+        for i, question_num in enumerate(pending):
+            rows[question_num] = {
+                "question_num": question_num,
+                "incomplete": False,
+                "fingerprint": evaluation_fingerprint(standard_texts[i], normal_texts[i], finetuned_texts[i]),
+                "standard_answer": standard_texts[i],
+                "normal_answer": normal_texts[i],
+                "finetuned_answer": finetuned_texts[i],
+                "cosine_similarity_finetuned": float(cosine_finetuned[i]),
+                "semantic_similarity_finetuned": float(semantic_finetuned[i]),
+                "cosine_similarity_normal": float(cosine_normal[i]),
+                "semantic_similarity_normal": float(semantic_normal[i]),
             }
-            jsonl_data.append(json.dumps(data, ensure_ascii=False))
-    
-    result = "\n".join(jsonl_data)
-    print("Sample of generated JSONL data:")
-    print(result[:1000])  # 처음 1000자만 출력
-    return result
 
-async def calculate_cosine_similarity(text1: str, text2: str) -> float:
-    vectorizer = CountVectorizer().fit([text1, text2])
-    vector1 = vectorizer.transform([text1]).toarray()[0]
-    vector2 = vectorizer.transform([text2]).toarray()[0]
-    return cosine_similarity([vector1], [vector2])[0][0]
-
-async def calculate_semantic_similarity(text1: str, text2: str) -> float:
-    model = SentenceTransformer('distiluse-base-multilingual-cased-v1')
-    vector1 = model.encode([text1])[0]
-    vector2 = model.encode([text2])[0]
-    return cosine_similarity([vector1], [vector2])[0][0]
+    # previous는 답변을 읽기 전에 조회한 것이므로 그 사이에 무효화된 행은 저장되지 않음
+    versions = {question_num: (previous.get(question_num) or {}).get("version") for question_num in rows}
+    await save_evaluation_results(test_id, subject_id, level, config_key, list(rows.values()), versions)
+    return rows
 
 async def test_finetuned_answers(test_id: str, subject_id: str, level: str):
     questions = await get_questions_by_info(test_id, subject_id)
-    standard_answers = await get_level_answers(test_id, subject_id, f"standard_{level}")
-    normal_answers = await get_level_answers(test_id, subject_id, f"normal_{level}")
-    finetuned_answers = await get_level_answers(test_id, subject_id, level)
+    stored = {r["question_num"]: r for r in await get_evaluation_results(test_id, subject_id, level)}
+
+    config_key = evaluation_config_key()
+    stale_question_nums = []
+    for q in questions:
+        question_num = str(q["question_number"])
+        row = stored.get(question_num)
+        if row is None or row.get("stale") or row.get("config_key") != config_key:
+            stale_question_nums.append(question_num)
 
-    # 문제 정보와 답변을 결합
+    if stale_question_nums and settings.LEXICAL_SIMILARITY_MODE in ("tfidf", "char_tfidf"):
+        # IDF 가중치는 전체 답변에 의존하므로 한 문항이라도 바뀌면 전체를 다시 계산
+        stale_question_nums = [str(q["question_number"]) for q in questions]
+
+    if stale_question_nums:
+        stored.update(await refresh_evaluation_results(test_id, subject_id, level, stale_question_nums, stored))
+
+    # 문제 정보와 저장된 평가 결과를 결합
     combined_answers = []
-    for q, s, n, f in zip(questions, standard_answers, normal_answers, finetuned_answers):
+    cosine_similarities_standard_finetuned = []
+    semantic_similarities_standard_finetuned = []
+    cosine_similarities_standard_normal = []
+    semantic_similarities_standard_normal = []
+    for q in questions:
+        row = stored.get(str(q["question_number"]))
+        if row is None or row.get("incomplete"):
+            continue
         combined_answers.append({
             "question": q["question"],
             "content": q["content"],
             "choices": q["choices"],
-            "standard_answer": s["answer"],
-            "normal_answer": n["answer"],
-            "finetuned_answer": f["answer"],
+            "standard_answer": row["standard_answer"],
+            "normal_answer": row["normal_answer"],
+            "finetuned_answer": row["finetuned_answer"],
         })
-
-    cosine_similarities_standard_finetuned = []
-    semantic_similarities_standard_finetuned = []
-    cosine_similarities_standard_normal = []
-    semantic_similarities_standard_normal = []
-
-    for standard, normal, finetuned in zip(standard_answers, normal_answers, finetuned_answers):
-        cosine_sim_finetuned = await calculate_cosine_similarity(standard['answer'], finetuned['answer'])
-        semantic_sim_finetuned = await calculate_semantic_similarity(standard['answer'], finetuned['answer'])
-        cosine_sim_normal = await calculate_cosine_similarity(standard['answer'], normal['answer'])
-        semantic_sim_normal = await calculate_semantic_similarity(standard['answer'], normal['answer'])
-        
-        cosine_similarities_standard_finetuned.append(float(cosine_sim_finetuned))
-        semantic_similarities_standard_finetuned.append(float(semantic_sim_finetuned))
-        cosine_similarities_standard_normal.append(float(cosine_sim_normal))
-        semantic_similarities_standard_normal.append(float(semantic_sim_normal))
+        cosine_similarities_standard_finetuned.append(row["cosine_similarity_finetuned"])
+        semantic_similarities_standard_finetuned.append(row["semantic_similarity_finetuned"])
+        cosine_similarities_standard_normal.append(row["cosine_similarity_normal"])
+        semantic_similarities_standard_normal.append(row["semantic_similarity_normal"])
 
     avg_cosine_similarity_finetuned = float(np.mean(cosine_similarities_standard_finetuned) * 100)
     avg_semantic_similarity_finetuned = float(np.mean(semantic_similarities_standard_finetuned) * 100)
@@ -0,0 +1,267 @@
+# API 주요 경로의 지연 시간/처리량 측정 (네트워크 없이 실행: 메모리 DB 또는 로컬 MongoDB + 가짜 OpenAI/음성 인식/임베딩)
+# 실행: python -m benchmarks.api_bench [--tests 20] [--questions 45] [--requests 50] [--concurrency 8] [--llm-latency 0.2] [--speech-latency 0.5]
+#       [--mongo-url mongodb://localhost:27017] [--output benchmarks/results/api.json]
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+import httpx
+import numpy as np
+from openai import AsyncOpenAI
+from app.core.config import settings
+from app.db import database
+from app.db.database import JOB_TERMINAL_STATUSES
+from app.services.llm_client import set_llm_client
+from app.services.speech_service import LocalSpeechBackend, set_speech_backend
+from app.services.embedding_service import set_embedding_model
+from app.services.compute_pool import compute_pool
+from app.services.job_queue import job_worker
+
+LEVELS = ["low", "medium", "high"]
+SUBJECT_ID = 1
+
+class FakeEmbeddingModel:
+    # 텍스트 해시로 만든 고정 벡터 (모델 다운로드 없이 유사도 계산 경로를 실행)
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+            vectors.append(np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32))
+        return np.vstack(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+
+def fake_openai_client(latency: float):
+    # chat.completions 요청에 설정한 지연 후 입력 길이에 비례한 응답을 돌려주는 가짜 OpenAI 서버
+    async def handler(request: httpx.Request):
+        await asyncio.sleep(latency)
+        body = json.loads(request.content)
+        content = "해설: " + body["messages"][-1]["content"][:200]
+        if body.get("stream"):
+            chunk = {"id": "bench", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                     "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": "stop"}]}
+            return httpx.Response(200, content=f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode(), headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={
+            "id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        })
+    return AsyncOpenAI(api_key="benchmark", base_url="http://openai.benchmark/v1", max_retries=0,
+                       http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+def connect_database(mongo_url: str, db_name: str):
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(mongo_url)[db_name]
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("--mongo-url을 지정하거나 mongomock-motor를 설치하세요: pip install mongomock-motor")
+    return AsyncMongoMockClient()[db_name]
+
+async def seed(db, test_count: int, question_count: int):
+    # 시험 × 문항 × 레벨 규모의 합성 데이터 (절반의 시험만 모든 레벨 답안이 작성된 상태)
+    explanation = "이 문제는 글의 요지를 파악하는 문제입니다. 첫 문장에서 필자의 주장이 드러나며, 이어지는 예시가 이를 뒷받침합니다. "
+    await db.prompts.insert_many([{"level": level, "system_prompt": f"{level} 수준의 학생에게 맞게 풀이를 작성하세요."} for level in LEVELS])
+    for t in range(1, test_count + 1):
+        test = {"testId": t, "subjectId": SUBJECT_ID}
+        meta = {"test_month": f"2024-{(t % 12) + 1:02d}", "subject_name": "영어"}
+        complete = t % 2 == 0
+        await db.test_info.insert_one({**test, **meta, "is_ready": False})
+        await db.questions.insert_many([
+            {**test, **meta, "question_number": q, "question": "다음 글의 요지로 가장 적절한 것은?",
+             "content": f"Passage {q}. " + "Many people believe that success comes from talent alone. " * 6,
+             "choices": [f"보기 {i}" for i in range(1, 6)]}
+            for q in range(1, question_count + 1)
+        ])
+        for answer_type in ["base"] + LEVELS:
+            await db[f"{answer_type}_answer"].insert_many([
+                {**test, **meta, "question_num": str(q), "answer": f"{answer_type} {q} " + explanation * 3}
+                for q in range(1, question_count + 1) if complete or answer_type == "base" or q % 3
+            ])
+        for level in LEVELS:
+            await db.llm_models.insert_one({**test, "level": level, "status": "succeeded", "fine_tuned_model": f"ft:gpt-4o-mini:bench:{t}-{level}", "job_id": f"ftjob-{t}-{level}"})
+            for prefix in ["standard_", "normal_", ""]:
+                await db.level_answers.insert_many([
+                    {**test, **meta, "level": f"{prefix}{level}", "question_num": q, "answer": f"{prefix}{level} {q} " + explanation * 2}
+                    for q in range(1, question_count + 1)
+                ])
+    await database.ensure_indexes()
+    await database.rebuild_answer_completion()
+
+def percentile(sorted_values: list, q: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+async def measure(client: httpx.AsyncClient, name: str, make_request, requests: int, concurrency: int):
+    await make_request(client, 0)  # 워밍업 (읽기 캐시/임베딩 캐시가 채워진 상태를 측정)
+    latencies = []
+    errors = 0
+    counter = iter(range(1, requests + 1))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+    print(f"{name:<40} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  {result['throughput_rps']:>8} req/s  errors {errors}")
+    return result
+
+def scenarios(test_count: int, question_count: int):
+    def test_id(i):
+        return (i % test_count) + 1
+
+    def question_num(i):
+        return str((i % question_count) + 1)
+
+    async def get_questions(client, i):
+        return await client.get(f"/questions/{test_id(i)}/{SUBJECT_ID}")
+
+    async def save_answer(client, i):
+        return await client.post(f"/answer/{test_id(i)}/{SUBJECT_ID}", json={
+            "question_num": question_num(i), "answer_type": LEVELS[i % 3], "answer": f"수정된 답안 {i}",
+            "test_month": "2024-01", "subject_name": "영어"})
+
+    async def save_answers_batch(client, i):
+        return await client.post(f"/answers/{test_id(i)}/{SUBJECT_ID}", json={"answers": [
+            {"question_num": question_num(i), "answer_type": level, "answer": f"수정된 답안 {i}", "test_month": "2024-01", "subject_name": "영어"}
+            for level in LEVELS]})
+
+    async def answer_status(client, i):
+        return await client.get(f"/answer_status/{test_id(i)}/{SUBJECT_ID}")
+
+    async def datalists(client, i):
+        return await client.get("/finetuning/datalists")
+
+    async def evaluate(client, i):
+        return await client.get(f"/finetuned_answers/{test_id(i)}/{SUBJECT_ID}/{LEVELS[i % 3]}")
+
+    async def generate(client, i):
+        level = LEVELS[i % 3]
+        response = await client.post(f"/finetuned_answers/ft:gpt-4o-mini:bench/{level}/{test_id(i)}/{SUBJECT_ID}", params={"force": "true", "use_cache": "false"})
+        if response.status_code >= 400:
+            return response
+        # 등록만 하고 반환하므로 작업 워커가 생성을 끝낼 때까지 기다린 시간을 측정
+        while True:
+            job = await client.get(f"/jobs/{response.json()['job_id']}")
+            if job.status_code >= 400 or job.json()["status"] in JOB_TERMINAL_STATUSES:
+                return job
+            await asyncio.sleep(0.05)
+
+    async def speech_to_text(client, i):
+        question = {"question": "다음 글의 요지로 가장 적절한 것은?", "content": "Passage", "choices": ["보기 1", "보기 2"]}
+        return await client.post("/speech-to-text", params={"use_cache": "false"},
+                                 data={"level": LEVELS[i % 3], "question": json.dumps(question, ensure_ascii=False)},
+                                 files={"audio": ("audio.webm", os.urandom(32 * 1024), "audio/webm")})
+
+    return {
+        "GET /questions": (get_questions, 1),
+        "POST /answer": (save_answer, 1),
+        "POST /answers (batch of 3)": (save_answers_batch, 1),
+        "GET /answer_status": (answer_status, 1),
+        "GET /finetuning/datalists": (datalists, 1),
+        "GET /finetuned_answers": (evaluate, 1),
+        # 시험 하나 전체를 생성하므로 요청 수를 줄여서 측정
+        "POST /finetuned_answers": (generate, 10),
+        "POST /speech-to-text": (speech_to_text, 1),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args):
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "benchmark"
+    db = connect_database(args.mongo_url, args.db_name)
+    if args.mongo_url:
+        # 벤치마크 전용 DB만 비움
+        await db.client.drop_database(args.db_name)
+    database.set_database(db)
+    set_llm_client(fake_openai_client(args.llm_latency))
+    set_speech_backend(LocalSpeechBackend(args.speech_latency, "음성 인식 결과 예시입니다."))
+    set_embedding_model(FakeEmbeddingModel())
+    # 가짜 임베딩 모델은 이 프로세스에만 있으므로 계산 풀을 스레드 모드로 실행
+    compute_pool.workers = 0
+
+    started = time.perf_counter()
+    await seed(db, args.tests, args.questions)
+    print(f"시드 완료: 시험 {args.tests}개 × 문항 {args.questions}개 × 레벨 {len(LEVELS)}개 ({time.perf_counter() - started:.1f}초)")
+
+    # lifespan은 실행하지 않음 (DB/LLM/음성 인식/임베딩은 위에서 주입)
+    from main import app
+    # 생성 작업은 같은 프로세스의 작업 워커가 실행
+    job_worker.kinds = ["generation", "evaluation"]
+    job_worker.start()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.benchmark", timeout=None) as client:
+        for name, (make_request, divisor) in scenarios(args.tests, args.questions).items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            results[name] = await measure(client, name, make_request, max(1, args.requests // divisor), args.concurrency)
+    await job_worker.stop()
+    await compute_pool.stop()
+
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "commit": git_commit(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "database": "mongodb" if args.mongo_url else "mongomock"},
+        "config": {
+            "tests": args.tests, "questions": args.questions, "levels": len(LEVELS), "requests": args.requests,
+            "concurrency": args.concurrency, "llm_latency": args.llm_latency, "speech_latency": args.speech_latency,
+        },
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="API 벤치마크 (오프라인)")
+    parser.add_argument("--tests", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=45)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--speech-latency", type=float, default=0.5)
+    parser.add_argument("--mongo-url", default="", help="지정하지 않으면 mongomock 메모리 DB 사용")
+    parser.add_argument("--db-name", default="ai_tutor_benchmark")
+    parser.add_argument("--only", nargs="*", help="이름에 포함된 문자열로 시나리오 선택 (예: --only datalists questions)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: benchmarks/results/api-<시각>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"api-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# DB 조회 결과 직렬화 비용 비교 (이전: JSONEncoder로 dumps/loads 후 FastAPI가 다시 직렬화, 현재: orjson으로 한 번만 직렬화)
+# 실행: python -m benchmarks.serialization_bench [--questions 50] [--tests 100] [--repeat 20]
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.utils.responses import MongoJSONResponse
+
+class JSONEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return json.JSONEncoder.default(self, o)
+
+def old_path(documents):
+    documents = json.loads(json.dumps(documents, cls=JSONEncoder))
+    return JSONResponse(jsonable_encoder(documents)).body
+
+def new_path(documents):
+    return MongoJSONResponse(documents).body
+
+def make_payloads(test_count: int, question_count: int):
+    explanation = "이 문제는 글의 요지를 파악하는 문제입니다. 첫 문장에서 필자의 주장이 드러나며, " * 8
+    test_infos = [
+        {"testId": t, "subjectId": 1, "test_month": "2024-06", "subject_name": "영어", "is_ready": t % 2 == 0}
+        for t in range(test_count)
+    ]
+    questions = [
+        {"testId": 1, "subjectId": 1, "question_number": q, "question": "다음 글의 요지로 가장 적절한 것은?",
+         "content": "Many people believe that success comes from talent. " * 10,
+         "choices": [f"보기 {i}" for i in range(1, 6)], "test_month": "2024-06", "subject_name": "영어"}
+        for q in range(question_count)
+    ]
+    # 이전 경로는 _id까지 그대로 반환했으므로 ObjectId를 포함한 문서로 비교
+    answers = [
+        {"_id": ObjectId(), "testId": 1, "subjectId": 1, "question_num": str(q), "answer": explanation,
+         "test_month": "2024-06", "subject_name": "영어"}
+        for q in range(question_count)
+    ]
+    datalists = [
+        {**info, "levels": {level: {"fine_tuned_model": f"ft:gpt-4o-mini:{t}", "status": "succeeded", "job_id": f"ftjob-{t}", "answers_status": "completed"}
+                            for level in ["low", "medium", "high"]}}
+        for t, info in enumerate(test_infos)
+    ]
+    level_answers = [{**a, "level": "low", "updated_at": datetime.utcnow()} for a in answers]
+    return {
+        "/test_infos": (test_infos, test_infos),
+        "/questions": ([questions, answers], [questions, [{k: v for k, v in a.items() if k != "_id"} for a in answers]]),
+        "/finetuning/datalists": (datalists, datalists),
+        "level_answers": (level_answers, [{k: v for k, v in a.items() if k != "_id"} for a in level_answers]),
+    }
+
+def measure(function, payload, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(payload)
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tests", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for endpoint, (old_payload, new_payload) in make_payloads(args.tests, args.questions).items():
+        before = measure(old_path, old_payload, args.repeat)
+        after = measure(new_path, new_payload, args.repeat)
+        results[endpoint] = {"before_ms": round(before, 3), "after_ms": round(after, 3), "speedup": round(before / after, 1) if after else None}
+    json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,62 @@
-from fastapi import FastAPI, File, UploadFile, Form
+from app.core.startup import startup_report
+from fastapi import FastAPI, File, UploadFile, Form, Depends, Request, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from app.core.config import settings
-from app.db.database import init_db, get_questions_by_info, get_answers, db_get_datalists
-from app.utils.utils import process_test_infos, save_or_update_answer, get_answer_status, get_specific_answer_from_db, test_finetuned_answers
-from app.services.llm_service import create_finetuning_model, get_finetuning_status, create_finetuned_answers, refine_speech_to_text
-from google.cloud import speech
+from app.core.metrics import registry, MetricsMiddleware
+from app.db.database import init_db, QueryPlanCheckFailed, watch_progress_changes, get_job, list_jobs, cancel_job, JOB_TERMINAL_STATUSES, get_questions_by_info, get_answers, db_get_datalists, read_cache, test_info_cache_key, questions_cache_key, answers_cache_key
+from app.utils.utils import process_test_infos, save_or_update_answer, save_answers_batch, get_answer_status, get_specific_answer_from_db, test_finetuned_answers, get_all_level_answers
+from app.services.llm_service import get_finetuning_status, refine_speech_to_text, stream_refine_speech_to_text
+from app.utils.sse import format_sse, subscription_to_sse, SSE_HEADERS, KEEPALIVE_INTERVAL, KEEPALIVE_COMMENT
+from app.utils.responses import MongoJSONResponse, etag_response
+from app.services.embedding_cache import embedding_cache
+from app.services.compute_pool import compute_pool, ComputeQueueFull
+from app.services.llm_client import close_llm_client, get_llm_client, llm_metrics
+from app.services.finetuning_poller import finetuning_poller
+from app.services.llm_cache import llm_response_cache
+from app.services.event_bus import event_bus
+from app.services.speech_service import transcribe_audio
+from app.services.warmup import warmup_components, run_warmup
+from app.services.job_queue import job_worker, submit_job, serialize_job
+import asyncio
 import json
-from google.oauth2 import service_account
+import time
 
-# Google Cloud 인증 정보 설정
-credentials_dict = json.loads(settings.GOOGLE_APPLICATION_CREDENTIALS)
-credentials = service_account.Credentials.from_service_account_info(credentials_dict)
-
-# Speech-to-Text 클라이언트를 생성합니다.
-client = speech.SpeechClient(credentials=credentials)
+startup_report.mark_imported()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         await init_db()
         print("데이터베이스 초기화 성공")
+    except QueryPlanCheckFailed:
+        # 검사 모드에서는 인덱스가 없는 채로 서버가 뜨지 않도록 시작을 실패시킴
+        raise
     except Exception as e:
         print(f"데이터베이스 초기화 실패: {str(e)}")
+    # 역할(APP_ROLE)에 해당하는 구성 요소만 미리 준비하고 나머지는 처음 사용할 때 로드
+    components = warmup_components()
+    await run_warmup(components)
+    if "poller" in components and settings.FINETUNING_POLLER_ENABLED:
+        finetuning_poller.start()
+    if settings.JOB_WORKER_ENABLED:
+        job_worker.start()
+    change_stream_task = None
+    if settings.EVENT_SOURCE == "change_stream":
+        change_stream_task = asyncio.create_task(watch_progress_changes())
+    startup_report.mark_ready()
+    print(f"서버 준비 완료 (role={settings.APP_ROLE}): {startup_report.summary()}")
     yield
+    if change_stream_task:
+        change_stream_task.cancel()
+    await job_worker.stop()
+    await finetuning_poller.stop()
+    await compute_pool.stop()
+    await close_llm_client()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=MongoJSONResponse)
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 @app.get("/")
@@ -40,16 +72,17 @@ async def root():
     return {"message": "AI Tutor Studio API"}
 
 @app.get("/test_infos")
-async def get_test_infos_route():
+async def get_test_infos_route(request: Request):
     test_infos = await process_test_infos()
-    return test_infos
+    return etag_response(request, test_infos, read_cache.etag(test_info_cache_key()))
 
 @app.get("/questions/{test_id}/{subject_id}")
-async def get_questions(test_id: str, subject_id: str):
+async def get_questions(test_id: str, subject_id: str, request: Request):
     questions = await get_questions_by_info(test_id, subject_id)
     base_answers = await get_answers(test_id, subject_id, "base_answer")
 
-    return questions, base_answers
+    etag = read_cache.etag(questions_cache_key(test_id, subject_id), answers_cache_key("base_answer", test_id, subject_id))
+    return etag_response(request, [questions, base_answers], etag)
 
 @app.post("/questions/{test_id}/{subject_id}")
 async def create_question():
@@ -64,7 +97,17 @@ async def save_answer(test_id: str, subject_id: str, answer_data: dict):
 @app.get("/answer_status/{test_id}/{subject_id}")
 async def get_answers_status(test_id: str, subject_id: str):
     status = await get_answer_status(test_id, subject_id)
-    return status
+    return MongoJSONResponse(status)
+
+@app.get("/answers/{test_id}/{subject_id}")
+async def get_all_answers(test_id: str, subject_id: str):
+    answers = await get_all_level_answers(test_id, subject_id)
+    return MongoJSONResponse(answers)
+
+@app.post("/answers/{test_id}/{subject_id}")
+async def save_answers(test_id: str, subject_id: str, answers_data: dict):
+    result = await save_answers_batch(test_id, subject_id, answers_data.get("answers", []))
+    return result
 
 @app.get("/answer/{test_id}/{subject_id}/{question_num}/{answer_type}")
 async def get_specific_answer(test_id: str, subject_id: str, question_num: str, answer_type: str):
@@ -74,46 +117,188 @@ async def get_specific_answer(test_id: str, subject_id: str, question_num: str,
 @app.get("/finetuning/datalists")
 async def get_datalists():
     datalists = await db_get_datalists()
-    return datalists
+    return MongoJSONResponse(datalists)
 
 @app.post("/finetuning/{test_id}/{subject_id}/{level}")
-async def create_finetuning_model_route(test_id: str, subject_id: str, level: str):
-    result = await create_finetuning_model(test_id, subject_id, level)
-    return result
+async def create_finetuning_model_route(test_id: str, subject_id: str, level: str, force: bool = False):
+    # 데이터셋 생성/업로드는 작업 워커가 실행하고, 진행 상태는 model_status 이벤트로 전달됨
+    job = await submit_job("finetuning", test_id, subject_id, level, {"force": force})
+    return MongoJSONResponse(job, status_code=200 if job["deduplicated"] else 202)
 
 @app.get("/finetuning_status/{job_id}")
-async def get_finetuning_status_route(job_id: str):
-    result = await get_finetuning_status(job_id)
+async def get_finetuning_status_route(job_id: str, llm_client=Depends(get_llm_client)):
+    result = await get_finetuning_status(job_id, client=llm_client)
     return result
 
 @app.post("/speech-to-text")
-async def speech_to_text(level: str = Form(...), question: str = Form(...), audio: UploadFile = File(...)):
+async def speech_to_text(level: str = Form(...), question: str = Form(...), audio: UploadFile = File(...), use_cache: bool = True, llm_client=Depends(get_llm_client)):
     content = await audio.read()
-    audio = speech.RecognitionAudio(content=content)
+    text = await transcribe_audio(content)
 
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-        sample_rate_hertz=48000,
-        language_code="ko-KR",
-    )
-
-    response = client.recognize(config=config, audio=audio)
+    question_data = json.loads(question)
+    refined_text = await refine_speech_to_text(text, level, question_data, client=llm_client, use_cache=use_cache)
 
-    text = ""
-    for result in response.results:
-        text += result.alternatives[0].transcript
+    return {"text": refined_text}
 
+@app.post("/speech-to-text/stream")
+async def speech_to_text_stream(level: str = Form(...), question: str = Form(...), audio: UploadFile = File(...), use_cache: bool = True, llm_client=Depends(get_llm_client)):
+    content = await audio.read()
     question_data = json.loads(question)
-    refined_text = await refine_speech_to_text(text, level, question_data)
 
-    return {"text": refined_text}
+    async def events():
+        # 긴 음성은 첫 토큰까지 수십 초가 걸리므로 변환이 끝날 때까지 keep-alive를 보냄
+        transcription = asyncio.create_task(transcribe_audio(content))
+        try:
+            while not transcription.done():
+                done, _ = await asyncio.wait({transcription}, timeout=KEEPALIVE_INTERVAL)
+                if not done:
+                    yield KEEPALIVE_COMMENT
+            text = transcription.result()
+            yield format_sse("transcript", {"text": text})
+            refined_text = ""
+            async for token in stream_refine_speech_to_text(text, level, question_data, client=llm_client, use_cache=use_cache):
+                refined_text += token
+                yield format_sse("token", {"text": token})
+            yield format_sse("done", {"text": refined_text})
+        except Exception as e:
+            yield format_sse("error", {"error": str(e)})
+        finally:
+            # 클라이언트가 연결을 끊으면 변환도 중단
+            if not transcription.done():
+                transcription.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @app.get("/finetuned_answers/{test_id}/{subject_id}/{level}")
 async def get_finetuned_answers(test_id: str, subject_id: str, level: str):
-    result = await test_finetuned_answers(test_id, subject_id, level)
-    return result
+    try:
+        result = await test_finetuned_answers(test_id, subject_id, level)
+    except ComputeQueueFull as e:
+        # EMBEDDING_QUEUE_TIMEOUT 동안 계산 풀 대기열에 자리가 나지 않으면 나중에 다시 요청하도록 함
+        return MongoJSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    return MongoJSONResponse(result)
+
+@app.get("/embedding_cache/stats")
+async def get_embedding_cache_stats():
+    return embedding_cache.stats()
+
+@app.get("/compute/stats")
+async def get_compute_stats():
+    return compute_pool.stats()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return read_cache.stats()
+
+@app.get("/finetuning/poller")
+async def get_finetuning_poller_stats():
+    return finetuning_poller.stats()
+
+@app.get("/events")
+async def subscribe_events(testId: int = None, subjectId: int = None):
+    # 파인튜닝 상태(model_status), 레벨 답변 생성 진행(answers_progress), 작업 상태(job) 변경을 SSE로 전달
+    def matches(data: dict):
+        return (testId is None or data["testId"] == testId) and (subjectId is None or data["subjectId"] == subjectId)
+    return StreamingResponse(subscription_to_sse(event_bus, matches), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/events/stats")
+async def get_event_stats():
+    return event_bus.stats()
+
+@app.get("/startup")
+async def get_startup_report():
+    return startup_report.to_dict()
+
+@app.get("/llm/cache/stats")
+async def get_llm_cache_stats():
+    return llm_response_cache.stats()
+
+registry.gauge("llm_in_flight_requests", "진행 중인 OpenAI 호출 수", lambda: llm_metrics.in_flight)
+registry.gauge("llm_waiting_requests", "동시 호출 제한으로 대기 중인 OpenAI 호출 수", lambda: llm_metrics.waiting)
+registry.gauge("read_cache_lookups", "읽기 캐시 조회 수", lambda: {("hit",): read_cache.hits, ("miss",): read_cache.misses}, ("result",))
+registry.gauge("embedding_cache_lookups", "임베딩 캐시 조회 수", lambda: {(k,): v for k, v in embedding_cache.stats().items() if k in ("memory_hits", "store_hits", "misses")}, ("result",))
+registry.gauge("llm_cache_lookups", "LLM 응답 캐시 조회 수", lambda: {("hit",): llm_response_cache.hits, ("miss",): llm_response_cache.misses}, ("result",))
+registry.gauge("app_startup_seconds", "import/준비 완료까지 걸린 시간", lambda: {("import",): startup_report.import_seconds or 0, ("ready",): startup_report.ready_seconds or 0}, ("stage",))
+registry.gauge("compute_pool_pending_jobs", "임베딩/유사도 계산 풀에서 대기 또는 실행 중인 작업 수", lambda: compute_pool.pending)
+registry.gauge("compute_pool_batches", "계산 풀이 실행한 인코딩 배치/작업 수", lambda: {("encode",): compute_pool.batches, ("task",): compute_pool.tasks}, ("kind",))
+registry.gauge("job_worker_jobs", "이 프로세스의 작업 워커가 처리한 작업 수", lambda: {(k,): v for k, v in job_worker.stats().items() if k in ("claimed", "succeeded", "failed", "retried", "cancelled", "lost")}, ("result",))
+registry.gauge("job_worker_running", "이 프로세스에서 실행 중인 작업 수", lambda: len(job_worker.running))
+registry.gauge("event_subscribers", "/events 구독자 수", lambda: event_bus.stats()["subscribers"])
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm/metrics")
+async def get_llm_metrics():
+    return llm_metrics.snapshot()
 
 @app.post("/finetuned_answers/{model_id}/{level}/{test_id}/{subject_id}")
-async def create_finetuned_answers_route(model_id: str, level: str, test_id: str, subject_id: str):
-    result = await create_finetuned_answers(model_id, level, test_id, subject_id)
-    return result
+async def create_finetuned_answers_route(model_id: str, level: str, test_id: str, subject_id: str, force: bool = False, use_cache: bool = True):
+    job = await submit_job("generation", test_id, subject_id, level, {"model_id": model_id, "force": force, "use_cache": use_cache})
+    return MongoJSONResponse(job, status_code=200 if job["deduplicated"] else 202)
+
+@app.post("/finetuned_answers/{model_id}/{level}/{test_id}/{subject_id}/stream")
+async def create_finetuned_answers_stream_route(model_id: str, level: str, test_id: str, subject_id: str, force: bool = False, use_cache: bool = True):
+    job = await submit_job("generation", test_id, subject_id, level, {"model_id": model_id, "force": force, "use_cache": use_cache})
+
+    async def events():
+        # 생성은 작업 워커(다른 프로세스일 수 있음)가 실행하므로 jobs 문서의 진행 상황을 읽어 전달
+        # 클라이언트 연결이 끊겨도 작업은 끝까지 진행되어 결과가 저장됨
+        yield format_sse("job", {"job_id": job["job_id"], "deduplicated": job["deduplicated"]})
+        last_progress = None
+        last_sent_at = time.monotonic()
+        while True:
+            current = await get_job(job["job_id"])
+            if current is None:
+                yield format_sse("error", {"error": "작업을 찾을 수 없습니다."})
+                return
+            if current.get("progress") and current["progress"] != last_progress:
+                last_progress = current["progress"]
+                last_sent_at = time.monotonic()
+                yield format_sse("progress", last_progress)
+            elif time.monotonic() - last_sent_at >= KEEPALIVE_INTERVAL:
+                # 대기 중이거나 한 문항이 오래 걸려도 연결이 유휴 상태로 끊기지 않도록 함
+                last_sent_at = time.monotonic()
+                yield KEEPALIVE_COMMENT
+            if current["status"] == "succeeded":
+                yield format_sse("done", current["result"])
+                return
+            if current["status"] in JOB_TERMINAL_STATUSES:
+                yield format_sse("error", {"error": current.get("error") or current["status"]})
+                return
+            await asyncio.sleep(settings.JOB_PROGRESS_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.post("/jobs/{kind}/{test_id}/{subject_id}/{level}")
+async def create_job_route(kind: str, test_id: str, subject_id: str, level: str, params: dict = Body(default={})):
+    # 같은 (종류, 시험, 과목, 레벨)의 작업이 대기/실행 중이면 그 작업을 반환
+    try:
+        job = await submit_job(kind, test_id, subject_id, level, params)
+    except ValueError as e:
+        return MongoJSONResponse({"error": str(e)}, status_code=400)
+    return MongoJSONResponse(job, status_code=200 if job["deduplicated"] else 202)
+
+@app.get("/jobs")
+async def list_jobs_route(testId: int = None, subjectId: int = None, status: str = None, kind: str = None, limit: int = 50):
+    jobs = await list_jobs(testId, subjectId, status, kind, min(limit, 200))
+    return MongoJSONResponse([serialize_job(job) for job in jobs])
+
+@app.get("/jobs/worker")
+async def get_job_worker_stats():
+    return job_worker.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job_route(job_id: str):
+    job = await get_job(job_id)
+    if job is None:
+        return MongoJSONResponse({"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return MongoJSONResponse(serialize_job(job))
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job_route(job_id: str):
+    job = await cancel_job(job_id)
+    if job is None:
+        return MongoJSONResponse({"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return MongoJSONResponse(serialize_job(job))
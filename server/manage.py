@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+from app.db.database import init_db, rebuild_answer_completion, ensure_indexes, check_query_plans
+
+async def rebuild_answer_status(args):
+    count = await rebuild_answer_completion(args.test_id, args.subject_id)
+    print(f"{count}개 시험의 답변 완료 상태를 재구성했습니다.")
+
+async def check_indexes(args):
+    if args.create:
+        await ensure_indexes()
+    failures = await check_query_plans()
+    for failure in failures:
+        print(f"COLLSCAN: {failure}")
+    if failures:
+        sys.exit(1)
+    print("모든 조회가 인덱스를 사용합니다.")
+
+async def startup_report(args):
+    # main 모듈 import 시간과 로드된 무거운 모듈을 확인 (--warmup이면 역할별 준비 단계까지 실행)
+    from app.core.startup import startup_report as report
+    importlib.import_module("main")
+    if args.warmup:
+        from app.services.warmup import warmup_components, run_warmup
+        from app.services.llm_client import close_llm_client
+        from app.services.compute_pool import compute_pool
+        await run_warmup(warmup_components())
+        await compute_pool.stop()
+        await close_llm_client()
+    report.mark_ready()
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+
+async def run_worker(args):
+    # API 서버와 별도로 jobs 컬렉션의 작업만 실행하는 프로세스 (여러 노드에서 동시에 실행 가능)
+    from app.services.job_queue import JobWorker
+    from app.services.compute_pool import compute_pool
+    from app.services.llm_client import close_llm_client
+    await init_db()
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()] if args.kinds else None
+    worker = JobWorker(kinds=kinds, concurrency=args.concurrency)
+    if not worker.kinds:
+        print("실행할 작업 종류가 없습니다. --kinds 또는 JOB_WORKER_KINDS/APP_ROLE을 확인하세요.")
+        sys.exit(1)
+    print(f"작업 워커 시작: {worker.owner} (종류 {worker.kinds}, 동시 실행 {worker.concurrency})")
+    try:
+        await worker.serve()
+    finally:
+        await worker.stop()
+        await compute_pool.stop()
+        await close_llm_client()
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Tutor Studio 서버 관리 명령")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild-answer-status", help="답변 완료 상태와 is_ready를 전체 재계산")
+    rebuild_parser.add_argument("--test-id")
+    rebuild_parser.add_argument("--subject-id")
+    rebuild_parser.set_defaults(handler=rebuild_answer_status)
+
+    check_parser = subparsers.add_parser("check-indexes", help="조회 형태별 explain 결과에 COLLSCAN이 있으면 실패")
+    check_parser.add_argument("--create", action="store_true", help="검사 전에 인덱스를 생성")
+    check_parser.set_defaults(handler=check_indexes)
+
+    startup_parser = subparsers.add_parser("startup-report", help="import 시간/준비 단계 시간/로드된 무거운 모듈 출력 (APP_ROLE, APP_WARMUP 적용)")
+    startup_parser.add_argument("--warmup", action="store_true", help="역할별 준비 단계까지 실행")
+    startup_parser.set_defaults(handler=startup_report)
+
+    worker_parser = subparsers.add_parser("worker", help="jobs 컬렉션의 생성/평가/파인튜닝 작업을 실행")
+    worker_parser.add_argument("--kinds", help="쉼표로 구분한 작업 종류 (기본값: APP_ROLE에 따른 종류, 예: generation,evaluation)")
+    worker_parser.add_argument("--concurrency", type=int, help="동시에 실행할 작업 수 (기본값: JOB_WORKER_CONCURRENCY)")
+    worker_parser.set_defaults(handler=run_worker)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+if __name__ == "__main__":
+    main()
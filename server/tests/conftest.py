@@ -0,0 +1,103 @@
+# 테스트는 mongomock-motor 메모리 DB와 가짜 임베딩 모델/OpenAI 서버로 실행 (pip install -r requirements-dev.txt)
+import asyncio
+import hashlib
+import json
+import re
+import httpx
+import numpy as np
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.core.config import settings
+from app.db import database
+from app.services import llm_client
+from app.services.compute_pool import compute_pool
+from app.services.embedding_service import set_embedding_model
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+class FakeEmbeddingModel:
+    # 텍스트 해시로 만든 고정 벡터
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+            vectors.append(np.random.default_rng(seed).standard_normal(16).astype(np.float32))
+        return np.vstack(vectors)
+
+@pytest.fixture
+async def db():
+    mock_db = AsyncMongoMockClient()["test"]
+    database.set_database(mock_db)
+    await database.ensure_indexes()
+    yield mock_db
+
+@pytest.fixture
+async def embeddings(monkeypatch):
+    # 계산 풀을 메인 프로세스의 스레드 모드로 실행하고 가짜 모델을 주입
+    monkeypatch.setattr(compute_pool, "workers", 0)
+    set_embedding_model(FakeEmbeddingModel())
+    yield
+    await compute_pool.stop()
+    set_embedding_model(None)
+
+@pytest.fixture
+def llm(monkeypatch):
+    # 세마포어/락은 이벤트 루프에 묶이므로 테스트마다 새로 만듦
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_client, "_semaphore", None)
+    monkeypatch.setattr(llm_client.rate_limiter, "_lock", asyncio.Lock())
+
+class FakeOpenAI:
+    # httpx MockTransport로 chat.completions 엔드포인트를 흉내내는 가짜 OpenAI 서버
+    # respond(question_num, attempt)가 httpx.Response를 반환하면 그 응답을, None이면 정상 응답을 보냄
+    # routes: {"/files": handler(request)}처럼 다른 엔드포인트의 응답을 지정
+    def __init__(self, respond=None, delay: float = 0.01, routes: dict = None):
+        from openai import AsyncOpenAI
+        self.respond = respond
+        self.delay = delay
+        self.routes = routes or {}
+        self.calls = []
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        transport = httpx.MockTransport(self.handle)
+        self.client = AsyncOpenAI(api_key="test", base_url="http://openai.test/v1", max_retries=0, http_client=httpx.AsyncClient(transport=transport))
+
+    async def handle(self, request: httpx.Request):
+        path = request.url.path.removeprefix("/v1")
+        self.calls.append(path)
+        if path in self.routes:
+            return await self.routes[path](request)
+        body = json.loads(request.content)
+        question_num = int(re.search(r"\d+", body["messages"][1]["content"]).group())
+        self.requests.append(question_num)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            response = await self.respond(question_num, self.requests.count(question_num)) if self.respond else None
+            if response is not None:
+                return response
+            return httpx.Response(200, json={
+                "id": f"chatcmpl-{len(self.requests)}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": f"생성 풀이 {question_num}"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            })
+        finally:
+            self.in_flight -= 1
+
+async def seed_test(db, questions: int = 3, test_id: int = 1, subject_id: int = 2):
+    meta = {"testId": test_id, "subjectId": subject_id, "test_month": "2024-03", "subject_name": "영어"}
+    await db.test_info.insert_one({**meta, "is_ready": False})
+    await db.questions.insert_many([
+        {**meta, "question_number": q, "question": f"문제 {q}", "content": f"지문 {q}", "choices": ["보기 1", "보기 2"]}
+        for q in range(1, questions + 1)
+    ])
+    await db.prompts.insert_many([{"level": level, "system_prompt": f"{level} 프롬프트"} for level in ("low", "medium", "high")])
+    await db.base_answer.insert_many([{**meta, "question_num": str(q), "answer": f"기본 풀이 {q}"} for q in range(1, questions + 1)])
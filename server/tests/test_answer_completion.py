@@ -0,0 +1,85 @@
+import pytest
+from app.db import database
+from app.db.database import rebuild_answer_completion, get_answer_completion
+from app.utils.utils import save_or_update_answer, save_answers_batch
+from conftest import seed_test
+
+pytestmark = pytest.mark.anyio
+
+LEVELS = ("low", "medium", "high")
+
+def answer(question_num, level, text="풀이"):
+    return {"question_num": str(question_num), "answer_type": level, "answer": text, "test_month": "2024-03", "subject_name": "영어"}
+
+async def stored_test_info(db):
+    return await db.test_info.find_one({"testId": 1, "subjectId": 2})
+
+async def test_single_saves_adjust_counters(db):
+    await seed_test(db, 2)
+    await rebuild_answer_completion(1, 2)
+
+    for level in LEVELS:
+        await save_or_update_answer(1, 2, answer(1, level))
+    await save_or_update_answer(1, 2, answer(2, "low"))
+    info = await stored_test_info(db)
+    assert (info["answer_tracked_count"], info["answer_complete_count"], info["is_ready"]) == (2, 1, False)
+
+    for level in ("medium", "high"):
+        await save_or_update_answer(1, 2, answer(2, level))
+    info = await stored_test_info(db)
+    assert (info["answer_tracked_count"], info["answer_complete_count"], info["is_ready"]) == (2, 2, True)
+
+    # 빈 답변으로 덮어쓰면 완료가 해제됨
+    await save_or_update_answer(1, 2, answer(1, "high", " "))
+    info = await stored_test_info(db)
+    assert (info["answer_tracked_count"], info["answer_complete_count"], info["is_ready"]) == (2, 1, False)
+    assert await get_answer_completion(1, 2) == {"1": False, "2": True}
+
+async def test_batch_save_refreshes_counters(db):
+    await seed_test(db, 2)
+    result = await save_answers_batch(1, 2, [answer(q, level) for q in (1, 2) for level in LEVELS] + [answer(3, "low")])
+    assert result["failed"] == 0
+    info = await stored_test_info(db)
+    assert (info["answer_tracked_count"], info["answer_complete_count"], info["is_ready"]) == (3, 2, False)
+
+async def test_legacy_data_is_rebuilt_lazily(db):
+    await seed_test(db, 2)
+    for level in LEVELS:
+        await db[f"{level}_answer"].insert_one({"testId": 1, "subjectId": 2, "question_num": "1", "answer": "풀이"})
+    await db.low_answer.insert_one({"testId": 1, "subjectId": 2, "question_num": "2", "answer": "풀이"})
+    # 답변이 없어진 문항의 완료 문서와 다른 시험의 문서
+    await db.answer_completion.insert_many([
+        {"testId": 1, "subjectId": 2, "question_num": "9", "levels": {}, "complete": False},
+        {"testId": 5, "subjectId": 6, "question_num": "1", "levels": {}, "complete": True},
+    ])
+
+    assert await get_answer_completion(1, 2) == {"1": True, "2": False}
+    info = await stored_test_info(db)
+    assert (info["answer_tracked_count"], info["answer_complete_count"], info["is_ready"]) == (2, 1, False)
+    assert await db.answer_completion.count_documents({"testId": 5}) == 1
+
+async def test_rebuild_keeps_documents_saved_during_rebuild(db, monkeypatch):
+    await seed_test(db, 2)
+    for q in (1, 2):
+        for level in LEVELS:
+            await save_or_update_answer(1, 2, answer(q, level))
+    await rebuild_answer_completion(1, 2)
+
+    # 재구성이 답변을 다 읽은 뒤 새 문항이 저장되는 상황
+    get_collection = database.get_collection
+    saved = False
+    async def interleaved_get_collection(name):
+        nonlocal saved
+        collection = await get_collection(name)
+        if name == "high_answer" and not saved:
+            saved = True
+            await save_or_update_answer(1, 2, answer(3, "low"))
+        return collection
+    monkeypatch.setattr(database, "get_collection", interleaved_get_collection)
+
+    await rebuild_answer_completion(1, 2)
+    assert saved
+    monkeypatch.setattr(database, "get_collection", get_collection)
+    assert await get_answer_completion(1, 2) == {"1": True, "2": True, "3": False}
+    info = await stored_test_info(db)
+    assert (info["answer_tracked_count"], info["answer_complete_count"], info["is_ready"]) == (3, 2, False)
@@ -0,0 +1,77 @@
+import pytest
+from app.db.database import save_level_answer, get_evaluation_results
+from app.utils import utils
+from app.utils.utils import test_finetuned_answers as evaluate, save_or_update_answer
+from conftest import seed_test
+
+pytestmark = pytest.mark.anyio
+
+QUESTIONS = 3
+
+async def seed_answers(db):
+    await seed_test(db, QUESTIONS)
+    for level in ("standard_low", "normal_low", "low"):
+        await db.level_answers.insert_many([
+            {"testId": 1, "subjectId": 2, "level": level, "question_num": q, "answer": f"{level} 풀이 {q}"}
+            for q in range(1, QUESTIONS + 1)
+        ])
+
+def answer(question_num, text):
+    return {"question_num": question_num, "answer": text, "test_month": "2024-03", "subject_name": "영어"}
+
+async def stored_rows():
+    return {row["question_num"]: row for row in await get_evaluation_results(1, 2, "low")}
+
+async def test_only_edited_question_is_recomputed(db, embeddings):
+    await seed_answers(db)
+    first = await evaluate("1", "2", "low")
+    assert len(first["combined_answers"]) == QUESTIONS
+    before = await stored_rows()
+    assert not any(row["stale"] for row in before.values())
+
+    await save_level_answer(1, 2, "low", answer(2, "수정된 풀이"))
+    rows = await stored_rows()
+    assert [num for num, row in rows.items() if row["stale"]] == ["2"]
+
+    second = await evaluate("1", "2", "low")
+    assert second["combined_answers"][1]["finetuned_answer"] == "수정된 풀이"
+    after = await stored_rows()
+    assert after["2"]["fingerprint"] != before["2"]["fingerprint"]
+    assert after["1"]["updated_at"] == before["1"]["updated_at"]
+    assert not any(row["stale"] for row in after.values())
+
+@pytest.mark.parametrize("evaluated_before", [False, True])
+async def test_answer_saved_during_evaluation_keeps_row_stale(db, embeddings, monkeypatch, evaluated_before):
+    await seed_answers(db)
+    if evaluated_before:
+        await evaluate("1", "2", "low")
+        await save_level_answer(1, 2, "low", answer(1, "두 번째 풀이"))
+
+    semantic_similarities = utils.semantic_similarities
+
+    async def save_while_computing(*args):
+        # 답변을 읽은 뒤, 결과를 저장하기 전에 다른 요청이 답변을 수정
+        await save_level_answer(1, 2, "low", answer(1, "동시에 저장된 풀이"))
+        return await semantic_similarities(*args)
+
+    monkeypatch.setattr(utils, "semantic_similarities", save_while_computing)
+    await evaluate("1", "2", "low")
+    rows = await stored_rows()
+    assert rows["1"]["stale"]
+    assert not rows["2"]["stale"]
+
+    monkeypatch.setattr(utils, "semantic_similarities", semantic_similarities)
+    result = await evaluate("1", "2", "low")
+    assert result["combined_answers"][0]["finetuned_answer"] == "동시에 저장된 풀이"
+    assert not (await stored_rows())["1"]["stale"]
+
+async def test_only_evaluation_inputs_invalidate_rows(db, embeddings):
+    await seed_answers(db)
+    await evaluate("1", "2", "low")
+
+    # 사람이 작성하는 low_answer는 평가에 쓰이지 않음
+    await save_or_update_answer(1, 2, {**answer("1", "사람 풀이"), "answer_type": "low"})
+    assert not any(row["stale"] for row in (await stored_rows()).values())
+
+    await save_or_update_answer(1, 2, {**answer("1", "새 기본 풀이"), "answer_type": "base"})
+    assert [num for num, row in (await stored_rows()).items() if row["stale"]] == ["1"]
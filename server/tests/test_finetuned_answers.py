@@ -0,0 +1,111 @@
+import asyncio
+import httpx
+import pytest
+from app.core.config import settings
+from app.services import llm_service
+from app.services.llm_service import create_finetuned_answers
+from conftest import FakeOpenAI, seed_test
+
+pytestmark = pytest.mark.anyio
+
+async def stored_answers(db):
+    cursor = db.level_answers.find({"testId": 1, "subjectId": 2, "level": "low"}, {"_id": 0, "question_num": 1, "answer": 1})
+    return {a["question_num"]: a["answer"] for a in await cursor.to_list(length=None)}
+
+async def test_interrupted_run_resumes_missing_questions(db, llm, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "GENERATION_WRITE_BATCH_SIZE", 1)
+    await seed_test(db, 3)
+
+    # 3번 문항 요청 중에 프로세스가 멈춘 상황
+    hang = asyncio.Event()
+    async def respond(question_num, attempt):
+        if question_num == 3:
+            await hang.wait()
+    server = FakeOpenAI(respond)
+    two_generated = asyncio.Event()
+    async def on_progress(event):
+        if event["generated"] == 2:
+            two_generated.set()
+    task = asyncio.create_task(create_finetuned_answers("ft:low", "low", "1", "2", on_progress=on_progress, client=server.client))
+    await asyncio.wait_for(two_generated.wait(), 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert await stored_answers(db) == {1: "생성 풀이 1", 2: "생성 풀이 2"}
+
+    server = FakeOpenAI()
+    events = []
+    async def collect(event):
+        events.append(event)
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", on_progress=collect, client=server.client)
+    assert server.requests == [3]
+    assert (result["status"], result["skipped"], result["generated"], result["failed"]) == ("completed", 2, 1, 0)
+    assert [(e["question_num"], e["status"]) for e in events] == [(3, "generated")]
+    assert len(await stored_answers(db)) == 3
+
+async def test_failed_questions_are_retried_on_next_run(db, llm):
+    await seed_test(db, 3)
+    async def respond(question_num, attempt):
+        if question_num == 2:
+            return httpx.Response(400, json={"error": {"message": "잘못된 요청", "type": "invalid_request_error"}})
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", client=FakeOpenAI(respond).client)
+    assert (result["status"], result["generated"], result["failed"]) == ("partial", 2, 1)
+    assert [e["question_num"] for e in result["errors"]] == [2]
+
+    server = FakeOpenAI()
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", client=server.client)
+    assert server.requests == [2]
+    assert result["status"] == "completed"
+
+async def test_rate_limited_requests_are_retried(db, llm):
+    await seed_test(db, 3)
+    async def respond(question_num, attempt):
+        if attempt == 1:
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "rate limited", "type": "rate_limit_error"}})
+    server = FakeOpenAI(respond)
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", client=server.client)
+    assert (result["status"], result["generated"], result["failed"]) == ("completed", 3, 0)
+    assert sorted(server.requests) == [1, 1, 2, 2, 3, 3]
+
+async def test_concurrency_is_capped(db, llm, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CONCURRENCY", 2)
+    await seed_test(db, 8)
+    server = FakeOpenAI(delay=0.02)
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", client=server.client)
+    assert result["generated"] == 8
+    assert server.max_in_flight == 2
+
+def failing_writes(monkeypatch, failures: int):
+    # 처음 failures번의 bulk_write가 실패하는 DB
+    calls = []
+    bulk_save = llm_service.bulk_save_level_answers
+    async def flaky_bulk_save(test_id, subject_id, level, answers):
+        calls.append([a["question_num"] for a in answers])
+        if len(calls) <= failures:
+            raise RuntimeError("쓰기 실패")
+        await bulk_save(test_id, subject_id, level, answers)
+    monkeypatch.setattr(llm_service, "bulk_save_level_answers", flaky_bulk_save)
+    return calls
+
+async def test_failed_write_is_retried_with_next_batch(db, llm, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "GENERATION_WRITE_BATCH_SIZE", 1)
+    await seed_test(db, 3)
+    calls = failing_writes(monkeypatch, 1)
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", client=FakeOpenAI().client)
+    assert (result["status"], result["generated"], result["failed"]) == ("completed", 3, 0)
+    assert calls[:2] == [[1], [1, 2]]
+    assert len(await stored_answers(db)) == 3
+
+async def test_unsaved_answers_are_reported_as_failed(db, llm, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_WRITE_BATCH_SIZE", 1)
+    await seed_test(db, 3)
+    failing_writes(monkeypatch, 100)
+    server = FakeOpenAI()
+    result = await create_finetuned_answers("ft:low", "low", "1", "2", client=server.client)
+    assert (result["status"], result["generated"], result["failed"]) == ("partial", 0, 3)
+    assert sorted(e["question_num"] for e in result["errors"]) == [1, 2, 3]
+    # 저장 실패가 다른 문항의 생성을 중단시키거나 분리된 채로 남기지 않음
+    await asyncio.sleep(0.05)
+    assert sorted(server.requests) == [1, 2, 3]
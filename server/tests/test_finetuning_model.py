@@ -0,0 +1,77 @@
+import json
+import httpx
+import pytest
+from app.core.config import settings
+from app.services.dataset_builder import build_training_file
+from app.services.llm_service import create_finetuning_model
+from conftest import FakeOpenAI, seed_test
+
+pytestmark = pytest.mark.anyio
+
+async def test_failed_attempt_keeps_succeeded_model(db, llm):
+    await seed_test(db, 1)
+    await db.llm_models.insert_one({
+        "testId": 1, "subjectId": 2, "level": "low",
+        "status": "succeeded", "fine_tuned_model": "ft:model", "job_id": "ftjob-1",
+    })
+
+    # 레벨 답변이 없어 트레이닝 예제 부족으로 실패
+    result = await create_finetuning_model("1", "2", "low", force=True, client=object())
+    assert "error" in result
+
+    model = await db.llm_models.find_one({"testId": 1, "subjectId": 2, "level": "low"})
+    assert (model["status"], model["fine_tuned_model"], model["job_id"]) == ("succeeded", "ft:model", "ftjob-1")
+    assert model["last_error"] == result["error"]
+
+async def test_failed_first_attempt_creates_failed_model(db, llm):
+    await seed_test(db, 1)
+    result = await create_finetuning_model("1", "2", "low", client=object())
+    assert "error" in result
+
+    model = await db.llm_models.find_one({"testId": 1, "subjectId": 2, "level": "low"})
+    assert (model["status"], model["fine_tuned_model"], model["job_id"]) == ("failed", None, None)
+    assert model["last_error"] == result["error"]
+
+async def seed_training_data(db, monkeypatch, previous_status: str):
+    # 다른 레벨에서 같은 데이터셋을 "file-old"로 업로드한 기록
+    monkeypatch.setattr(settings, "TRAINING_MIN_EXAMPLES", 1)
+    await seed_test(db, 2)
+    await db.low_answer.insert_many([{"testId": 1, "subjectId": 2, "question_num": str(q), "answer": f"풀이 {q}"} for q in (1, 2)])
+    training_file, stats = await build_training_file("1", "2", "low")
+    training_file.close()
+    await db.llm_models.insert_one({
+        "testId": 1, "subjectId": 2, "level": "medium", "status": previous_status, "fine_tuned_model": None,
+        "job_id": "ftjob-old", "dataset_fingerprint": stats["fingerprint"], "training_file_id": "file-old",
+    })
+
+def finetuning_server():
+    async def upload(request):
+        return httpx.Response(200, json={"id": "file-new", "object": "file", "bytes": 1, "created_at": 0, "filename": "train.jsonl", "purpose": "fine-tune", "status": "processed"})
+    async def create_job(request):
+        body = json.loads(request.content)
+        if body["training_file"] == "file-old":
+            return httpx.Response(400, json={"error": {"message": "File file-old not found", "type": "invalid_request_error"}})
+        return httpx.Response(200, json={
+            "id": "ftjob-new", "object": "fine_tuning.job", "created_at": 0, "model": body["model"], "fine_tuned_model": None,
+            "status": "queued", "training_file": body["training_file"], "validation_file": None, "hyperparameters": {"n_epochs": "auto"},
+            "organization_id": "org", "result_files": [], "seed": 0, "error": None, "finished_at": None, "trained_tokens": None,
+        })
+    return FakeOpenAI(routes={"/files": upload, "/fine_tuning/jobs": create_job})
+
+async def test_unusable_reused_file_is_uploaded_again(db, llm, monkeypatch):
+    await seed_training_data(db, monkeypatch, "succeeded")
+    server = finetuning_server()
+    result = await create_finetuning_model("1", "2", "low", client=server.client)
+    assert (result["job_id"], result["reused"]) == ("ftjob-new", None)
+    assert server.calls == ["/fine_tuning/jobs", "/files", "/fine_tuning/jobs"]
+
+    models = {m["level"]: m async for m in db.llm_models.find({})}
+    assert models["medium"]["training_file_id"] is None
+    assert (models["low"]["training_file_id"], models["low"]["job_id"]) == ("file-new", "ftjob-new")
+
+async def test_file_of_failed_job_is_not_reused(db, llm, monkeypatch):
+    await seed_training_data(db, monkeypatch, "failed")
+    server = finetuning_server()
+    result = await create_finetuning_model("1", "2", "low", client=server.client)
+    assert result["job_id"] == "ftjob-new"
+    assert server.calls == ["/files", "/fine_tuning/jobs"]
@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from app.services import finetuning_poller as poller_module
+from app.services.finetuning_poller import FinetuningPoller
+
+pytestmark = pytest.mark.anyio
+
+class FakeJobApi:
+    # fetch 호출마다 요청한 작업 id와 그 시점의 폴러 간격을 기록
+    def __init__(self, statuses: dict):
+        self.statuses = statuses
+        self.calls = []
+        self.intervals = []
+        self.poller = None
+        self.on_fetch = None
+
+    async def fetch(self, job_ids: list):
+        self.calls.append(sorted(job_ids))
+        if self.poller is not None:
+            self.intervals.append(self.poller.interval)
+        if self.on_fetch:
+            self.on_fetch(len(self.calls))
+        return {job_id: dict(self.statuses[job_id]) for job_id in job_ids if job_id in self.statuses}
+
+def remote(status: str, fine_tuned_model: str = None):
+    return {"status": status, "fine_tuned_model": fine_tuned_model}
+
+async def seed_models(db, models: dict):
+    await db.llm_models.insert_many([
+        {"testId": 1, "subjectId": 2, "level": f"level-{job_id}", "status": status, "fine_tuned_model": None, "job_id": job_id}
+        for job_id, status in models.items()
+    ])
+
+async def model_statuses(db):
+    return {m["job_id"]: (m["status"], m["fine_tuned_model"]) async for m in db.llm_models.find({})}
+
+async def test_first_poll_recovers_unfinished_jobs(db):
+    # 재시작 전에 만들어진 작업 중 끝나지 않은 것만 확인
+    await seed_models(db, {"job-1": "pending", "job-2": "running", "job-3": "succeeded", "job-4": "failed"})
+    job_api = FakeJobApi({"job-1": remote("running"), "job-2": remote("running")})
+    poller = FinetuningPoller(job_api)
+    assert await poller.poll_once() == 1
+    assert job_api.calls == [["job-1", "job-2"]]
+    assert (await model_statuses(db))["job-1"] == ("running", None)
+
+async def test_changes_are_written_in_one_bulk_update(db, monkeypatch):
+    await seed_models(db, {"job-1": "pending", "job-2": "running", "job-3": "running"})
+    job_api = FakeJobApi({
+        "job-1": remote("queued"),
+        "job-2": remote("succeeded", "ft:job-2"),
+        "job-3": remote("failed"),
+    })
+    writes = []
+    bulk_update = poller_module.bulk_update_llm_model_status
+    async def record_bulk_update(updates):
+        writes.append(updates)
+        await bulk_update(updates)
+    monkeypatch.setattr(poller_module, "bulk_update_llm_model_status", record_bulk_update)
+
+    poller = FinetuningPoller(job_api)
+    assert await poller.poll_once() == 2
+    assert len(job_api.calls) == 1 and len(writes) == 1
+    assert sorted(update["job_id"] for update in writes[0]) == ["job-2", "job-3"]
+    assert await model_statuses(db) == {
+        "job-1": ("pending", None),
+        "job-2": ("succeeded", "ft:job-2"),
+        "job-3": ("failed", None),
+    }
+
+async def test_interval_backs_off_until_status_changes(db):
+    await seed_models(db, {"job-1": "running", "job-2": "running"})
+    job_api = FakeJobApi({"job-1": remote("running"), "job-2": remote("running")})
+    poller = FinetuningPoller(job_api, min_interval=0.01, max_interval=0.08, lease_ttl=30)
+    job_api.poller = poller
+    done = asyncio.Event()
+    def on_fetch(count):
+        if count == 5:
+            job_api.statuses["job-1"] = remote("succeeded", "ft:job-1")
+        if count == 7:
+            done.set()
+    job_api.on_fetch = on_fetch
+
+    poller.start()
+    try:
+        await asyncio.wait_for(done.wait(), 5)
+    finally:
+        await poller.stop()
+    assert job_api.intervals[:7] == [0.01, 0.02, 0.04, 0.08, 0.08, 0.01, 0.02]
+
+async def test_only_lease_holder_polls(db):
+    await seed_models(db, {"job-1": "running"})
+    job_api = FakeJobApi({"job-1": remote("running")})
+    first = FinetuningPoller(job_api, min_interval=0.01, max_interval=0.01, lease_ttl=0.3)
+    second = FinetuningPoller(job_api, min_interval=0.01, max_interval=0.01, lease_ttl=0.3)
+    first.start()
+    await asyncio.sleep(0.05)
+    second.start()
+    try:
+        await asyncio.sleep(0.2)
+        assert (first.is_leader, second.is_leader) == (True, False)
+        assert first.polls > 0 and second.polls == 0
+
+        # 리더가 멈추면 lease를 반납하고 다른 워커가 이어받음
+        await first.stop()
+        await asyncio.sleep(0.25)
+        assert second.is_leader and second.polls > 0
+    finally:
+        await first.stop()
+        await second.stop()
+
+async def test_job_created_by_another_process_resets_backoff(db):
+    await seed_models(db, {"job-1": "running"})
+    job_api = FakeJobApi({"job-1": remote("running"), "job-2": remote("running")})
+    poller = FinetuningPoller(job_api, min_interval=0.01, max_interval=30, lease_ttl=0.15)
+    job_api.poller = poller
+    polled = asyncio.Event()
+    job_api.on_fetch = lambda count: polled.set()
+
+    poller.start()
+    try:
+        await asyncio.wait_for(polled.wait(), 5)
+        while poller.interval < 1:
+            await asyncio.sleep(0.01)
+        # 다른 프로세스가 만든 작업 (notify 없이 DB에만 기록)
+        polled.clear()
+        await seed_models(db, {"job-2": "pending"})
+        await asyncio.wait_for(polled.wait(), 1)
+    finally:
+        await poller.stop()
+    assert job_api.calls[-1] == ["job-1", "job-2"]
+    assert job_api.intervals[-1] == 0.01
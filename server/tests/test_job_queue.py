@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from app.core.config import settings
+from app.db.database import claim_job, heartbeat_job, finish_job, cancel_job, get_job
+from app.services import job_queue, llm_service
+from app.services.job_queue import JobWorker, submit_job
+from conftest import FakeOpenAI, seed_test
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def handlers(monkeypatch):
+    # 테스트마다 작업 핸들러를 바꿔 끼울 수 있도록 복사본 사용
+    patched = dict(job_queue.JOB_HANDLERS)
+    monkeypatch.setattr(job_queue, "JOB_HANDLERS", patched)
+    return patched
+
+async def stored_job(job_id):
+    return await get_job(str(job_id))
+
+async def test_duplicate_submissions_share_one_job(db):
+    first = await submit_job("finetuning", 1, 2, "low")
+    second = await submit_job("finetuning", 1, 2, "low")
+    other_level = await submit_job("finetuning", 1, 2, "high")
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert second["job_id"] == first["job_id"]
+    assert other_level["job_id"] != first["job_id"]
+
+    # 끝난 작업은 같은 키로 다시 등록할 수 있음
+    job = await claim_job("worker-a", ["finetuning"], 30)
+    await finish_job(job["_id"], "worker-a", "succeeded")
+    again = await submit_job("finetuning", 1, 2, "low")
+    assert not again["deduplicated"] and again["job_id"] != first["job_id"]
+
+async def test_expired_lease_is_reclaimed_by_another_worker(db):
+    submitted = await submit_job("evaluation", 1, 2, "low")
+    job = await claim_job("worker-a", ["evaluation"], 0.01)
+    assert str(job["_id"]) == submitted["job_id"]
+    assert await claim_job("worker-b", ["evaluation"], 30) is None
+
+    await asyncio.sleep(0.02)
+    reclaimed = await claim_job("worker-b", ["evaluation"], 30)
+    assert reclaimed["_id"] == job["_id"]
+    assert (reclaimed["lease_owner"], reclaimed["attempts"]) == ("worker-b", 2)
+    # lease를 잃은 워커는 heartbeat와 완료 기록이 모두 거부됨
+    assert await heartbeat_job(job["_id"], "worker-a", 30) is None
+    assert await finish_job(job["_id"], "worker-a", "succeeded") is None
+
+async def test_failing_job_backs_off_then_fails(db, handlers, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_DELAY", 10)
+    calls = []
+    async def flaky(job, report_progress):
+        calls.append(job["attempts"])
+        raise RuntimeError(f"일시적 오류 {job['attempts']}")
+    handlers["evaluation"] = flaky
+    worker = JobWorker(kinds=["evaluation"], concurrency=1, lease_ttl=30)
+    submitted = await submit_job("evaluation", 1, 2, "low")
+
+    delays = []
+    for attempt in range(1, 4):
+        job = await claim_job(worker.owner, worker.kinds, worker.lease_ttl)
+        assert job is not None and job["attempts"] == attempt
+        started = datetime.utcnow()
+        await worker.run_job(job)
+        job = await stored_job(submitted["job_id"])
+        if job["status"] == "queued":
+            delays.append((job["run_after"] - started).total_seconds())
+            assert await claim_job(worker.owner, worker.kinds, worker.lease_ttl) is None
+            # backoff 시간이 지난 것으로 처리
+            await db.jobs.update_one({"_id": job["_id"]}, {"$set": {"run_after": datetime.utcnow() - timedelta(seconds=1)}})
+
+    assert calls == [1, 2, 3]
+    assert [round(delay) for delay in delays] == [10, 20]
+    assert (job["status"], job["error"]) == ("failed", "일시적 오류 3")
+    assert (worker.retried, worker.failed) == (2, 1)
+
+async def test_non_retryable_error_fails_immediately(db, handlers):
+    async def invalid(job, report_progress):
+        raise ValueError("트레이닝 예제가 부족합니다.")
+    handlers["finetuning"] = invalid
+    worker = JobWorker(kinds=["finetuning"], concurrency=1, lease_ttl=30)
+    submitted = await submit_job("finetuning", 1, 2, "low")
+    await worker.run_job(await claim_job(worker.owner, worker.kinds, worker.lease_ttl))
+    job = await stored_job(submitted["job_id"])
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 1, "트레이닝 예제가 부족합니다.")
+
+async def test_cancel_queued_job(db):
+    submitted = await submit_job("generation", 1, 2, "low", {"model_id": "ft:low"})
+    cancelled = await cancel_job(submitted["job_id"])
+    assert cancelled["status"] == "cancelled"
+    assert await claim_job("worker-a", ["generation"], 30) is None
+    assert not (await submit_job("generation", 1, 2, "low", {"model_id": "ft:low"}))["deduplicated"]
+
+async def test_cancel_running_job(db, handlers, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_PROGRESS_INTERVAL", 0.01)
+    started = asyncio.Event()
+    interrupted = []
+    async def slow(job, report_progress):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            interrupted.append(job["_id"])
+            raise
+    handlers["evaluation"] = slow
+    worker = JobWorker(kinds=["evaluation"], concurrency=1, lease_ttl=0.06)
+    submitted = await submit_job("evaluation", 1, 2, "low")
+    run = asyncio.create_task(worker.run_job(await claim_job(worker.owner, worker.kinds, worker.lease_ttl)))
+    await asyncio.wait_for(started.wait(), 5)
+
+    assert (await cancel_job(submitted["job_id"]))["cancel_requested"]
+    await asyncio.wait_for(run, 5)
+    job = await stored_job(submitted["job_id"])
+    assert job["status"] == "cancelled"
+    assert len(interrupted) == 1 and worker.cancelled == 1
+
+async def test_generation_enqueues_evaluation(db, monkeypatch):
+    async def fake_generation(model_id, level, test_id, subject_id, force=False, on_progress=None, use_cache=True):
+        await on_progress({"question_num": 1, "status": "generated", "total": 2, "skipped": 1, "generated": 1, "failed": 0})
+        return {"status": "completed", "total": 2, "skipped": 1, "generated": 1, "failed": 0, "errors": []}
+    monkeypatch.setattr(job_queue, "create_finetuned_answers", fake_generation)
+    worker = JobWorker(kinds=["generation"], concurrency=1, lease_ttl=30)
+    submitted = await submit_job("generation", 1, 2, "low", {"model_id": "ft:low"})
+    await worker.run_job(await claim_job(worker.owner, worker.kinds, worker.lease_ttl))
+
+    job = await stored_job(submitted["job_id"])
+    assert (job["status"], job["result"]["generated"]) == ("succeeded", 1)
+    evaluation = await db.jobs.find_one({"kind": "evaluation"})
+    assert (evaluation["testId"], evaluation["subjectId"], evaluation["level"], evaluation["status"]) == (1, 2, "low", "queued")
+
+async def test_generation_without_new_answers_skips_evaluation(db, monkeypatch):
+    async def nothing_to_generate(model_id, level, test_id, subject_id, force=False, on_progress=None, use_cache=True):
+        return {"status": "completed", "total": 2, "skipped": 2, "generated": 0, "failed": 0, "errors": []}
+    monkeypatch.setattr(job_queue, "create_finetuned_answers", nothing_to_generate)
+    worker = JobWorker(kinds=["generation"], concurrency=1, lease_ttl=30)
+    await submit_job("generation", 1, 2, "low", {"model_id": "ft:low"})
+    await worker.run_job(await claim_job(worker.owner, worker.kinds, worker.lease_ttl))
+    assert await db.jobs.count_documents({"kind": "evaluation"}) == 0
+
+async def run_finetuning_job(server: FakeOpenAI, monkeypatch):
+    monkeypatch.setattr(llm_service, "get_llm_client", lambda: server.client)
+    worker = JobWorker(kinds=["finetuning"], concurrency=1, lease_ttl=30)
+    submitted = await submit_job("finetuning", 1, 2, "low")
+    await worker.run_job(await claim_job(worker.owner, worker.kinds, worker.lease_ttl))
+    return worker, await stored_job(submitted["job_id"])
+
+async def test_transient_finetuning_error_is_retried(db, llm, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_MIN_EXAMPLES", 1)
+    await seed_test(db, 2)
+    await db.low_answer.insert_many([{"testId": 1, "subjectId": 2, "question_num": str(q), "answer": f"풀이 {q}"} for q in (1, 2)])
+    async def unavailable(request):
+        return httpx.Response(503, json={"error": {"message": "일시적인 서버 오류", "type": "server_error"}})
+    server = FakeOpenAI(routes={"/files": unavailable})
+
+    worker, job = await run_finetuning_job(server, monkeypatch)
+    assert server.calls == ["/files"]
+    assert (job["status"], worker.retried, worker.failed) == ("queued", 1, 0)
+    assert "일시적인 서버 오류" in job["error"]
+
+async def test_invalid_finetuning_dataset_fails_without_retry(db, llm, monkeypatch):
+    await seed_test(db, 2)
+    server = FakeOpenAI()
+    worker, job = await run_finetuning_job(server, monkeypatch)
+    assert server.calls == []
+    assert (job["status"], worker.retried, worker.failed) == ("failed", 0, 1)
@@ -0,0 +1,35 @@
+import pytest
+from app.db import database
+from app.db.database import get_test_infos, get_questions_by_info
+from conftest import seed_test
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: now[0])
+    database.read_cache.clear()
+    yield now
+    database.read_cache.clear()
+
+async def test_test_infos_written_by_other_worker_expire_quickly(db, clock, monkeypatch):
+    monkeypatch.setattr(database.settings, "READ_CACHE_MUTABLE_TTL", 5)
+    await seed_test(db, 1)
+    assert (await get_test_infos())[0]["is_ready"] is False
+
+    # 다른 워커가 답안을 저장해 is_ready가 바뀐 상황 (이 프로세스의 캐시는 무효화되지 않음)
+    await db.test_info.update_one({"testId": 1, "subjectId": 2}, {"$set": {"is_ready": True}})
+    assert (await get_test_infos())[0]["is_ready"] is False
+    assert database.read_cache.etag(database.test_info_cache_key()) is not None
+
+    clock[0] += 5
+    assert database.read_cache.etag(database.test_info_cache_key()) is None
+    assert (await get_test_infos())[0]["is_ready"] is True
+
+async def test_questions_use_default_ttl(db, clock):
+    await seed_test(db, 1)
+    assert len(await get_questions_by_info(1, 2)) == 1
+    await db.questions.insert_one({"testId": 1, "subjectId": 2, "question_number": 2})
+    clock[0] += 60
+    assert len(await get_questions_by_info(1, 2)) == 1
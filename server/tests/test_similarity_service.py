@@ -0,0 +1,47 @@
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from app.core.config import Settings
+from app.services.similarity_service import lexical_similarities
+
+STANDARD = [
+    "빈칸에는 however가 들어가야 하므로 정답은 3번입니다.",
+    "The author argues that habits shape identity over time.",
+    "주어가 3인칭 단수이므로 동사에 -s를 붙여야 합니다. The verb takes -s.",
+    "정답은 2번",
+    "!",
+]
+FINETUNED = [
+    "however가 빈칸에 들어가야 자연스러우므로 3번이 정답입니다.",
+    "Habits shape who we are, the author argues.",
+    "3인칭 단수 주어이므로 동사에 -s를 붙입니다.",
+    "정답은 2번 정답은 2번",
+    "no tokens on the other side",
+]
+NORMAL = [
+    "정답은 4번입니다.",
+    "The passage is about identity.",
+    "The verb takes -s because the subject is singular.",
+    "2번",
+    "?",
+]
+
+def per_pair_similarity(text1: str, text2: str) -> float:
+    # 배치 계산 이전 utils.calculate_cosine_similarity의 문항별 계산
+    vectorizer = CountVectorizer().fit([text1, text2])
+    vector1 = vectorizer.transform([text1]).toarray()[0]
+    vector2 = vectorizer.transform([text2]).toarray()[0]
+    return float(cosine_similarity([vector1], [vector2])[0][0])
+
+def test_count_mode_matches_per_pair_computation():
+    finetuned, normal = lexical_similarities(STANDARD, FINETUNED, NORMAL, mode="count")
+    for i, standard in enumerate(STANDARD):
+        if i == len(STANDARD) - 1:
+            # 두 답변 모두 토큰이 없는 쌍은 기존 계산이 어휘 사전 오류로 실패하므로 0으로 처리
+            assert normal[i] == 0.0
+        else:
+            assert normal[i] == pytest.approx(per_pair_similarity(standard, NORMAL[i]), abs=1e-12)
+        assert finetuned[i] == pytest.approx(per_pair_similarity(standard, FINETUNED[i]), abs=1e-12)
+
+def test_default_mode_is_count():
+    assert Settings.model_fields["LEXICAL_SIMILARITY_MODE"].default == "count"
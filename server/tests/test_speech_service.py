@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from app.services import speech_service
+from app.services.speech_service import transcribe_audio, PCM_SAMPLE_RATE, LINEAR16, WEBM_OPUS
+
+pytestmark = pytest.mark.anyio
+
+class RecordingBackend:
+    name = "recording"
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []
+
+    async def recognize(self, content: bytes, encoding: str, sample_rate: int) -> str:
+        self.calls.append((encoding, len(content) // 2 / sample_rate if encoding == LINEAR16 else None))
+        if self.error:
+            raise self.error
+        return f"구간{len(self.calls)}"
+
+def decoded(pcm):
+    async def decode_to_pcm(content):
+        return pcm
+    return decode_to_pcm
+
+async def test_long_recording_is_split_into_short_segments(monkeypatch):
+    # 2분 30초 분량의 잡음
+    samples = np.random.default_rng(0).integers(-1000, 1000, 150 * PCM_SAMPLE_RATE, dtype=np.int16)
+    monkeypatch.setattr(speech_service, "decode_to_pcm", decoded(samples.tobytes()))
+    backend = RecordingBackend()
+    assert await transcribe_audio(b"webm", backend) == "구간1 구간2 구간3 구간4"
+    durations = [seconds for _, seconds in backend.calls]
+    assert all(seconds <= 50 for seconds in durations)
+    assert sum(durations) == pytest.approx(150)
+
+async def test_undecodable_recording_is_recognized_whole(monkeypatch):
+    monkeypatch.setattr(speech_service, "decode_to_pcm", decoded(None))
+    backend = RecordingBackend()
+    assert await transcribe_audio(b"webm", backend) == "구간1"
+    assert backend.calls == [(WEBM_OPUS, None)]
+
+async def test_undecodable_long_recording_reports_ffmpeg_requirement(monkeypatch):
+    monkeypatch.setattr(speech_service, "decode_to_pcm", decoded(None))
+    backend = RecordingBackend(RuntimeError("Inline audio exceeds duration limit. Please use a GCS URI."))
+    with pytest.raises(RuntimeError, match="ffmpeg"):
+        await transcribe_audio(b"webm", backend)
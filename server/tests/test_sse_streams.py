@@ -0,0 +1,49 @@
+import asyncio
+import json
+import pytest
+import main
+from app.core.config import settings
+from app.db.database import claim_job, finish_job
+from app.utils.sse import KEEPALIVE_COMMENT
+
+pytestmark = pytest.mark.anyio
+
+async def test_generation_stream_sends_keepalive_while_job_waits(db, monkeypatch):
+    monkeypatch.setattr(main, "KEEPALIVE_INTERVAL", 0.02)
+    monkeypatch.setattr(settings, "JOB_PROGRESS_INTERVAL", 0.01)
+    response = await main.create_finetuned_answers_stream_route("ft:low", "low", "1", "2")
+    chunks = response.body_iterator
+    assert (await anext(chunks)).startswith("event: job")
+
+    # 작업이 대기열에 있는 동안에는 진행 상황 대신 keep-alive 주석을 보냄
+    assert await anext(chunks) == KEEPALIVE_COMMENT
+    job = await claim_job("worker-a", ["generation"], 30)
+    await finish_job(job["_id"], "worker-a", "succeeded", result={"generated": 0})
+    rest = [chunk async for chunk in chunks]
+    assert rest[-1].startswith("event: done")
+
+class FakeUpload:
+    async def read(self):
+        return b"audio"
+
+async def test_speech_stream_sends_keepalive_while_transcribing(monkeypatch):
+    monkeypatch.setattr(main, "KEEPALIVE_INTERVAL", 0.02)
+    transcribed = asyncio.Event()
+    async def slow_transcribe(content):
+        await transcribed.wait()
+        return "음성 인식 결과"
+    async def refine(text, level, question, client=None, use_cache=True):
+        yield "다듬은 "
+        yield "결과"
+    monkeypatch.setattr(main, "transcribe_audio", slow_transcribe)
+    monkeypatch.setattr(main, "stream_refine_speech_to_text", refine)
+    response = await main.speech_to_text_stream("low", json.dumps({"question": "문항"}), FakeUpload(), llm_client=object())
+    chunks = response.body_iterator
+
+    # 음성 변환이 끝나기 전에도 keep-alive 주석으로 연결을 유지
+    assert await asyncio.wait_for(anext(chunks), 1) == KEEPALIVE_COMMENT
+    assert await asyncio.wait_for(anext(chunks), 1) == KEEPALIVE_COMMENT
+    transcribed.set()
+    rest = [chunk async for chunk in chunks if chunk != KEEPALIVE_COMMENT]
+    assert rest[0].startswith("event: transcript")
+    assert rest[-1] == main.format_sse("done", {"text": "다듬은 결과"})
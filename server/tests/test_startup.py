@@ -0,0 +1,21 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+import main
+from app.core.config import settings
+from app.db import database
+from app.db.database import QueryPlanCheckFailed
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def mock_client(db, monkeypatch):
+    monkeypatch.setattr(database, "client", AsyncMongoMockClient())
+
+async def test_query_plan_check_failure_stops_startup(mock_client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_CHECK_QUERY_PLANS", True)
+    async def collscan():
+        return ["questions find: COLLSCAN"]
+    monkeypatch.setattr(database, "check_query_plans", collscan)
+    with pytest.raises(QueryPlanCheckFailed):
+        async with main.lifespan(main.app):
+            pass